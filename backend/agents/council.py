@@ -2,10 +2,14 @@ from typing import Dict, Any, List
 import json
 from langgraph.graph import StateGraph, END
 from backend.core.schema import AnalysisResult
-from backend.agents.personas import TRIAGE_PROMPT, DOCTOR_PROMPT, COACH_PROMPT, SYNTHESIZER_PROMPT
+from backend.agents.personas import TRIAGE_PROMPT, DOCTOR_PROMPT, COACH_PROMPT, SYNTHESIZER_PROMPT, SYNTHESIZER_CONTEXT, USER_PROFILE
 from backend.core.llm import llm_provider
 from backend.agents.schemas import TriageResult, RiskAssessment, CouncilActionPlan, MemoryEntry
 from backend.core.memory import hippocampus
+from backend.core.context_builder import ContextBuilder
+
+# The profile is static, so the filled synthesizer prompt is identical on every call
+SYNTHESIZER_PROMPT_FILLED = SYNTHESIZER_PROMPT.format(user_profile=USER_PROFILE)
 
 # --- State Definition ---
 class CouncilState(Dict):
@@ -24,15 +28,19 @@ async def triage_node(state: CouncilState):
     
     # 1. Recall Past Memories
     memories = await hippocampus.recall(state['input_data'])
-    memory_context = "\n".join([f"- [{m.timestamp}] {m.statement}" for m in memories]) if memories else "None"
     
-    context = f"Input: {state['input_data']}\nSource: {state['source']}\nPast History:\n{memory_context}"
+    context = (ContextBuilder("triage")
+        .add_text("Input", state['input_data'])
+        .add_text("Source", state['source'])
+        .add_items("Past History", [f"- [{m.timestamp}] {m.statement}" for m in memories])
+        .build())
     
     try:
         result = await llm_provider.generate_structured(
             prompt=TRIAGE_PROMPT,
             schema_model=TriageResult,
-            context=context
+            context=context,
+            call_site="triage"
         )
     except Exception:
         result = TriageResult(needs_doctor=True, needs_coach=True, reasoning="Error in Triage")
@@ -44,15 +52,18 @@ async def doctor_node(state: CouncilState):
     
     # Inject Memory
     memories = state.get("past_memories", [])
-    memory_context = "\n".join([f"- {m.statement} (Outcome: {m.outcome})" for m in memories]) if memories else "None"
     
-    context = f"Input: {state['input_data']}\nPatient History:\n{memory_context}"
+    context = (ContextBuilder("doctor")
+        .add_text("Input", state['input_data'])
+        .add_items("Patient History", [f"- {m.statement} (Outcome: {m.outcome})" for m in memories])
+        .build())
     
     try:
         result = await llm_provider.generate_structured(
             prompt=DOCTOR_PROMPT,
             schema_model=RiskAssessment,
-            context=context
+            context=context,
+            call_site="doctor"
         )
     except Exception:
         result = RiskAssessment(risk_score=0.0, assessment="Error", identified_issues=[])
@@ -64,15 +75,18 @@ async def coach_node(state: CouncilState):
     
     # Inject Memory
     memories = state.get("past_memories", [])
-    memory_context = "\n".join([f"- {m.statement} (Outcome: {m.outcome})" for m in memories]) if memories else "None"
     
-    context = f"Input: {state['input_data']}\nUser History:\n{memory_context}"
+    context = (ContextBuilder("coach")
+        .add_text("Input", state['input_data'])
+        .add_items("User History", [f"- {m.statement} (Outcome: {m.outcome})" for m in memories])
+        .build())
     
     try:
         result = await llm_provider.generate_structured(
             prompt=COACH_PROMPT,
             schema_model=RiskAssessment,
-            context=context
+            context=context,
+            call_site="coach"
         )
     except Exception:
         result = RiskAssessment(risk_score=0.0, assessment="Error", identified_issues=[])
@@ -85,17 +99,9 @@ async def synthesizer_node(state: CouncilState):
     doctor_res = state.get("doctor_output")
     coach_res = state.get("coach_output")
     memories = state.get("past_memories", [])
-    memory_context_str = json.dumps([m.statement for m in memories], indent=2) if memories else "None"
-    
-    from backend.agents.personas import USER_PROFILE
-    
-    context = f"""
-    Dr. Nexus Assessment: {doctor_res.assessment if doctor_res else 'None'}
-    Risk: {doctor_res.risk_score if doctor_res else 0}
-    
-    Guardian Assessment: {coach_res.assessment if coach_res else 'None'}
-    Risk: {coach_res.risk_score if coach_res else 0}
-    """
+    memory_context_str = (ContextBuilder("synthesizer")
+        .add_items("", [f"- {m.statement}" for m in memories])
+        .build())
     
     # --- Risk Engine Check (Hybrid: Deterministic + Graph) ---
     from backend.core.risk_engine import risk_engine
@@ -134,22 +140,8 @@ async def synthesizer_node(state: CouncilState):
     elif final_score >= 0.4:
         final_level = "MEDIUM"
     
-    # We format the prompt itself with the extra variables
-    formatted_prompt = SYNTHESIZER_PROMPT.format(
-        user_profile=USER_PROFILE,
-        memory_context=memory_context_str,
-        doctor_output=context, 
-        coach_output="",
-        
-        # Inject Quantitative Data
-        quant_score=risk_calc['score'],
-        quant_level=risk_calc['level'],
-        quant_reason=risk_calc['reasoning']
-    )
-    
-    # Actually, let's do it properly.
-    prompt_filled = SYNTHESIZER_PROMPT.format(
-        user_profile=USER_PROFILE,
+    # Stable persona prompt first, per-call findings as context after it
+    synthesis_context = SYNTHESIZER_CONTEXT.format(
         memory_context=memory_context_str,
         doctor_output=f"{doctor_res.assessment} (Risk: {doctor_res.risk_score})" if doctor_res else "None",
         coach_output=f"{coach_res.assessment} (Risk: {coach_res.risk_score})" if coach_res else "None",
@@ -160,9 +152,10 @@ async def synthesizer_node(state: CouncilState):
     
     try:
         result = await llm_provider.generate_structured(
-            prompt=prompt_filled,
+            prompt=SYNTHESIZER_PROMPT_FILLED,
             schema_model=CouncilActionPlan,
-            context="" # Context is already in the prompt
+            context=synthesis_context,
+            call_site="synthesizer"
         )
         # Inject Graph Highlights manually since LLM might miss them or they are not part of the text generation
         result.graph_highlights = graph_calc.get("involved_nodes", [])
@@ -1,14 +1,20 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from langgraph.graph import StateGraph, END
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.messages import AIMessage, SystemMessage
 from langchain_core.tools import tool
+from langchain_core.utils.function_calling import convert_to_openai_tool
 
 from backend.core.llm import llm_provider
 from backend.core.profile_service import profile_service
 from backend.core.memory import hippocampus
 from backend.core.graph_service import graph_service
 from backend.core.risk_engine import risk_engine
-from backend.agents.personas import LIAISON_PROMPT
+from backend.agents.personas import LIAISON_PROMPT, LIAISON_AUTONOMY_INSTRUCTION, LIAISON_CONTEXT, LIAISON_SUMMARY_CONTEXT, CONVERSATION_SUMMARY_PROMPT
+from backend.agents.schemas import ConversationSummary
+from backend.core.context_builder import ContextBuilder
+from backend.core.tool_calling import execute_tool_calls, tool_metrics
+from backend.core.scheduler import llm_priority, Priority
 
 # --- Tools ---
 
@@ -82,31 +88,27 @@ async def query_graph(question: str):
     # Instead of guessing intent with keywords, we provide a rich context 
     # combining recent timeline (structure) and semantic search (content).
     
-    # 1. Get Timeline Context (Structure & Duration)
+    # 1. Get Timeline Context (Structure & Duration), newest first
     activities = graph_service.get_recent_activity(limit=15)
-    timeline_str = "Recent Timeline:\n"
-    if activities:
-        for act in activities:
-            timeline_str += f"- [{act['timestamp']}] {act['statement']} (Duration: {act['duration']})\n"
-    else:
-        timeline_str += "No recent activity recorded.\n"
 
     # 2. Semantic Search (Content)
     # We search for the specific question to find relevant past episodes
     memories = await hippocampus.recall(question, k=5)
-    memory_str = "Relevant Memories:\n"
-    if memories:
-        for m in memories:
-            memory_str += f"- [{m.timestamp}] {m.statement}\n"
-    else:
-        memory_str += "No specific memories found for this query.\n"
-        
+    
     # 3. Grind Detection (Specific Pattern)
     # We always run this as a background check for context
     grind = graph_service.detect_grind_pattern()
-    grind_str = f"Grind Pattern Detected: {grind['detected']} (Duration: {grind['duration']}m)\n"
     
-    return f"Graph Analysis Results:\n\n{timeline_str}\n{memory_str}\n{grind_str}"
+    # Budgeted assembly: duplicates collapse, oldest/least relevant lines go first
+    context = (ContextBuilder("query_graph")
+        .add_items("Recent Timeline", [f"- [{act['timestamp']}] {act['statement']} (Duration: {act['duration']})" for act in activities],
+                   empty="No recent activity recorded.")
+        .add_items("Relevant Memories", [f"- [{m.timestamp}] {m.statement}" for m in memories],
+                   empty="No specific memories found for this query.")
+        .add_text("Grind Pattern Detected", f"{grind['detected']} (Duration: {grind['duration']}m)")
+        .build())
+    
+    return f"Graph Analysis Results:\n\n{context}"
 
 
 
@@ -151,95 +153,73 @@ tools = [update_profile, manage_memory, set_preference, query_graph, set_risk_ov
 
 # --- Agent ---
 
+TOOL_REGISTRY = {t.name: t for t in tools}
+TOOL_SCHEMAS = [convert_to_openai_tool(t) for t in tools]
+MAX_TURNS = 5
+
 class LiaisonState(Dict):
-    messages: List[Any]
+    messages: List[Any] # Recent session turns + the new user message
     user_profile: str
+    summary: str # Rolling summary of older turns (see core/session_store.py)
 
-async def liaison_node(state: LiaisonState):
+async def liaison_node(state: LiaisonState, config: Optional[RunnableConfig] = None):
     print("--- [Liaison] Thinking ---")
     
+    # Streaming callbacks (set by the chat handler; absent in batch use)
+    configurable = (config or {}).get("configurable", {})
+    on_token = configurable.get("on_token")
+    on_reset = configurable.get("on_reset")
+    
     # 1. Get Profile Summary
     profile_summary = f"User: {profile_service.profile.name}. Role: {profile_service.profile.role}."
     
-    # 2. Construct Prompt
-    autonomy_instruction = """
-    CRITICAL INSTRUCTION: You are an AUTONOMOUS AGENT.
-    1. **On-Demand Memory**: You do NOT have the full user profile loaded. If you need to know about allergies, habits, or preferences to answer a question, use `fetch_profile_context`.
-    2. **Proactivity**: If you see a risk, act on it.
-    3. **Dynamic Modeling**: If the user mentions a physical ailment (e.g., "My back hurts"), you MUST use `update_profile(key='condition', value='Back Pain', action='add')` immediately. This adjusts the risk engine.
-    4. **Task Chaining**: Combine tools to solve problems.
-    """
-    
-    system_msg = SystemMessage(content=LIAISON_PROMPT.format(user_profile=profile_summary) + "\n\n" + autonomy_instruction)
+    # 2. Construct Prompt (stable persona + autonomy rules first, profile last)
+    context = LIAISON_CONTEXT.format(user_profile=profile_summary)
+    if state.get("summary"):
+        context += LIAISON_SUMMARY_CONTEXT.format(summary=state["summary"])
+    system_msg = SystemMessage(content=LIAISON_PROMPT + "\n\n" + LIAISON_AUTONOMY_INSTRUCTION + context)
     messages = [system_msg] + state["messages"]
     
-    # 3. ReAct Loop
-    max_turns = 5
+    # 3. ReAct Loop (native function calling; a turn may request several tools)
     current_messages = messages.copy()
     new_messages = [] # Track messages generated in this node
+    calls_per_turn = []
     
-    for _ in range(max_turns):
-        # Call LLM
-        response_text = await llm_provider.generate_chat(current_messages)
-        
-        # Check for Tool Call (JSON block)
-        import re
-        import json
+    for _ in range(MAX_TURNS):
+        turn = await llm_provider.generate_tool_turn(current_messages, TOOL_SCHEMAS, on_token=on_token)
+        calls_per_turn.append(len(turn.tool_calls))
         
-        tool_match = re.search(r"```json\s*(\{.*?\})\s*```", response_text, re.DOTALL)
-        
-        if tool_match:
-            try:
-                tool_data = json.loads(tool_match.group(1))
-                tool_name = tool_data.get("tool")
-                tool_args = tool_data.get("args", {})
-                
-                print(f"--- [Liaison] Executing Tool: {tool_name} with {tool_args} ---")
-                
-                # Execute Tool
-                tool_result = "Error: Tool not found."
-                if tool_name == "update_profile":
-                    tool_result = update_profile.invoke(tool_args)
-                elif tool_name == "manage_memory":
-                    tool_result = await manage_memory.ainvoke(tool_args)
-                elif tool_name == "set_preference":
-                    tool_result = set_preference.invoke(tool_args)
-                elif tool_name == "query_graph":
-                    tool_result = await query_graph.ainvoke(tool_args)
-                elif tool_name == "set_risk_override":
-                    tool_result = set_risk_override.invoke(tool_args)
-                elif tool_name == "fetch_profile_context":
-                    tool_result = fetch_profile_context.invoke(tool_args)
-                
-                print(f"--- [Liaison] Tool Result: {tool_result} ---")
-                
-                # Append to history
-                ai_msg = AIMessage(content=response_text)
-                tool_msg = HumanMessage(content=f"Tool Output: {tool_result}")
-                
-                current_messages.append(ai_msg)
-                current_messages.append(tool_msg)
-                
-                new_messages.append(ai_msg)
-                new_messages.append(tool_msg)
-                
-            except Exception as e:
-                print(f"--- [Liaison] Tool Execution Error: {e} ---")
-                ai_msg = AIMessage(content=response_text)
-                err_msg = HumanMessage(content=f"Tool Execution Error: {e}")
-                
-                current_messages.append(ai_msg)
-                current_messages.append(err_msg)
-                
-                new_messages.append(ai_msg)
-                new_messages.append(err_msg)
-        else:
+        if not turn.tool_calls:
             # No tool call, just return the response
-            final_msg = AIMessage(content=response_text)
-            new_messages.append(final_msg)
+            tool_metrics.record_run(len(calls_per_turn), calls_per_turn)
+            new_messages.append(AIMessage(content=turn.text))
             return {"messages": new_messages}
+        
+        if turn.streamed and on_reset is not None:
+            await on_reset() # Prose before the tool calls was shown: drop it
+        
+        print(f"--- [Liaison] Executing {len(turn.tool_calls)} tool(s): {[c.name for c in turn.tool_calls]} ---")
+        
+        # Independent calls from one turn run concurrently
+        ai_msg = turn.to_message()
+        tool_msgs = await execute_tool_calls(turn.tool_calls, TOOL_REGISTRY)
+        
+        current_messages += [ai_msg, *tool_msgs]
+        new_messages += [ai_msg, *tool_msgs]
             
-    return {"messages": new_messages + [AIMessage(content="I've done a lot of thinking. Let's pause.")]}
+    tool_metrics.record_run(len(calls_per_turn), calls_per_turn, hit_limit=True)
+    pause_text = "I've done a lot of thinking. Let's pause."
+    if on_token is not None:
+        await on_token(pause_text)
+    return {"messages": new_messages + [AIMessage(content=pause_text)]}
+
+async def summarize_conversation(summary: str, messages: List[Any]) -> str:
+    """Folds older session turns into the rolling summary (runs off the reply path)."""
+    transcript = "\n".join(f"{'User' if m.type == 'human' else 'Liaison'}: {m.content}" for m in messages)
+    context = f"Previous Summary: {summary or 'None'}\n\nNew Turns:\n{transcript}"
+    with llm_priority(Priority.BACKGROUND):
+        result = await llm_provider.generate_structured(CONVERSATION_SUMMARY_PROMPT, ConversationSummary, context=context, call_site="chat_summary")
+    return result.summary
 
 # --- Workflow ---
 
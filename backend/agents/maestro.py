@@ -51,7 +51,8 @@ async def run_maestro(risk_level: str, emotional_tone: str, activity: str) -> En
         result = await llm_provider.generate_structured(
             prompt=MAESTRO_PROMPT,
             schema_model=EnvironmentState,
-            context=context
+            context=context,
+            call_site="maestro"
         )
         return result
     except Exception as e:
@@ -40,3 +40,9 @@ class MemoryEntry(BaseModel):
     remarks: Optional[str] = Field(description="Meta-analysis or additional notes.", default=None)
     id: Optional[str] = Field(description="Unique ID of the memory record.", default=None)
 
+
+class ConversationSummary(BaseModel):
+    """
+    Rolling summary of older chat turns (Liaison session memory).
+    """
+    summary: str = Field(description="Concise summary of the conversation so far: facts the user shared, requests, decisions and open threads.")
@@ -1,5 +1,4 @@
 import subprocess
-import screen_brightness_control as sbc
 from backend.core.interfaces import BaseActuator
 from backend.agents.schemas import CouncilActionPlan
 
@@ -45,6 +44,7 @@ class BrightnessActuator(BaseActuator):
         try:
             # sbc.set_brightness(target_brightness)
             # For safety/demo, we just print if it fails (e.g. external monitor issues)
+            import screen_brightness_control as sbc # Imported lazily (slow, platform-specific)
             sbc.set_brightness(target_brightness)
             print(f"[Actuator] Screen Brightness set to {target_brightness}%")
         except Exception as e:
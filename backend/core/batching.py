@@ -0,0 +1,69 @@
+import asyncio
+from typing import Awaitable, Callable, Generic, List, Optional, Set, Tuple, TypeVar
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+class MicroBatcher(Generic[K, V]):
+    """
+    Merges concurrent single-item requests into one batched call.
+
+    Items submitted within `window` seconds of the first pending item (or until
+    `max_batch` items are pending) are flushed together through `batch_fn`,
+    which must return one result per input, in order.
+    """
+    def __init__(self, batch_fn: Callable[[List[K]], Awaitable[List[V]]], window: float = 0.01, max_batch: int = 64):
+        self.batch_fn = batch_fn
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: List[Tuple[K, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # The loop only holds tasks weakly: keep in-flight flushes alive until done
+        self._tasks: Set[asyncio.Task] = set()
+        self.stats = {"items": 0, "batches": 0}
+
+    async def submit(self, item: K) -> V:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        self.stats["items"] += 1
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        # Callers that were cancelled while waiting don't need a slot in the request
+        batch = [(item, fut) for item, fut in batch if not fut.done()]
+        if batch:
+            self.stats["batches"] += 1
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[K, asyncio.Future]]):
+        try:
+            results = await self.batch_fn([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"Batch function returned {len(results)} results for {len(batch)} items")
+        except Exception as e:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        for (_, fut), result in zip(batch, results):
+            if not fut.done():
+                fut.set_result(result)
+
+    def get_stats(self) -> dict:
+        batches = self.stats["batches"]
+        return {
+            **self.stats,
+            "avg_batch_size": round(self.stats["items"] / batches, 2) if batches else 0.0,
+        }
@@ -0,0 +1,272 @@
+import os
+import json
+import gzip
+import zlib
+import hashlib
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+from backend.agents.schemas import MemoryEntry
+from backend.core.consolidation import to_epoch
+from backend.core.text_index import keyword_terms, memory_body
+
+COLD_STORAGE_DIR = "backend/data/cold_storage"
+SEGMENT_SUFFIX = ".jsonl.gz"
+UNDATED = "undated"
+
+class ColdArchive:
+    """
+    Cold storage for consolidated raw memories.
+
+    Memories are partitioned by month into gzip segments
+    (segments/2025-03.jsonl.gz). Each append adds one gzip member to a
+    segment (nothing is rewritten) and one line to the sidecar index.jsonl
+    with the member's byte offset, length, time range and count. Readers
+    seek straight to the members overlapping a date range and decompress
+    only those. Segments stay plain gzip files (`zcat` reads them).
+
+    Each index line also lists the distinct keywords of its block: a
+    coarse index that lets `search` pick the few blocks worth
+    decompressing for a query.
+    """
+    def __init__(self, root: str = COLD_STORAGE_DIR, compresslevel: int = 6):
+        self.root = root
+        self.segments_dir = os.path.join(root, "segments")
+        self.index_path = os.path.join(root, "index.jsonl")
+        self.legacy_path = os.path.join(root, "archive.jsonl")
+        self.compresslevel = compresslevel
+        self._lock = threading.Lock()
+        self._blocks: Optional[List[Dict[str, Any]]] = None
+
+    def append(self, entries: List[MemoryEntry]) -> int:
+        """Archives `entries` (blocking: call via asyncio.to_thread)."""
+        with self._lock:
+            self._migrate_legacy()
+            return self._append(entries)
+
+    def _append(self, entries: List[MemoryEntry]) -> int:
+        partitions: Dict[str, List[Any]] = {}
+        for entry in entries:
+            ts = to_epoch(entry.timestamp)
+            name = datetime.fromtimestamp(ts).strftime("%Y-%m") if ts is not None else UNDATED
+            partitions.setdefault(name, []).append((ts, entry))
+
+        os.makedirs(self.segments_dir, exist_ok=True)
+        blocks = self._load_index()
+        for name, rows in sorted(partitions.items()):
+            rows.sort(key=lambda row: row[0] or 0)
+            payload = "".join(entry.model_dump_json() + "\n" for _, entry in rows).encode()
+            data = gzip.compress(payload, compresslevel=self.compresslevel)
+            segment = name + SEGMENT_SUFFIX
+            with open(os.path.join(self.segments_dir, segment), "ab") as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write(data)
+            block = self._block(segment, offset, len(data), payload)
+            # Segment first, index second: a crash in between leaves unindexed bytes, never a bad pointer
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(self._dumps(block) + "\n")
+            blocks.append(block)
+        return len(entries)
+
+    @staticmethod
+    def _block(segment: str, offset: int, length: int, payload: bytes) -> Dict[str, Any]:
+        lines = payload.splitlines()
+        records = [json.loads(line) for line in lines]
+        stamps = [ts for ts in (to_epoch(r.get("timestamp")) for r in records) if ts is not None]
+        terms = set()
+        for record in records:
+            terms |= keyword_terms(memory_body(record))
+        return {"segment": segment, "offset": offset, "length": length,
+                "start": min(stamps) if stamps else None, "end": max(stamps) if stamps else None,
+                "count": len(lines), "raw_bytes": len(payload), "terms": frozenset(terms)}
+
+    @staticmethod
+    def _dumps(block: Dict[str, Any]) -> str:
+        return json.dumps({**block, "terms": sorted(block["terms"])})
+
+    def scan(self, start: Optional[str] = None, end: Optional[str] = None) -> Iterator[MemoryEntry]:
+        """
+        Streams archived memories timestamped in [start, end) (ISO strings,
+        either side open), oldest block first. Only overlapping blocks are
+        read and decompressed; each memory is yielded once.
+        """
+        start_ts = to_epoch(start) if start else None
+        end_ts = to_epoch(end) if end else None
+        with self._lock:
+            self._migrate_legacy()
+            blocks = [b for b in self._load_index() if self._overlaps(b, start_ts, end_ts)]
+        blocks.sort(key=lambda b: b["start"] if b["start"] is not None else float("inf"))
+
+        seen = set()
+        handles: Dict[str, Any] = {}
+        try:
+            for block in blocks:
+                f = handles.get(block["segment"])
+                if f is None:
+                    f = handles[block["segment"]] = open(os.path.join(self.segments_dir, block["segment"]), "rb")
+                for line in self._read(f, block):
+                    entry = MemoryEntry.model_validate_json(line)
+                    ts = to_epoch(entry.timestamp)
+                    if (start_ts is not None or end_ts is not None) and ts is None:
+                        continue
+                    if (start_ts is not None and ts < start_ts) or (end_ts is not None and ts >= end_ts):
+                        continue
+                    key = entry.id or line
+                    if key in seen: # Re-archived after a rehydrate
+                        continue
+                    seen.add(key)
+                    yield entry
+        finally:
+            for f in handles.values():
+                f.close()
+
+    @staticmethod
+    def _read(f, block: Dict[str, Any]) -> List[bytes]:
+        f.seek(block["offset"])
+        return gzip.decompress(f.read(block["length"])).splitlines()
+
+    def search(self, query: str, k: int, filters: Optional[Dict[str, Any]] = None, max_blocks: int = 4) -> List[tuple]:
+        """
+        Keyword search over the archive: the `max_blocks` blocks sharing the
+        most query terms (newest first on ties) are decompressed and their
+        memories ranked by the share of query terms they contain. Returns up
+        to k (id, score in [0, 1], metadata); `filters` as in recall.
+        """
+        terms = keyword_terms(query)
+        if not terms or k <= 0 or max_blocks <= 0:
+            return []
+        filters = filters or {}
+        start_ts, end_ts = filters.get("start_ts"), filters.get("end_ts")
+        with self._lock:
+            self._migrate_legacy()
+            blocks = self._load_index()
+            if any("terms" not in b for b in blocks):
+                self._rebuild_index() # Indexed before blocks carried keywords
+                blocks = self._blocks
+            ranked = [(len(terms & b["terms"]), b) for b in blocks if self._overlaps(b, start_ts, end_ts)]
+        ranked = [(matched, b) for matched, b in ranked if matched]
+        ranked.sort(key=lambda item: (item[0], item[1]["end"] or 0), reverse=True)
+
+        hits = {}
+        handles: Dict[str, Any] = {}
+        try:
+            for _, block in ranked[:max_blocks]:
+                f = handles.get(block["segment"])
+                if f is None:
+                    f = handles[block["segment"]] = open(os.path.join(self.segments_dir, block["segment"]), "rb")
+                for line in self._read(f, block):
+                    record = json.loads(line)
+                    if any(filters.get(field) is not None and record.get(field) != filters[field] for field in ("scene", "user_state")):
+                        continue
+                    ts = to_epoch(record.get("timestamp"))
+                    if (start_ts is not None or end_ts is not None) and ts is None:
+                        continue
+                    if (start_ts is not None and ts < start_ts) or (end_ts is not None and ts >= end_ts):
+                        continue
+                    matched = len(terms & keyword_terms(memory_body(record)))
+                    if matched:
+                        memory_id = record.get("id") or "archived-" + hashlib.sha1(line).hexdigest()[:16]
+                        hits[memory_id] = (memory_id, matched / len(terms), {key: value for key, value in record.items() if value is not None}, ts or 0)
+        finally:
+            for f in handles.values():
+                f.close()
+        best = sorted(hits.values(), key=lambda hit: (hit[1], hit[3]), reverse=True)
+        return [hit[:3] for hit in best[:k]]
+
+    def scan_batches(self, start: Optional[str] = None, end: Optional[str] = None, size: int = 256) -> Iterator[List[MemoryEntry]]:
+        batch = []
+        for entry in self.scan(start, end):
+            batch.append(entry)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    @staticmethod
+    def _overlaps(block: Dict[str, Any], start_ts: Optional[float], end_ts: Optional[float]) -> bool:
+        if block["start"] is None:
+            return start_ts is None and end_ts is None # Undated memories only show up in full scans
+        if start_ts is not None and block["end"] < start_ts:
+            return False
+        return end_ts is None or block["start"] < end_ts
+
+    def _load_index(self) -> List[Dict[str, Any]]:
+        if self._blocks is None:
+            self._blocks = []
+            if os.path.exists(self.index_path):
+                with open(self.index_path, encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            block = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue # Torn last line
+                        if "terms" in block:
+                            block["terms"] = frozenset(block["terms"])
+                        self._blocks.append(block)
+        return self._blocks
+
+    def rebuild_index(self) -> int:
+        """Re-derives index.jsonl by walking the gzip members of every segment (recovery)."""
+        with self._lock:
+            return self._rebuild_index()
+
+    def _rebuild_index(self) -> int:
+        blocks = []
+        names = sorted(os.listdir(self.segments_dir)) if os.path.isdir(self.segments_dir) else []
+        for segment in (n for n in names if n.endswith(SEGMENT_SUFFIX)):
+            with open(os.path.join(self.segments_dir, segment), "rb") as f:
+                data = f.read()
+            offset = 0
+            while offset < len(data):
+                member = zlib.decompressobj(wbits=31)
+                try:
+                    payload = member.decompress(memoryview(data)[offset:])
+                except zlib.error:
+                    print(f"⚠️ [ColdStorage] Truncated member in {segment} at byte {offset}; ignoring the rest")
+                    break
+                length = len(data) - offset - len(member.unused_data)
+                blocks.append(self._block(segment, offset, length, payload))
+                offset += length
+        os.makedirs(self.root, exist_ok=True)
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for block in blocks:
+                f.write(self._dumps(block) + "\n")
+        os.replace(tmp, self.index_path)
+        self._blocks = blocks
+        print(f"📦 [ColdStorage] Rebuilt the archive index ({len(blocks)} blocks)")
+        return len(blocks)
+
+    def _migrate_legacy(self):
+        """Moves the old single archive.jsonl into segments (lock held)."""
+        if not os.path.exists(self.legacy_path):
+            return
+        entries = []
+        with open(self.legacy_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(MemoryEntry.model_validate_json(line))
+                except ValueError:
+                    continue
+        for i in range(0, len(entries), 1000):
+            self._append(entries[i:i + 1000])
+        os.replace(self.legacy_path, self.legacy_path + ".migrated")
+        print(f"📦 [ColdStorage] Migrated {len(entries)} memories from archive.jsonl into segments")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            blocks = list(self._load_index())
+        compressed = sum(b["length"] for b in blocks)
+        raw = sum(b.get("raw_bytes", 0) for b in blocks)
+        dated = [b for b in blocks if b["start"] is not None]
+        return {
+            "segments": len({b["segment"] for b in blocks}),
+            "blocks": len(blocks),
+            "memories": sum(b["count"] for b in blocks),
+            "compressed_bytes": compressed,
+            "raw_bytes": raw,
+            "compression_ratio": round(raw / compressed, 1) if compressed else None,
+            "oldest": datetime.fromtimestamp(min(b["start"] for b in dated)).isoformat() if dated else None,
+            "newest": datetime.fromtimestamp(max(b["end"] for b in dated)).isoformat() if dated else None,
+        }
@@ -0,0 +1,268 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from backend.core.llm import llm_provider
+from backend.agents.schemas import MemoryEntry
+
+# Episodes carry this outcome; they are never consolidated again
+CONSOLIDATED = "Consolidated"
+# What the providers return instead of raising when a summary fails
+FAILED_SUMMARIES = {"", "Summary failed.", "Failed to generate summary."}
+
+CONSOLIDATION_WINDOW = os.getenv("CONSOLIDATION_WINDOW", "hour") # hour | session
+CONSOLIDATION_CONCURRENCY = int(os.getenv("CONSOLIDATION_CONCURRENCY", "4"))
+CONSOLIDATION_CHUNK_CHARS = int(os.getenv("CONSOLIDATION_CHUNK_CHARS", "6000"))
+CONSOLIDATION_MIN_WINDOW = int(os.getenv("CONSOLIDATION_MIN_WINDOW", "3"))
+CONSOLIDATION_MIN_AGE = float(os.getenv("CONSOLIDATION_MIN_AGE", "3600"))
+CONSOLIDATION_SESSION_GAP = float(os.getenv("CONSOLIDATION_SESSION_GAP", "1800"))
+
+def to_epoch(timestamp: Any) -> Optional[float]:
+    """ISO timestamp -> epoch seconds (the numeric `ts` metadata Chroma can range-filter)."""
+    try:
+        return datetime.fromisoformat(str(timestamp)).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+def _digest(ids: List[str]) -> str:
+    return hashlib.sha1("\n".join(sorted(ids)).encode()).hexdigest()[:16]
+
+class SummaryFailed(Exception):
+    pass
+
+class Consolidator:
+    """
+    Windowed, map-reduce Wake-Up Consolidation.
+
+    Only unconsolidated memories inside [start, end) are read, through a
+    paged metadata filter on `ts`. They are grouped into windows (clock
+    hours, or sessions split on idle gaps). Each window is summarized map-
+    reduce style: its chunks are summarized concurrently, then the partial
+    summaries are combined into one episode. A single semaphore bounds LLM
+    calls across all windows. A window that has closed (its hour or session
+    is over) with fewer than `min_window` memories is folded into the next
+    closed window, or the previous one, so sparse hours are consolidated too.
+
+    Partial and window summaries are checkpointed as they complete, so an
+    interrupted run resumes without repeating LLM work; finished windows
+    are archived and pruned, so they are not selected again.
+    """
+    def __init__(self, store, window: str = CONSOLIDATION_WINDOW, concurrency: int = CONSOLIDATION_CONCURRENCY,
+                 chunk_chars: int = CONSOLIDATION_CHUNK_CHARS, min_window: int = CONSOLIDATION_MIN_WINDOW,
+                 min_age: float = CONSOLIDATION_MIN_AGE, session_gap: float = CONSOLIDATION_SESSION_GAP,
+                 checkpoint_path: Optional[str] = None, page_size: int = 500):
+        if window not in ("hour", "session"):
+            raise ValueError(f"Unknown consolidation window: {window}")
+        data_dir = os.path.dirname(os.path.normpath(store.path))
+        self.store = store
+        self.window = window
+        self.concurrency = concurrency
+        self.chunk_chars = chunk_chars
+        self.min_window = min_window
+        self.min_age = min_age
+        self.session_gap = session_gap
+        self.checkpoint_path = checkpoint_path or os.path.join(data_dir, "consolidation_checkpoint.json")
+        self.page_size = page_size
+
+    async def run(self, start: Optional[str] = None, end: Optional[str] = None) -> Dict[str, Any]:
+        """Consolidates memories timestamped in [start, end). Defaults: everything older than `min_age`."""
+        started = time.monotonic()
+        start_ts = to_epoch(start) if start else 0.0
+        end_ts = to_epoch(end) if end else time.time() - self.min_age
+        report = {"candidates": 0, "windows": 0, "episodes": 0, "archived": 0, "skipped": 0,
+                  "failed_windows": 0, "llm_calls": 0, "resumed_summaries": 0}
+
+        await asyncio.to_thread(self.store.backfill_timestamps)
+        rows = await asyncio.to_thread(self._fetch, start_ts, end_ts)
+        report["candidates"] = len(rows)
+        if not rows:
+            print("[Hippocampus] No memories to consolidate.")
+            return report
+
+        windows = self._windows(rows, end_ts)
+        report["windows"] = len(windows)
+        state = self._load_checkpoint()
+        for stale in set(state["windows"]) - set(windows):
+            del state["windows"][stale] # Pruned or out of range since the interrupted run
+        limit = asyncio.Semaphore(self.concurrency)
+        print(f"[Hippocampus] Consolidating {len(rows)} memories in {len(windows)} {self.window} windows...")
+        await asyncio.gather(*(self._consolidate_window(key, entries, end_ts, state, limit, report)
+                               for key, entries in windows.items()))
+
+        if not state["windows"] and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        report["seconds"] = round(time.monotonic() - started, 3)
+        print(f"[Hippocampus] Consolidation done: {report['episodes']} episodes from {report['archived']} memories "
+              f"({report['llm_calls']} LLM calls, {report['resumed_summaries']} resumed)")
+        return report
+
+    def _fetch(self, start_ts: float, end_ts: float) -> List[MemoryEntry]:
+        where = {"$and": [{"ts": {"$gte": start_ts}}, {"ts": {"$lt": end_ts}}, {"outcome": {"$ne": CONSOLIDATED}}]}
+        entries, offset = [], 0
+        while True:
+            page = self.store.collection.get(where=where, include=["metadatas"], limit=self.page_size, offset=offset)
+            for memory_id, meta in zip(page["ids"], page["metadatas"]):
+                entry = self.store._from_metadata(meta, memory_id)
+                if entry is not None and "Summary of" not in entry.statement: # Pre-`outcome` episodes
+                    entries.append(entry)
+            if len(page["ids"]) < self.page_size:
+                break
+            offset += self.page_size
+        entries.sort(key=lambda e: to_epoch(e.timestamp))
+        return entries
+
+    def _windows(self, entries: List[MemoryEntry], end_ts: float) -> Dict[str, List[MemoryEntry]]:
+        """Groups time-sorted entries into clock hours or gap-separated sessions."""
+        windows: Dict[str, List[MemoryEntry]] = {}
+        last_ts, key = None, None
+        for entry in entries:
+            ts = to_epoch(entry.timestamp)
+            if self.window == "hour":
+                key = datetime.fromtimestamp(ts).strftime("%Y-%m-%dT%H:00")
+            elif last_ts is None or ts - last_ts > self.session_gap:
+                key = datetime.fromtimestamp(ts).strftime("session-%Y-%m-%dT%H:%M:%S")
+            windows.setdefault(key, []).append(entry)
+            last_ts = ts
+        return self._fold(windows, end_ts)
+
+    def _closed(self, key: str, entries: List[MemoryEntry], end_ts: float) -> bool:
+        """Whether no memory in [start, end) can still join the window."""
+        if self.window == "hour":
+            return to_epoch(key) + 3600 <= end_ts
+        return to_epoch(entries[-1].timestamp) + self.session_gap <= end_ts
+
+    def _fold(self, windows: Dict[str, List[MemoryEntry]], end_ts: float) -> Dict[str, List[MemoryEntry]]:
+        """
+        Folds closed windows smaller than `min_window` forward into the next
+        closed window (the last ones backward), since they will never fill.
+        A lone undersized closed window is consolidated on its own; open
+        windows are left to fill.
+        """
+        folded: Dict[str, List[MemoryEntry]] = {}
+        carry: List[MemoryEntry] = []
+        closed = [(key, entries) for key, entries in windows.items() if self._closed(key, entries, end_ts)]
+        for key, entries in closed:
+            carry += entries
+            if len(carry) >= self.min_window:
+                folded[key], carry = carry, []
+        if carry:
+            if folded:
+                folded[next(reversed(folded))] += carry
+            else:
+                folded[closed[-1][0]] = carry
+        for key, entries in windows.items():
+            if not self._closed(key, entries, end_ts):
+                folded[key] = entries
+        return folded
+
+    def _chunks(self, entries: List[MemoryEntry]) -> List[List[MemoryEntry]]:
+        """Splits a window so each map prompt stays under `chunk_chars`."""
+        chunks, current, size = [], [], 0
+        for entry in entries:
+            line = len(self._line(entry))
+            if current and size + line > self.chunk_chars:
+                chunks.append(current)
+                current, size = [], 0
+            current.append(entry)
+            size += line
+        if current:
+            chunks.append(current)
+        return chunks
+
+    @staticmethod
+    def _line(entry: MemoryEntry) -> str:
+        return f"[{entry.timestamp}] {entry.statement}"
+
+    async def _summarize(self, context: str, limit: asyncio.Semaphore, report: Dict[str, Any]) -> str:
+        async with limit:
+            report["llm_calls"] += 1
+            summary = await llm_provider.summarize_day(context)
+        if not summary or summary.strip() in FAILED_SUMMARIES:
+            raise SummaryFailed(summary)
+        return summary.strip()
+
+    async def _summarize_window(self, key: str, entries: List[MemoryEntry], digest: str, state: Dict[str, Any],
+                                limit: asyncio.Semaphore, report: Dict[str, Any]) -> str:
+        saved = state["windows"].get(key)
+        if not saved or saved["digest"] != digest:
+            saved = state["windows"][key] = {"digest": digest, "partials": {}, "summary": None}
+        if saved["summary"]:
+            report["resumed_summaries"] += 1
+            return saved["summary"]
+
+        async def map_chunk(chunk: List[MemoryEntry]) -> str:
+            chunk_digest = _digest([e.id for e in chunk])
+            if chunk_digest in saved["partials"]:
+                report["resumed_summaries"] += 1
+                return saved["partials"][chunk_digest]
+            partial = await self._summarize("\n".join(self._line(e) for e in chunk), limit, report)
+            saved["partials"][chunk_digest] = partial
+            self._save_checkpoint(state)
+            return partial
+
+        # Map: chunks in parallel. Reduce: fold the partial summaries into one
+        partials = await asyncio.gather(*(map_chunk(chunk) for chunk in self._chunks(entries)))
+        if len(partials) == 1:
+            summary = partials[0]
+        else:
+            summary = await self._summarize("\n".join(f"[Part {i + 1}] {p}" for i, p in enumerate(partials)), limit, report)
+        saved["summary"] = summary
+        self._save_checkpoint(state)
+        return summary
+
+    async def _consolidate_window(self, key: str, entries: List[MemoryEntry], end_ts: float, state: Dict[str, Any],
+                                  limit: asyncio.Semaphore, report: Dict[str, Any]):
+        if len(entries) < self.min_window and not self._closed(key, entries, end_ts):
+            report["skipped"] += len(entries) # Still open: picked up once it fills or closes
+            return
+        digest = _digest([e.id for e in entries])
+        try:
+            summary = await self._summarize_window(key, entries, digest, state, limit, report)
+        except Exception as e:
+            print(f"[Hippocampus] Consolidation of {key} failed: {e}")
+            report["failed_windows"] += 1
+            return
+
+        first, last = datetime.fromisoformat(entries[0].timestamp), datetime.fromisoformat(entries[-1].timestamp)
+        episode = MemoryEntry(
+            id=f"episode-{digest}", # Deterministic: re-storing after a crash overwrites, never duplicates
+            timestamp=entries[0].timestamp,
+            statement=f"Summary of {first:%Y-%m-%d %H:%M}-{last:%H:%M}: {summary}",
+            scene="Mind Palace",
+            outcome=CONSOLIDATED,
+            entities=[],
+            user_state="Reflective",
+            remarks=f"Generated by Wake-Up Consolidation from {len(entries)} memories"
+        )
+        stored = await self.store.add_memories([episode]) # Already structured: no re-extraction
+        if stored["stored"] != 1:
+            report["failed_windows"] += 1
+            return
+        report["episodes"] += 1
+
+        # Cold Storage (Zero Data Loss), then prune from active memory
+        await asyncio.to_thread(self.store.cold_storage.append, entries)
+        await asyncio.to_thread(self.store._delete_ids, [e.id for e in entries])
+        report["archived"] += len(entries)
+        state["windows"].pop(key, None)
+        self._save_checkpoint(state)
+
+    def _load_checkpoint(self) -> Dict[str, Any]:
+        try:
+            with open(self.checkpoint_path, encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("windows"):
+                print(f"[Hippocampus] Resuming consolidation ({len(state['windows'])} windows in progress)")
+            return {"windows": state.get("windows", {})}
+        except (OSError, json.JSONDecodeError):
+            return {"windows": {}}
+
+    def _save_checkpoint(self, state: Dict[str, Any]):
+        os.makedirs(os.path.dirname(self.checkpoint_path) or ".", exist_ok=True)
+        tmp = self.checkpoint_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.checkpoint_path)
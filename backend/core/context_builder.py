@@ -0,0 +1,206 @@
+import os
+import re
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+# Context budgets (estimated tokens) per prompt role. This covers the dynamic
+# context only (input, memories, timelines); the static persona prompt is
+# constant and not counted.
+ROLE_BUDGETS: Dict[str, int] = {
+    "triage": 600,
+    "doctor": 900,
+    "coach": 900,
+    "synthesizer": 800,
+    "query_graph": 1500,
+}
+
+# Near-duplicate threshold (Jaccard similarity of normalized word sets)
+DEDUPE_THRESHOLD = 0.8
+# Don't bother truncating an item into less than this many tokens
+MIN_TRUNCATED_TOKENS = 16
+# Reserved per item section for the "(+N ... omitted)" note
+OMISSION_NOTE_TOKENS = 8
+TRUNCATION_MARK = " …"
+
+def estimate_tokens(text: str) -> int:
+    """~4 characters per token (English prose); no tokenizer dependency."""
+    return (len(text) + 3) // 4 if text else 0
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    keep = max(0, max_tokens * 4 - len(TRUNCATION_MARK))
+    cut = text[:keep]
+    # Prefer a word boundary
+    if " " in cut[keep // 2:]:
+        cut = cut[:cut.rfind(" ")]
+    return cut.rstrip() + TRUNCATION_MARK
+
+_STRIP = re.compile(r"\[[^\]]*\]|\d+|[^\w\s]")
+
+def _signature(text: str) -> frozenset:
+    """Word set ignoring timestamps, numbers and punctuation."""
+    return frozenset(_STRIP.sub(" ", text.lower()).split())
+
+def _similar(a: frozenset, b: frozenset) -> bool:
+    if not a or not b:
+        return a == b
+    return len(a & b) / len(a | b) >= DEDUPE_THRESHOLD
+
+class _Section:
+    def __init__(self, title: str, text: Optional[str] = None, items: Optional[List[str]] = None, empty: str = "None"):
+        self.title = title
+        self.text = text # Text sections are always included
+        self.items = items or []
+        self.empty = empty
+        self.kept: List[Tuple[int, str, int]] = [] # (original index, text, duplicate count)
+        self.omitted = 0
+
+class ContextBuilder:
+    """
+    Assembles prompt context under a token budget.
+
+    Text sections (the input being judged) are always included and only
+    truncated if they alone exceed the budget. Item sections (memories,
+    timeline entries) are deduplicated, then filled most-valuable first:
+    callers pass items in value order (e.g. recall relevance, recency), and
+    the lowest-value items are truncated or dropped once the budget runs out.
+    Near-identical lines collapse into one line with a repeat count.
+    """
+    def __init__(self, role: str, budget: Optional[int] = None):
+        self.role = role
+        self.budget = budget if budget is not None else ROLE_BUDGETS.get(role, 1000)
+        self.sections: List[_Section] = []
+
+    def add_text(self, title: str, text: str) -> "ContextBuilder":
+        self.sections.append(_Section(title, text=str(text or "")))
+        return self
+
+    def add_items(self, title: str, items: List[str], empty: str = "None") -> "ContextBuilder":
+        """`items` must be ordered most valuable first. An empty title renders the items alone."""
+        self.sections.append(_Section(title, items=[i for i in items if i], empty=empty))
+        return self
+
+    def _dedupe(self, section: _Section) -> List[List]:
+        groups: List[List] = [] # [index, text, signature, count]
+        for index, item in enumerate(section.items):
+            sig = _signature(item)
+            for group in groups:
+                if _similar(group[2], sig):
+                    group[3] += 1
+                    break
+            else:
+                groups.append([index, item, sig, 1])
+        return groups
+
+    def build(self) -> str:
+        stats = {"input_tokens": 0, "deduped": 0, "dropped": 0, "truncated": 0}
+
+        # 1. Text sections (item sections reserve room for their header and note)
+        texts = [s for s in self.sections if s.text is not None]
+        item_sections = [s for s in self.sections if s.text is None]
+        reserved = sum((estimate_tokens(s.title + ":") + 1 if s.title else 0) + OMISSION_NOTE_TOKENS for s in item_sections)
+        for s in texts:
+            stats["input_tokens"] += estimate_tokens(s.text)
+        used = sum(estimate_tokens(f"{s.title}: {s.text}") + 1 for s in texts) + reserved
+        overflow = used - self.budget
+        for s in sorted(texts, key=lambda s: -estimate_tokens(s.text)):
+            if overflow <= 0:
+                break
+            size = estimate_tokens(s.text)
+            s.text = truncate_to_tokens(s.text, max(MIN_TRUNCATED_TOKENS, size - overflow))
+            overflow -= size - estimate_tokens(s.text)
+            stats["truncated"] += 1
+        used = sum(estimate_tokens(f"{s.title}: {s.text}") + 1 for s in texts) + reserved
+
+        # 2. Item sections: dedupe, then fill by value (round-robin across sections)
+        queues = []
+        for s in item_sections:
+            stats["input_tokens"] += sum(estimate_tokens(i) for i in s.items)
+            groups = self._dedupe(s)
+            stats["deduped"] += len(s.items) - len(groups)
+            queues.append(deque(groups))
+
+        remaining = self.budget - used
+        while any(queues):
+            for s, queue in zip(item_sections, queues):
+                if not queue:
+                    continue
+                index, text, _, count = queue.popleft()
+                line = text + (f" (x{count})" if count > 1 else "")
+                cost = estimate_tokens(line) + 1
+                if cost > remaining:
+                    if remaining >= MIN_TRUNCATED_TOKENS:
+                        line = truncate_to_tokens(line, remaining - 1)
+                        s.kept.append((index, line, count))
+                        stats["truncated"] += 1
+                        remaining -= estimate_tokens(line) + 1
+                    else:
+                        s.omitted += 1
+                    # Lower-value items in this section can't fit either
+                    s.omitted += len(queue)
+                    queue.clear()
+                    continue
+                s.kept.append((index, line, count))
+                remaining -= cost
+
+        # 3. Render in the original section and item order
+        lines = []
+        for s in self.sections:
+            if s.text is not None:
+                lines.append(f"{s.title}: {s.text}")
+                continue
+            if s.title:
+                lines.append(f"{s.title}:")
+            if not s.kept:
+                lines.append(s.empty if not s.omitted else f"({s.omitted} items omitted)")
+            for _, text, _ in sorted(s.kept):
+                lines.append(text)
+            if s.kept and s.omitted:
+                lines.append(f"(+{s.omitted} lower-ranked items omitted)")
+            stats["dropped"] += s.omitted
+
+        context = "\n".join(lines)
+        stats["output_tokens"] = estimate_tokens(context)
+        context_metrics.record(self.role, stats)
+        return context
+
+class ContextMetrics:
+    """Rolling per-role prompt-size stats (see /llm/stats)."""
+    def __init__(self, window: int = 256):
+        self._samples: Dict[str, Deque[dict]] = {}
+        self.window = window
+
+    def record(self, role: str, stats: dict):
+        self._samples.setdefault(role, deque(maxlen=self.window)).append(stats)
+
+    def get_stats(self) -> dict:
+        report = {}
+        for role, samples in self._samples.items():
+            n = len(samples)
+            report[role] = {
+                "budget": ROLE_BUDGETS.get(role),
+                "builds": n,
+                "avg_input_tokens": round(sum(s["input_tokens"] for s in samples) / n, 1),
+                "avg_output_tokens": round(sum(s["output_tokens"] for s in samples) / n, 1),
+                "max_output_tokens": max(s["output_tokens"] for s in samples),
+                "deduped": sum(s["deduped"] for s in samples),
+                "dropped": sum(s["dropped"] for s in samples),
+                "truncated": sum(s["truncated"] for s in samples),
+            }
+        return report
+
+def _parse_budget_overrides(raw: str) -> Dict[str, int]:
+    """'triage=800,query_graph=2000' -> {'triage': 800, 'query_graph': 2000}"""
+    overrides = {}
+    for pair in raw.split(","):
+        if "=" in pair:
+            role, value = (x.strip() for x in pair.split("=", 1))
+            if value.isdigit():
+                overrides[role] = int(value)
+    return overrides
+
+ROLE_BUDGETS.update(_parse_budget_overrides(os.getenv("CONTEXT_BUDGETS", "")))
+
+# Global Instance
+context_metrics = ContextMetrics()
@@ -0,0 +1,120 @@
+import os
+import re
+import math
+import hashlib
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "1") != "0"
+DEDUP_WINDOW = float(os.getenv("DEDUP_WINDOW", "1800")) # Seconds since a memory was last seen
+DEDUP_RECENT = int(os.getenv("DEDUP_RECENT", "64"))
+DEDUP_SIMHASH_BITS = int(os.getenv("DEDUP_SIMHASH_BITS", "3"))
+DEDUP_COSINE = float(os.getenv("DEDUP_COSINE", "0.95"))
+
+# Numbers followed by a time unit: a repeating activity's running duration
+DURATION = re.compile(r"\d+(?:\.\d+)?(?=\s*(?:hours?|hrs?|minutes?|mins?|seconds?|secs?|h|m|s)\b)")
+
+def measurements(text: str) -> tuple:
+    """Every number in `text` except durations (heart rate, blood pressure, counts...)."""
+    return tuple(re.findall(r"\d+(?:\.\d+)?", DURATION.sub(" ", text.lower())))
+
+def simhash(text: str) -> int:
+    """
+    64-bit SimHash over words and word pairs. Only durations are masked, so
+    "Work, Duration: 5 minutes" and "Work, Duration: 35 minutes" collide.
+    """
+    words = re.findall(r"[a-z]+|\d+|#", DURATION.sub("#", text.lower()))
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    weights = [0] * 64
+    for feature in features:
+        h = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+def cosine(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+class RecentMemory:
+    def __init__(self, memory_id: str, metadata: Dict[str, Any], embedding: List[float], last_ts: float):
+        self.id = memory_id
+        self.metadata = metadata
+        self.fingerprint = simhash(metadata.get("statement", ""))
+        self.values = measurements(metadata.get("statement", ""))
+        self.embedding = embedding
+        self.last_ts = last_ts
+
+class Deduplicator:
+    """
+    Ingest-time near-duplicate detection against the last `size` memories.
+
+    A new memory matches a recent one from the same scene, last seen
+    within `window` seconds, when the SimHash of its statement is within
+    `max_bits` (checked before embedding, so a match costs no LLM call)
+    or its embedding has cosine >= `min_cosine`, and both statements carry
+    the same measurements (any number but a duration): a reading that
+    differs in value is never merged away. Hippocampus then folds it into
+    the existing memory (count + time span) instead of storing it.
+    """
+    def __init__(self, enabled: bool = DEDUP_ENABLED, window: float = DEDUP_WINDOW, size: int = DEDUP_RECENT,
+                 max_bits: int = DEDUP_SIMHASH_BITS, min_cosine: float = DEDUP_COSINE):
+        self.enabled = enabled
+        self.window = window
+        self.max_bits = max_bits
+        self.min_cosine = min_cosine
+        self._recent: Deque[RecentMemory] = deque(maxlen=size)
+        self.stats = {"checked": 0, "merged_simhash": 0, "merged_cosine": 0}
+
+    def _candidates(self, scene: str, ts: float):
+        for recent in reversed(self._recent): # Newest first
+            if recent.metadata.get("scene", "").lower() == scene.lower() and 0 <= ts - recent.last_ts <= self.window:
+                yield recent
+
+    def has_candidates(self, scene: str, ts: float) -> bool:
+        """Whether any recent memory could match (if not, skip the dedup checks)."""
+        return self.enabled and next(self._candidates(scene, ts), None) is not None
+
+    def match_text(self, scene: str, statement: str, ts: float) -> Optional[RecentMemory]:
+        """Cheap pass: SimHash of the statement (before any embedding call)."""
+        if not self.enabled:
+            return None
+        self.stats["checked"] += 1
+        fingerprint, values = simhash(statement), measurements(statement)
+        for recent in self._candidates(scene, ts):
+            if recent.values == values and hamming(fingerprint, recent.fingerprint) <= self.max_bits:
+                self.stats["merged_simhash"] += 1
+                return recent
+        return None
+
+    def match_embedding(self, scene: str, statement: str, embedding: List[float], ts: float) -> Optional[RecentMemory]:
+        if not self.enabled or not embedding:
+            return None
+        values = measurements(statement)
+        for recent in self._candidates(scene, ts):
+            if recent.values == values and recent.embedding and cosine(embedding, recent.embedding) >= self.min_cosine:
+                self.stats["merged_cosine"] += 1
+                return recent
+        return None
+
+    def remember(self, memory_id: str, metadata: Dict[str, Any], embedding: List[float], ts: float):
+        if self.enabled:
+            self._recent.append(RecentMemory(memory_id, metadata, embedding, ts))
+
+    def forget(self, ids: List[str]):
+        gone = set(ids)
+        kept = [recent for recent in self._recent if recent.id not in gone]
+        self._recent.clear()
+        self._recent.extend(kept)
+
+    def clear(self):
+        self._recent.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        merged = self.stats["merged_simhash"] + self.stats["merged_cosine"]
+        return {**self.stats, "enabled": self.enabled, "recent": len(self._recent),
+                "merge_rate": round(merged / self.stats["checked"], 3) if self.stats["checked"] else 0.0}
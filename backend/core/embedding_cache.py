@@ -0,0 +1,143 @@
+import os
+import re
+import asyncio
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from array import array
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+CACHE_FILE = "backend/data/embedding_cache.sqlite3"
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for cache keys (NFC + collapsed whitespace)."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+def make_key(provider: str, model: str, text: str) -> str:
+    digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+    return f"{provider}:{model}:{digest}"
+
+class EmbeddingCache:
+    """
+    Content-addressed embedding cache.
+    Tier 1 is an in-memory LRU; tier 2 is a SQLite file that survives restarts.
+    Keys are (provider, model, sha256(normalized text)).
+    """
+    def __init__(self, path: str = CACHE_FILE, max_entries: int = 4096, persist: bool = True):
+        self.path = path
+        self.max_entries = max_entries
+        self.persist = persist
+        self._lru: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0}
+
+    def _conn(self) -> Optional[sqlite3.Connection]:
+        if not self.persist:
+            return None
+        if self._db is None:
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._db = sqlite3.connect(self.path, check_same_thread=False)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, dim INTEGER, vector BLOB)"
+                )
+                self._db.commit()
+            except Exception as e:
+                print(f"[EmbeddingCache] Disk tier unavailable ({e}). Using memory only.")
+                self.persist = False
+                self._db = None
+        return self._db
+
+    def _remember(self, key: str, vector: List[float]):
+        self._lru[key] = vector
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def get(self, provider: str, model: str, text: str) -> Optional[List[float]]:
+        key = make_key(provider, model, text)
+        with self._lock:
+            vector = self._lru.get(key)
+            if vector is not None:
+                self._lru.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return list(vector)
+
+            db = self._conn()
+            if db is not None:
+                row = db.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+                if row:
+                    vector = array("f")
+                    vector.frombytes(row[0])
+                    vector = vector.tolist()
+                    self._remember(key, vector)
+                    self.stats["disk_hits"] += 1
+                    return list(vector)
+
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, provider: str, model: str, text: str, vector: List[float]):
+        self.put_many(provider, model, [(text, vector)])
+
+    def put_many(self, provider: str, model: str, items: Iterable[Tuple[str, List[float]]]):
+        """Caches (text, vector) pairs: one SQLite transaction for the batch (blocking)."""
+        self._persist(self._remember_many(provider, model, items))
+
+    async def aput_many(self, provider: str, model: str, items: Iterable[Tuple[str, List[float]]]):
+        """put_many for the event loop: the memory tier is updated at once, the disk write runs in a thread."""
+        rows = self._remember_many(provider, model, items)
+        if rows and self.persist:
+            await asyncio.to_thread(self._persist, rows)
+
+    def _remember_many(self, provider: str, model: str, items: Iterable[Tuple[str, List[float]]]) -> List[tuple]:
+        rows = []
+        with self._lock:
+            for text, vector in items:
+                if not vector:
+                    continue # Never cache failed embeddings
+                key = make_key(provider, model, text)
+                self._remember(key, list(vector))
+                rows.append((key, len(vector), array("f", vector).tobytes()))
+            self.stats["writes"] += len(rows)
+        return rows
+
+    def _persist(self, rows: List[tuple]):
+        if not rows:
+            return
+        with self._lock:
+            db = self._conn()
+            if db is None:
+                return
+            try:
+                with db: # One transaction per batch
+                    db.executemany("INSERT OR REPLACE INTO embeddings (key, dim, vector) VALUES (?, ?, ?)", rows)
+            except Exception as e:
+                print(f"[EmbeddingCache] Disk write failed: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._lru.clear()
+            db = self._conn()
+            if db is not None:
+                db.execute("DELETE FROM embeddings")
+                db.commit()
+
+    def get_stats(self) -> Dict[str, float]:
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        lookups = hits + self.stats["misses"]
+        return {
+            **self.stats,
+            "memory_entries": len(self._lru),
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+# Global Instance
+embedding_cache = EmbeddingCache(
+    max_entries=int(os.getenv("EMBEDDING_CACHE_SIZE", "4096")),
+    persist=os.getenv("EMBEDDING_CACHE_PERSIST", "1") != "0"
+)
@@ -0,0 +1,218 @@
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Callable, List, Optional, TYPE_CHECKING
+import httpx
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+def is_endpoint_failure(error: BaseException) -> bool:
+    """Connection errors, timeouts and 5xx responses. A 4xx is the request's fault, not the endpoint's."""
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return status >= 500
+    if isinstance(error, (httpx.TransportError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    from openai import APIConnectionError # Already imported if an OpenAI call raised
+    return isinstance(error, APIConnectionError) # Includes APITimeoutError
+
+class LocalEndpoint:
+    """
+    One OpenAI-compatible server (LM Studio, Ollama, vLLM...).
+    Tracks its own model, load and health.
+    """
+    def __init__(self, base_url: str, api_key: str, default_model: str,
+                 http_client_factory: Callable[[], httpx.AsyncClient], max_retries: int = 2):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.max_retries = max_retries
+        self.model_name = default_model
+        self.model_detected = False
+        self._http_client_factory = http_client_factory
+        self._client: Optional["AsyncOpenAI"] = None
+        self._client_http: Optional[httpx.AsyncClient] = None
+
+        # Load & health
+        self.outstanding = 0
+        self.ewma_latency: Optional[float] = None
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.requests = 0
+        self.errors = 0
+
+    @property
+    def client(self) -> "AsyncOpenAI":
+        http_client = self._http_client_factory()
+        if self._client is None or self._client_http is not http_client:
+            from openai import AsyncOpenAI # Imported on first use (slow import)
+            self._client = AsyncOpenAI(
+                base_url=self.base_url, api_key=self.api_key,
+                http_client=http_client, max_retries=self.max_retries
+            )
+            self._client_http = http_client
+        return self._client
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.ejected_until
+
+    async def detect_model(self) -> bool:
+        """Asks the server which model it has loaded. Returns True if reachable."""
+        try:
+            models = await self.client.models.list()
+            if models.data:
+                if models.data[0].id != self.model_name or not self.model_detected:
+                    print(f"🔌 Auto-detected Local Model at {self.base_url}: {models.data[0].id}")
+                self.model_name = models.data[0].id
+            else:
+                print(f"⚠️ No models found at {self.base_url}. Using default: {self.model_name}")
+            self.model_detected = True
+            return True
+        except Exception as e:
+            print(f"⚠️ Failed to auto-detect model at {self.base_url}: {e}")
+            return False
+
+    def get_stats(self) -> dict:
+        return {
+            "url": self.base_url,
+            "model": self.model_name,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "ewma_latency_ms": round(1000 * self.ewma_latency, 1) if self.ewma_latency is not None else None,
+            "requests": self.requests,
+            "errors": self.errors,
+        }
+
+class EndpointPool:
+    """
+    Routes requests across several local endpoints.
+
+    Strategy 'least_outstanding' picks the endpoint with the fewest in-flight
+    requests (ties broken by latency); 'latency' picks the lowest observed
+    EWMA latency. Endpoints that fail `eject_after` times in a row are ejected
+    for `eject_seconds` (doubling on repeated ejection, capped at 10 min); a
+    background probe re-admits them as soon as `/models` answers again. Only
+    connection errors, timeouts and 5xx responses count as failures.
+    """
+    def __init__(self, endpoints: List[LocalEndpoint], strategy: str = "least_outstanding",
+                 eject_after: int = 2, eject_seconds: float = 30.0, probe_interval: float = 15.0):
+        if not endpoints:
+            raise ValueError("EndpointPool needs at least one endpoint")
+        self.endpoints = endpoints
+        self.strategy = strategy
+        self.eject_after = eject_after
+        self.eject_seconds = eject_seconds
+        self.probe_interval = probe_interval
+        self._ejections = {id(ep): 0 for ep in endpoints}
+        self._probe_task: Optional[asyncio.Task] = None
+        self._detect_lock: Optional[asyncio.Lock] = None
+        self._detect_loop = None
+
+    def _score(self, ep: LocalEndpoint):
+        latency = ep.ewma_latency if ep.ewma_latency is not None else 0.0
+        if self.strategy == "latency":
+            # Penalize queued work so one fast box doesn't absorb everything
+            return (latency * (1 + ep.outstanding), ep.outstanding)
+        return (ep.outstanding, latency)
+
+    def pick(self) -> LocalEndpoint:
+        healthy = [ep for ep in self.endpoints if ep.healthy]
+        if not healthy:
+            # Fail open: try whichever endpoint comes back soonest
+            return min(self.endpoints, key=lambda ep: ep.ejected_until)
+        return min(healthy, key=self._score)
+
+    @property
+    def healthy_count(self) -> int:
+        return sum(1 for ep in self.endpoints if ep.healthy)
+
+    async def ensure_models(self):
+        """Auto-detects each endpoint's model once (concurrently)."""
+        loop = asyncio.get_running_loop()
+        if self._detect_lock is None or self._detect_loop is not loop:
+            self._detect_lock = asyncio.Lock()
+            self._detect_loop = loop
+        pending = [ep for ep in self.endpoints if not ep.model_detected]
+        if not pending:
+            return
+        async with self._detect_lock:
+            pending = [ep for ep in self.endpoints if not ep.model_detected]
+            results = await asyncio.gather(*[ep.detect_model() for ep in pending])
+            for ep, ok in zip(pending, results):
+                if not ok:
+                    ep.model_detected = True # Don't retry on every request; the probe will refresh it
+                    self._eject(ep)
+
+    @asynccontextmanager
+    async def lease(self):
+        """Reserves the best endpoint for one request and records the outcome."""
+        await self.ensure_models()
+        ep = self.pick()
+        ep.outstanding += 1
+        ep.requests += 1
+        start = time.monotonic()
+        try:
+            yield ep
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if is_endpoint_failure(e):
+                self._record_failure(ep)
+            raise
+        else:
+            self._record_success(ep, time.monotonic() - start)
+        finally:
+            ep.outstanding -= 1
+
+    def _record_success(self, ep: LocalEndpoint, latency: float):
+        ep.ewma_latency = latency if ep.ewma_latency is None else 0.8 * ep.ewma_latency + 0.2 * latency
+        ep.consecutive_failures = 0
+        self._ejections[id(ep)] = 0
+
+    def _record_failure(self, ep: LocalEndpoint):
+        ep.errors += 1
+        ep.consecutive_failures += 1
+        if ep.consecutive_failures >= self.eject_after:
+            self._eject(ep)
+
+    def _eject(self, ep: LocalEndpoint):
+        count = self._ejections[id(ep)]
+        duration = min(self.eject_seconds * (2 ** count), 600)
+        self._ejections[id(ep)] = count + 1
+        ep.ejected_until = time.monotonic() + duration
+        ep.consecutive_failures = 0
+        print(f"⚠️ Local endpoint {ep.base_url} ejected for {duration:.0f}s")
+        self._ensure_probe()
+
+    def _ensure_probe(self):
+        loop = asyncio.get_running_loop()
+        if self._probe_task is None or self._probe_task.done() or self._probe_task.get_loop() is not loop:
+            self._probe_task = loop.create_task(self._probe_loop())
+
+    async def _probe_loop(self):
+        # Runs only while something is ejected
+        while self.healthy_count < len(self.endpoints):
+            await asyncio.sleep(self.probe_interval)
+            await self.probe()
+
+    async def probe(self):
+        """Health-checks every ejected endpoint and re-admits the ones that answer."""
+        for ep in self.endpoints:
+            if ep.healthy:
+                continue
+            if await ep.detect_model():
+                ep.ejected_until = 0.0
+                print(f"🔌 Local endpoint {ep.base_url} is healthy again")
+
+    async def close(self):
+        if self._probe_task is not None and not self._probe_task.done():
+            self._probe_task.cancel()
+        self._probe_task = None
+
+    def get_stats(self) -> dict:
+        return {"strategy": self.strategy, "endpoints": [ep.get_stats() for ep in self.endpoints]}
+
+def parse_endpoint_urls(raw: str) -> List[str]:
+    """'http://a:1234/v1, http://b:1234/v1' -> ['http://a:1234/v1', 'http://b:1234/v1']"""
+    return [u.strip() for u in raw.split(",") if u.strip()]
@@ -14,17 +14,15 @@ Ontology:
 - Node Types: 'Activity', 'Symptom', 'Project', 'Entertainment', 'Entity' (generic), 'State' (e.g. Tired).
 - Relation Types: 'CAUSES', 'RELATED_TO', 'PART_OF', 'FOLLOWED_BY', 'INTERRUPTS'.
 
-Input Text: "{text}"
-
 Return a JSON object with this structure:
-{{
+{
     "nodes": [
-        {{ "id": "unique_id_lower_case", "type": "NodeType", "label": "Readable Label" }}
+        { "id": "unique_id_lower_case", "type": "NodeType", "label": "Readable Label" }
     ],
     "edges": [
-        {{ "source": "source_id", "target": "target_id", "relation": "RELATION_TYPE" }}
+        { "source": "source_id", "target": "target_id", "relation": "RELATION_TYPE" }
     ]
-}}
+}
 
 Rules:
 1. Be granular. "Coding python" -> Activity: "Coding", Entity: "Python".
@@ -43,12 +41,12 @@ class GraphEnricher:
         Extracts nodes and edges from text.
         """
         try:
-            # Construct Prompt
-            prompt = ENRICHMENT_PROMPT.format(text=text)
+            # Construct Prompt (static instructions first so the prefix is cacheable)
+            messages = [SystemMessage(content=ENRICHMENT_PROMPT), HumanMessage(content=f'Input Text: "{text}"')]
             
             # Call LLM (using generate_chat for simplicity, or generate_structured if available)
             # We'll use generate_chat and parse JSON for maximum compatibility with current provider
-            response = await llm_provider.generate_chat([HumanMessage(content=prompt)])
+            response = await llm_provider.generate_chat(messages, call_site="enricher")
             
             # Parse JSON
             import re
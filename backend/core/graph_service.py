@@ -1,5 +1,6 @@
 import networkx as nx
 import json
+import asyncio
 import os
 import logging
 from typing import List, Dict, Any, Optional
@@ -18,16 +19,32 @@ class GraphService:
     """
     def __init__(self):
         self.graph = nx.DiGraph()
+        self.dirty = False # Unsaved changes (see flush)
         self._load_graph()
 
     def _save_graph(self):
         """Persists graph to disk."""
         try:
-            data = nx.node_link_data(self.graph)
-            os.makedirs(os.path.dirname(GRAPH_FILE), exist_ok=True)
-            with open(GRAPH_FILE, "w") as f:
-                json.dump(data, f)
-            logger.info("[GraphService] Graph saved.")
+            self._write(nx.node_link_data(self.graph))
+        except Exception as e:
+            logger.error(f"[GraphService] Save failed: {e}")
+
+    def _write(self, data: Dict[str, Any]):
+        os.makedirs(os.path.dirname(GRAPH_FILE), exist_ok=True)
+        with open(GRAPH_FILE, "w") as f:
+            json.dump(data, f)
+        self.dirty = False
+        logger.info("[GraphService] Graph saved.")
+
+    async def flush(self):
+        """
+        Saves the graph if nodes were added with save=False (batched ingestion).
+        The snapshot is taken on the loop; only the file write runs in a thread.
+        """
+        if not self.dirty:
+            return
+        try:
+            await asyncio.to_thread(self._write, nx.node_link_data(self.graph))
         except Exception as e:
             logger.error(f"[GraphService] Save failed: {e}")
 
@@ -43,10 +60,12 @@ class GraphService:
                 logger.error(f"[GraphService] Load failed: {e}")
                 self.graph = nx.DiGraph()
 
-    async def add_memory_node(self, memory: MemoryEntry):
+    async def add_memory_node(self, memory: MemoryEntry, enrichment: Optional[Dict[str, Any]] = None, save: bool = True):
         """
         Adds a single memory and enriches it.
         This replaces the full rebuild approach for incremental updates.
+        `enrichment` may be precomputed (ingestion runs it alongside the
+        embedding); with save=False the write is left to `flush()`.
         """
         # 1. Add Base Memory Node
         node_id = memory.id if memory.id else f"mem_{int(datetime.now().timestamp())}"
@@ -60,7 +79,8 @@ class GraphService:
         )
         
         # 2. Semantic Enrichment (The "Perception" Step)
-        enrichment = await graph_enricher.enrich_memory(memory.statement)
+        if enrichment is None:
+            enrichment = await graph_enricher.enrich_memory(memory.statement)
         
         for node in enrichment.get("nodes", []):
             # Add Entity Node
@@ -76,7 +96,10 @@ class GraphService:
         # Simple heuristic: find last added memory node
         # In a real DB, we'd query. Here we can sort nodes or keep track of 'last_memory_id'
         # For now, let's just save.
-        self._save_graph()
+        if save:
+            self._save_graph()
+        else:
+            self.dirty = True
 
     def build_graph(self, memories: List[MemoryEntry]):
         """
@@ -0,0 +1,81 @@
+"""
+Bulk memory import.
+
+    python -m backend.core.importer backend/data/cold_storage/archive.jsonl backend/data/input.json
+    python -m backend.core.importer dump.json --no-enrich --batch-size 128
+    python -m backend.core.importer backend/data/cold_storage/segments/2025-03.jsonl.gz
+
+Accepts JSONL or JSON (one object or a list), optionally gzipped. Structured
+records (archive.jsonl / cold storage segments: MemoryEntry fields) are embedded and stored directly; raw
+events (input.json: {"text", "type"}) go through memory extraction first.
+"""
+import os
+import sys
+import gzip
+import json
+import asyncio
+import argparse
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Union
+from backend.agents.schemas import MemoryEntry
+
+def parse_record(record: Any) -> Union[str, MemoryEntry, None]:
+    """A MemoryEntry for structured records, a raw log for sensor/user events."""
+    if isinstance(record, str):
+        return record.strip() or None
+    if not isinstance(record, dict):
+        return None
+    if "statement" in record:
+        try:
+            return MemoryEntry(**record)
+        except Exception as e:
+            print(f"⚠️ [Import] Skipping malformed memory record: {e}")
+            return None
+    if record.get("text"):
+        # Same shape as the logs the live pipeline stores
+        return (f"Timestamp: {record.get('timestamp') or datetime.now().isoformat()}\n"
+                f"Input Source: {record.get('type', 'import')}\n"
+                f"Input Text: {record['text']}")
+    return None
+
+def load_records(path: str) -> List[Union[str, MemoryEntry]]:
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        raw = f.read()
+    try:
+        data = json.loads(raw)
+        records: Iterable[Any] = data if isinstance(data, list) else [data]
+    except json.JSONDecodeError:
+        records = (json.loads(line) for line in raw.splitlines() if line.strip())
+    parsed = [parse_record(r) for r in records]
+    return [p for p in parsed if p is not None]
+
+async def import_records(records: List[Union[str, MemoryEntry]], batch_size: int = None, enrich: bool = True) -> Dict[str, Any]:
+    from backend.core.memory import hippocampus, IMPORT_BATCH_SIZE
+    return await hippocampus.add_memories(records, batch_size=batch_size or IMPORT_BATCH_SIZE, enrich=enrich)
+
+async def import_files(paths: List[str], batch_size: int = None, enrich: bool = True) -> Dict[str, Any]:
+    records = []
+    for path in paths:
+        loaded = load_records(path)
+        print(f"📦 [Import] {path}: {len(loaded)} records")
+        records.extend(loaded)
+    return await import_records(records, batch_size=batch_size, enrich=enrich)
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Bulk-import memories into the Hippocampus.")
+    parser.add_argument("paths", nargs="+", help="JSONL/JSON files (archive.jsonl, input.json dumps...)")
+    parser.add_argument("--batch-size", type=int, default=None, help="Memories per Chroma write (default IMPORT_BATCH_SIZE)")
+    parser.add_argument("--no-enrich", action="store_true", help="Skip per-memory LLM graph enrichment")
+    args = parser.parse_args(argv)
+
+    missing = [p for p in args.paths if not os.path.exists(p)]
+    if missing:
+        parser.error(f"File not found: {', '.join(missing)}")
+
+    report = asyncio.run(import_files(args.paths, batch_size=args.batch_size, enrich=not args.no_enrich))
+    print(json.dumps(report, indent=2))
+    return 0 if report["failed"] == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,272 @@
+import os
+import json
+import time
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable, Deque, List, Optional, Set
+from backend.core.scheduler import llm_priority, Priority
+
+# What `submit` does when the queue is full:
+#   block        - wait for a free slot (backpressure on the producer)
+#   drop_oldest  - evict the oldest pending item
+#   drop_newest  - reject the new item
+#   merge        - fold the new item into the newest pending item from the
+#                  same source (one memory for a burst), else drop_oldest
+OVERFLOW_POLICIES = ("block", "drop_oldest", "drop_newest", "merge")
+
+JOURNAL_PATH = "backend/data/ingestion_journal.jsonl"
+
+class IngestItem:
+    def __init__(self, text: str, source: str = "unknown"):
+        self.text = text
+        self.source = source
+        self.merged = 1
+        self.enqueued_at = time.monotonic()
+
+class IngestionQueue:
+    """
+    Write-behind ingestion for the Hippocampus.
+
+    Producers (council runs, chat) hand off memory logs and return at once;
+    a small pool of workers runs the extraction/embedding/storage pipeline
+    under the INGESTION priority. Identical pending logs are coalesced.
+
+    On shutdown the queue drains for up to `drain_timeout` seconds; whatever
+    is still pending is written to a journal and re-queued on next start,
+    so accepted memories survive restarts. The journal is moved aside while
+    it is replayed and deleted only once every replayed item has been
+    processed (or journaled again at shutdown), so a crash mid-replay loses
+    nothing.
+    """
+    def __init__(self, process: Callable[[str], Awaitable[bool]], on_idle: Optional[Callable[[], Awaitable[None]]] = None,
+                 maxsize: int = 256, workers: int = 2, policy: str = "block", block_timeout: float = 5.0,
+                 drain_timeout: float = 10.0, journal_path: str = JOURNAL_PATH):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown ingestion overflow policy: {policy}")
+        self.process = process
+        self.on_idle = on_idle
+        self.maxsize = maxsize
+        self.workers = workers
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.drain_timeout = drain_timeout
+        self.journal_path = journal_path
+        self._pending: Deque[IngestItem] = deque()
+        self._in_flight: Set[IngestItem] = set()
+        self._replaying: Set[IngestItem] = set()
+        self._items_ready: Optional[asyncio.Condition] = None
+        self._tasks: List[asyncio.Task] = []
+        self._accepting = False
+        self._waits: Deque[float] = deque(maxlen=256)
+        self.stats = {"submitted": 0, "processed": 0, "failed": 0, "coalesced": 0, "merged": 0,
+                      "dropped": 0, "blocked": 0, "journaled": 0, "recovered": 0}
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self):
+        """Starts the workers and re-queues anything journaled at the last shutdown."""
+        if self.running:
+            return
+        self._items_ready = asyncio.Condition()
+        self._accepting = True
+        for item in self._load_journal():
+            self._pending.append(item)
+            self._replaying.add(item)
+            self.stats["recovered"] += 1
+        if self.stats["recovered"]:
+            print(f"📥 [Ingestion] Recovered {self.stats['recovered']} pending memories from the journal")
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+
+    async def submit(self, text: str, source: str = "unknown") -> bool:
+        """
+        Queues a memory log. Returns False if it was dropped. Without running
+        workers (scripts, tests) the log is processed inline instead.
+        """
+        self.stats["submitted"] += 1
+        if not self.running:
+            return await self._run(IngestItem(text, source))
+        if not self._accepting:
+            self._journal([IngestItem(text, source)]) # Arrived mid-shutdown: keep it for next start
+            return True
+
+        async with self._items_ready:
+            # Same log already waiting (e.g. a repeated sensor reading)
+            for pending in self._pending:
+                if pending.text == text:
+                    pending.merged += 1
+                    self.stats["coalesced"] += 1
+                    return True
+
+            if len(self._pending) >= self.maxsize:
+                if self.policy == "block":
+                    try:
+                        await self._wait_for_room()
+                    except asyncio.TimeoutError:
+                        print(f"⚠️ [Ingestion] Queue full for {self.block_timeout}s. Dropping a {source} memory.")
+                        self.stats["dropped"] += 1
+                        return False
+                elif self.policy == "drop_newest":
+                    self.stats["dropped"] += 1
+                    return False
+                elif self.policy == "merge" and self._merge(text, source):
+                    return True
+                else:
+                    self._pending.popleft()
+                    self.stats["dropped"] += 1
+
+            self._pending.append(IngestItem(text, source))
+            self._items_ready.notify_all()
+            return True
+
+    def _merge(self, text: str, source: str) -> bool:
+        """Folds `text` into the newest pending item from the same source (lock held)."""
+        for pending in reversed(self._pending):
+            if pending.source == source:
+                pending.text += "\n" + text
+                pending.merged += 1
+                self.stats["merged"] += 1
+                return True
+        return False
+
+    async def _wait_for_room(self):
+        self.stats["blocked"] += 1
+        start = time.monotonic()
+        await asyncio.wait_for(self._items_ready.wait_for(lambda: len(self._pending) < self.maxsize), self.block_timeout)
+        self._waits.append(time.monotonic() - start)
+
+    async def _worker(self, index: int):
+        while True:
+            async with self._items_ready:
+                await self._items_ready.wait_for(lambda: bool(self._pending))
+                item = self._pending.popleft()
+                self._in_flight.add(item)
+                self._items_ready.notify_all() # Wake producers blocked on a full queue
+            # Cancelled mid-item (shutdown): it stays in flight so stop() journals it
+            await self._run(item)
+            if item in self._replaying:
+                self._replaying.discard(item)
+                if not self._replaying:
+                    self._finish_replay()
+            async with self._items_ready:
+                self._in_flight.discard(item)
+                idle = self._idle()
+                if idle:
+                    self._items_ready.notify_all() # Wake join()
+            if idle and self.on_idle is not None:
+                try:
+                    await self.on_idle()
+                except Exception as e:
+                    print(f"⚠️ [Ingestion] Idle hook failed: {e}")
+
+    async def _run(self, item: IngestItem) -> bool:
+        with llm_priority(Priority.INGESTION):
+            try:
+                ok = await self.process(item.text)
+            except Exception as e:
+                print(f"[Ingestion] Failed to store memory: {e}")
+                ok = False
+        self.stats["processed" if ok is not False else "failed"] += 1
+        return ok is not False
+
+    def _idle(self) -> bool:
+        return not self._pending and not self._in_flight
+
+    async def join(self):
+        """Waits until everything queued so far has been processed."""
+        if self._idle():
+            return
+        async with self._items_ready:
+            await self._items_ready.wait_for(self._idle)
+
+    async def stop(self):
+        """Stops accepting, drains within `drain_timeout`, journals the rest."""
+        if not self.running:
+            return
+        self._accepting = False
+        try:
+            await asyncio.wait_for(self.join(), self.drain_timeout)
+        except asyncio.TimeoutError:
+            pass
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # Cancelled in-flight items are journaled too (storing twice beats losing one)
+        leftover = list(self._in_flight) + list(self._pending)
+        self._in_flight.clear()
+        self._pending.clear()
+        if leftover:
+            self._journal(leftover)
+            print(f"💾 [Ingestion] Journaled {len(leftover)} pending memories for the next start")
+        self._finish_replay() # Unprocessed replayed items are in the new journal
+        if self.on_idle is not None:
+            await self.on_idle()
+
+    def _journal(self, items: List[IngestItem]):
+        os.makedirs(os.path.dirname(self.journal_path) or ".", exist_ok=True)
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            for item in items:
+                f.write(json.dumps({"text": item.text, "source": item.source}) + "\n")
+        self.stats["journaled"] += len(items)
+
+    @property
+    def replay_path(self) -> str:
+        return self.journal_path + ".replay"
+
+    def _load_journal(self) -> List[IngestItem]:
+        """Moves the journal aside (next to any replay a crash interrupted) and reads it back."""
+        if os.path.exists(self.journal_path):
+            if os.path.exists(self.replay_path):
+                with open(self.journal_path, encoding="utf-8") as f, open(self.replay_path, "a", encoding="utf-8") as out:
+                    out.write(f.read())
+                os.remove(self.journal_path)
+            else:
+                os.replace(self.journal_path, self.replay_path)
+        if not os.path.exists(self.replay_path):
+            return []
+        items = []
+        with open(self.replay_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    data = json.loads(line)
+                    items.append(IngestItem(data["text"], data.get("source", "unknown")))
+                except (json.JSONDecodeError, KeyError):
+                    continue
+        if not items:
+            os.remove(self.replay_path)
+        return items
+
+    def _finish_replay(self):
+        """Deletes the replayed journal once none of its items can be lost."""
+        self._replaying.clear()
+        if os.path.exists(self.replay_path):
+            os.remove(self.replay_path)
+
+    def get_stats(self) -> dict:
+        waits = sorted(self._waits)
+        return {
+            **self.stats,
+            "policy": self.policy,
+            "pending": len(self._pending),
+            "in_flight": len(self._in_flight),
+            "capacity": self.maxsize,
+            "avg_block_ms": round(1000 * sum(waits) / len(waits), 1) if waits else None,
+        }
+
+def _build_queue() -> IngestionQueue:
+    from backend.core.memory import hippocampus
+    from backend.core.graph_service import graph_service
+    return IngestionQueue(
+        process=lambda text: hippocampus.add_memory(text, save_graph=False),
+        on_idle=graph_service.flush,
+        maxsize=int(os.getenv("INGEST_QUEUE_SIZE", "256")),
+        workers=int(os.getenv("INGEST_WORKERS", "2")),
+        policy=os.getenv("INGEST_OVERFLOW", "block"),
+        block_timeout=float(os.getenv("INGEST_BLOCK_TIMEOUT", "5")),
+        drain_timeout=float(os.getenv("INGEST_DRAIN_TIMEOUT", "10")),
+    )
+
+# Global Instance
+ingestion_queue = _build_queue()
@@ -1,56 +1,460 @@
 import os
-from typing import Type, TypeVar, Any
-from pydantic import BaseModel
-from google import genai
-from google.genai import types
-from openai import OpenAI
+import asyncio
+import copy
+import time
+import importlib
+from typing import Type, TypeVar, Any, Optional, Callable, Awaitable, AsyncIterator, Dict, Hashable, TYPE_CHECKING
+from pydantic import BaseModel, ValidationError
+from abc import ABC, abstractmethod
+import httpx
 import json
+from backend.core.embedding_cache import embedding_cache, normalize_text
+from backend.core.batching import MicroBatcher
+from backend.core.response_cache import response_cache
+from backend.core.scheduler import llm_scheduler
+from backend.core.model_router import model_router
+from backend.core.endpoints import EndpointPool, LocalEndpoint, parse_endpoint_urls
+from backend.core.prompt_cache import token_usage, gemini_context_cache, llm_call_site
+from backend.core.context_builder import estimate_tokens
+from backend.core.tool_calling import ToolCall, ToolTurn, parse_arguments, to_text_protocol, stream_text_turn
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+# The SDKs (google-genai ~0.4s, openai ~0.4s) are imported by the provider
+# that needs them, on first use, so importing this module stays cheap.
+def _genai():
+    from google import genai
+    from google.genai import types
+    return genai, types
 
 T = TypeVar("T", bound=BaseModel)
 
-class LocalProvider:
+# --- Shared HTTP Connection Pool ---
+# One keep-alive pool serves every provider so concurrent council runs, chats and
+# ingestions reuse sockets instead of opening a fresh TLS session per call.
+HTTP_MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "32"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "16"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "60"))
+HTTP_TIMEOUT = float(os.getenv("LLM_HTTP_TIMEOUT", "120"))
+
+_http_client: Optional[httpx.AsyncClient] = None
+_http_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Returns the process-wide pooled AsyncClient.
+    Pooled connections are bound to the event loop that opened them, so the pool
+    is rebuilt if it is requested from a different (e.g. a fresh test) loop.
+    """
+    global _http_client, _http_loop
+    loop = asyncio.get_running_loop()
+    if _http_client is None or _http_client.is_closed or _http_loop is not loop:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(HTTP_TIMEOUT, connect=10.0),
+        )
+        _http_loop = loop
+    return _http_client
+
+async def close_http_client():
+    """Closes the shared pool (called on shutdown)."""
+    global _http_client, _http_loop
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+    _http_client = None
+    _http_loop = None
+
+# --- Single-Flight Request Coalescing ---
+class _Flight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+class SingleFlight:
+    """
+    Coalesces identical in-flight requests.
+    The first caller for a key starts the upstream call; concurrent callers with
+    the same key await that same call and receive (a copy of) its result or its
+    exception. The upstream call is only cancelled once every waiter has gone.
+    """
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.stats = {"leaders": 0, "coalesced": 0}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        # Tasks belong to one event loop, so flights never cross loops
+        key = (id(asyncio.get_running_loop()), key)
+        flight = self._flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _Flight(asyncio.ensure_future(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda t, k=key, f=flight: self._forget(k, f, t))
+            self.stats["leaders"] += 1
+        else:
+            self.stats["coalesced"] += 1
+
+        flight.waiters += 1
+        try:
+            result = await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if not flight.task.done() and flight.waiters == 1:
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+        # Followers get their own copy so one caller's mutations can't leak to another
+        return result if leader else _isolate(result)
+
+    def _forget(self, key: Hashable, flight: _Flight, task: asyncio.Task):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not task.cancelled():
+            task.exception() # Mark retrieved; waiters (if any) already re-raised it
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "in_flight": len(self._flights)}
+
+def _isolate(result: Any) -> Any:
+    if isinstance(result, BaseModel):
+        return result.model_copy(deep=True)
+    return copy.deepcopy(result)
+
+single_flight = SingleFlight()
+
+EMBED_BATCH_WINDOW = float(os.getenv("EMBED_BATCH_WINDOW_MS", "15")) / 1000
+EMBED_MAX_BATCH = int(os.getenv("EMBED_MAX_BATCH", "64"))
+
+class BaseLLMProvider(ABC):
+    """
+    Shared plumbing for all providers.
+    Subclasses implement the raw network calls (`_generate_structured`,
+    `_embed_batch`, `_generate_chat`...); caching, coalescing, batching,
+    scheduling and model routing live here.
+    """
+    name = "base"
+    embedding_model = ""
+    model_name = ""
+
+    @property
+    def cache_model(self) -> str:
+        """Model identity used in response-cache keys when no route picks one."""
+        return self.model_name
+
+    async def generate_structured(self, prompt: str, schema_model: Type[T], context: str = "", call_site: Optional[str] = None) -> T:
+        """
+        Generates a structured response validated against `schema_model`.
+        `call_site` names the caller (e.g. 'triage'). It selects the model tier
+        (see model_router.ROUTES) and the cache policy (see CACHE_POLICIES).
+        Identical concurrent requests share one upstream call.
+        """
+        model = model_router.resolve(self.name, call_site)
+        key = response_cache.make_key(model or self.cache_model, prompt, context, schema_model)
+        ttl = response_cache.ttl_for(call_site)
+        if ttl is None:
+            response_cache.stats["bypassed"] += 1
+        else:
+            cached = response_cache.get(key)
+            if cached is not None:
+                return cached
+
+        async def call():
+            result = await self._routed_structured(prompt, schema_model, context, call_site)
+            if ttl is not None:
+                response_cache.put(key, result, ttl)
+            return result
+
+        return await single_flight.do(("structured", self.name, key), call)
+
+    async def _routed_structured(self, prompt: str, schema_model: Type[T], context: str, call_site: Optional[str]) -> T:
+        """Tries the routed model, escalating to bigger tiers when the output fails validation."""
+        candidates = model_router.candidates(self.name, call_site)
+        for i, model in enumerate(candidates):
+            start = time.monotonic()
+            try:
+                async with llm_scheduler.slot():
+                    with llm_call_site(call_site):
+                        result = await self._generate_structured(prompt, schema_model, context, model=model)
+            except ValidationError:
+                model_router.record(call_site, model, time.monotonic() - start, "fallback")
+                if i == len(candidates) - 1:
+                    raise
+                print(f"⚠️ [{call_site}] {model or self.model_name} returned an invalid {schema_model.__name__}. Escalating...")
+                continue
+            except Exception:
+                model_router.record(call_site, model, time.monotonic() - start, "error")
+                raise
+            model_router.record(call_site, model, time.monotonic() - start)
+            return result
+
+    async def _timed(self, call_site: str, model: Optional[str], coro_fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Runs an upstream call under the scheduler and records its route latency."""
+        start = time.monotonic()
+        try:
+            async with llm_scheduler.slot():
+                with llm_call_site(call_site):
+                    result = await coro_fn()
+        except Exception:
+            model_router.record(call_site, model, time.monotonic() - start, "error")
+            raise
+        model_router.record(call_site, model, time.monotonic() - start)
+        return result
+
+    @abstractmethod
+    async def _generate_structured(self, prompt: str, schema_model: Type[T], context: str = "", model: Optional[str] = None) -> T:
+        """
+        Raw structured generation against the backend (model=None: provider default).
+        `prompt` is the stable instruction and must lead the request; the
+        variable `context` goes after it so server-side prefix caches hit.
+        """
+        pass
+
+    async def analyze_image(self, image: Any, prompt: str, schema_model: Type[T], call_site: str = "vision") -> T:
+        """Multimodal analysis: Image + Prompt -> Structured Output."""
+        model = model_router.resolve(self.name, call_site)
+        return await self._timed(call_site, model, lambda: self._analyze_image(image, prompt, schema_model, model=model))
+
+    async def generate_chat(self, messages: list[Any], call_site: str = "chat") -> str:
+        """Generates a chat reply from LangChain messages."""
+        model = model_router.resolve(self.name, call_site)
+        return await self._timed(call_site, model, lambda: self._generate_chat(messages, model=model))
+
+    async def generate_chat_stream(self, messages: list[Any], call_site: str = "chat") -> AsyncIterator[str]:
+        """
+        Streams a chat reply as text deltas. One scheduler slot is held for
+        the whole stream; the recorded route latency is the full generation.
+        """
+        model = model_router.resolve(self.name, call_site)
+        start = time.monotonic()
+        try:
+            async with llm_scheduler.slot():
+                with llm_call_site(call_site):
+                    async for delta in self._generate_chat_stream(messages, model=model):
+                        if delta:
+                            yield delta
+        except Exception:
+            model_router.record(call_site, model, time.monotonic() - start, "error")
+            raise
+        model_router.record(call_site, model, time.monotonic() - start)
+
+    async def generate_tool_turn(self, messages: list[Any], tools: list[dict], on_token: Optional[Callable[[str], Awaitable[None]]] = None,
+                                 call_site: str = "chat") -> ToolTurn:
+        """
+        One agent turn with function calling. `tools` are OpenAI-style
+        function schemas; the result holds the reply text and any tool calls
+        (several when the model asks for independent tools at once). With
+        `on_token`, reply text is streamed as it is generated.
+        """
+        model = model_router.resolve(self.name, call_site)
+        return await self._timed(call_site, model, lambda: self._generate_tool_turn(messages, tools, model=model, on_token=on_token))
+
+    async def summarize_day(self, context: str, call_site: str = "summary") -> str:
+        """Summarizes raw memory logs into a narrative."""
+        model = model_router.resolve(self.name, call_site)
+        return await self._timed(call_site, model, lambda: self._summarize_day(context, model=model))
+
+    async def _analyze_image(self, image: Any, prompt: str, schema_model: Type[T], model: Optional[str] = None) -> T:
+        raise NotImplementedError(f"{self.name} does not support vision")
+
+    async def _generate_chat(self, messages: list[Any], model: Optional[str] = None) -> str:
+        raise NotImplementedError(f"{self.name} does not support chat")
+
+    async def _generate_chat_stream(self, messages: list[Any], model: Optional[str] = None) -> AsyncIterator[str]:
+        # Providers without native streaming deliver the whole reply as one delta
+        yield await self._generate_chat(messages, model=model)
+
+    async def _generate_tool_turn(self, messages: list[Any], tools: list[dict], model: Optional[str] = None,
+                                  on_token: Optional[Callable[[str], Awaitable[None]]] = None) -> ToolTurn:
+        # Providers without native function calling use the prompt-based JSON protocol
+        messages = to_text_protocol(messages, tools)
+        if on_token is not None:
+            return await stream_text_turn(self._generate_chat_stream(messages, model=model), on_token)
+        return ToolTurn.from_text(await self._generate_chat(messages, model=model))
+
+    async def _summarize_day(self, context: str, model: Optional[str] = None) -> str:
+        raise NotImplementedError(f"{self.name} does not support summaries")
+
+    @property
+    def embed_batcher(self) -> MicroBatcher:
+        # Created lazily so subclasses don't need to call super().__init__()
+        batcher = self.__dict__.get("_embed_batcher")
+        if batcher is None:
+            batcher = MicroBatcher(self._embed_uncached, window=EMBED_BATCH_WINDOW, max_batch=EMBED_MAX_BATCH)
+            self.__dict__["_embed_batcher"] = batcher
+        return batcher
+
+    async def get_embedding(self, text: str) -> list[float]:
+        """
+        Embeds a single text. Concurrent callers are merged into one batched
+        request by the micro-batcher.
+        """
+        cached = embedding_cache.get(self.name, self.embedding_model, text)
+        if cached is not None:
+            return cached
+        key = ("embedding", self.name, self.embedding_model, normalize_text(text))
+        return await single_flight.do(key, lambda: self.embed_batcher.submit(text))
+
+    async def get_embeddings(self, texts: list[str]) -> list[list[float]]:
+        """
+        Embeds many texts, sending only cache misses upstream in batches.
+        Failed items come back as [].
+        """
+        results: list[Optional[list[float]]] = []
+        misses: dict[str, list[int]] = {}
+        for i, text in enumerate(texts):
+            cached = embedding_cache.get(self.name, self.embedding_model, text)
+            results.append(cached)
+            if cached is None:
+                misses.setdefault(text, []).append(i)
+
+        if misses:
+            fetched = await self._embed_uncached(list(misses.keys()))
+            for (text, positions), embedding in zip(misses.items(), fetched):
+                for i in positions:
+                    results[i] = embedding
+        return [r if r is not None else [] for r in results]
+
+    async def _embed_uncached(self, texts: list[str]) -> list[list[float]]:
+        embeddings: list[list[float]] = []
+        for start in range(0, len(texts), EMBED_MAX_BATCH):
+            chunk = texts[start:start + EMBED_MAX_BATCH]
+            async with llm_scheduler.slot():
+                vectors = await self._embed_batch(chunk)
+            if len(vectors) != len(chunk):
+                vectors = [[] for _ in chunk]
+            await embedding_cache.aput_many(self.name, self.embedding_model, zip(chunk, vectors))
+            embeddings.extend(vectors)
+        return embeddings
+
+    @abstractmethod
+    async def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        """Embeds a list of texts in one backend request. Returns [] per failed item."""
+        pass
+
+    async def warmup(self):
+        """
+        Prepares the provider in the background (SDK import, client, model
+        detection) so the first real call doesn't pay for it. Never raises.
+        """
+        pass
+
+    async def aclose(self):
+        """Releases provider resources (background tasks) on shutdown."""
+        pass
+
+    def get_stats(self) -> dict:
+        return {
+            "embedding_cache": embedding_cache.get_stats(),
+            "embedding_batches": self.embed_batcher.get_stats(),
+            "response_cache": response_cache.get_stats(),
+            "single_flight": single_flight.get_stats(),
+            "scheduler": llm_scheduler.get_stats(),
+            "routing": model_router.get_stats(),
+            "prompt_cache": token_usage.get_stats(),
+        }
+
+
+class LocalProvider(BaseLLMProvider):
     """
     Wrapper for Local LLM (e.g., LM Studio, Ollama) using OpenAI-compatible API.
     Defaults to http://localhost:1234/v1
     """
+    name = "local"
+    embedding_model = "text-embedding-nomic-embed-text-v1.5" # Common local embedding model
+
     def __init__(self):
-        self.base_url = os.getenv("LOCAL_LLM_URL", "http://localhost:1234/v1")
+        urls = parse_endpoint_urls(os.getenv("LOCAL_LLM_URL", "http://localhost:1234/v1"))
         self.api_key = os.getenv("LOCAL_LLM_KEY", "lm-studio")
-        
-        # Auto-detect model
+        default_model = os.getenv("LOCAL_LLM_MODEL", "qwen-2.5-7b-instruct")
+
+        # Each endpoint auto-detects its own model on first use. With several
+        # endpoints we fail over instead of retrying the same box.
+        retries = 2 if len(urls) == 1 else 0
+        self.pool = EndpointPool(
+            [LocalEndpoint(url, self.api_key, default_model, get_http_client, max_retries=retries) for url in urls],
+            strategy=os.getenv("LOCAL_LLM_ROUTING", "least_outstanding"),
+            eject_after=int(os.getenv("LOCAL_LLM_EJECT_AFTER", "2")),
+            eject_seconds=float(os.getenv("LOCAL_LLM_EJECT_SECONDS", "30")),
+        )
+        self.base_url = urls[0] if urls else ""
+        # Native function calling; turned off if the server rejects `tools`
+        self.native_tools = os.getenv("LOCAL_LLM_NATIVE_TOOLS", "1") == "1"
+        print(f"🔌 Local LLM endpoints: {', '.join(urls)}")
+
+    @property
+    def model_name(self) -> str:
+        """Model of the primary endpoint (used for logs)."""
+        return self.pool.endpoints[0].model_name
+
+    @property
+    def cache_model(self) -> str:
+        """Every endpoint's model: any of them may serve a call, so cached answers are keyed by the set."""
+        return "+".join(sorted({ep.model_name for ep in self.pool.endpoints}))
+
+    @property
+    def client(self) -> "AsyncOpenAI":
+        """AsyncOpenAI client of the primary endpoint."""
+        return self.pool.endpoints[0].client
+
+    async def _with_endpoint(self, call: Callable[[LocalEndpoint], Awaitable[Any]]) -> Any:
+        """
+        Runs `call` on the best endpoint, failing over to another endpoint on
+        connection errors, timeouts and 5xx responses.
+        """
+        from openai import APIConnectionError, APITimeoutError, InternalServerError
+        attempts = max(1, self.pool.healthy_count)
+        for attempt in range(attempts):
+            try:
+                async with self.pool.lease() as endpoint:
+                    return await call(endpoint)
+            except (APIConnectionError, APITimeoutError, InternalServerError) as e:
+                if attempt == attempts - 1:
+                    raise
+                print(f"⚠️ Local endpoint failed ({e}). Retrying on another endpoint...")
+
+    async def _chat_completion(self, model: Optional[str] = None, **kwargs) -> Any:
+        """Chat completion on the best endpoint (model=None: the endpoint's own model)."""
+        return await self._with_endpoint(
+            lambda ep: ep.client.chat.completions.create(model=model or ep.model_name, **kwargs)
+        )
+
+    async def warmup(self):
         try:
-            # We use a temporary client to fetch models
-            temp_client = OpenAI(base_url=self.base_url, api_key=self.api_key)
-            models = temp_client.models.list()
-            if models.data:
-                self.model_name = models.data[0].id
-                print(f"🔌 Auto-detected Local Model: {self.model_name}")
-            else:
-                self.model_name = os.getenv("LOCAL_LLM_MODEL", "qwen-2.5-7b-instruct")
-                print(f"⚠️ No models found via API. Using default: {self.model_name}")
+            await asyncio.to_thread(importlib.import_module, "openai")
+            await self.pool.ensure_models()
         except Exception as e:
-            print(f"⚠️ Failed to auto-detect model: {e}")
-            self.model_name = os.getenv("LOCAL_LLM_MODEL", "qwen-2.5-7b-instruct")
-        
-        print(f"🔌 Connecting to Local LLM at {self.base_url} (Target: {self.model_name})...")
-        self.client = OpenAI(base_url=self.base_url, api_key=self.api_key)
+            print(f"⚠️ Local LLM warmup failed: {e}")
+
+    async def aclose(self):
+        await self.pool.close()
+
+    def get_stats(self) -> dict:
+        return {**super().get_stats(), "local_endpoints": self.pool.get_stats()}
 
-    async def generate_structured(self, prompt: str, schema_model: Type[T], context: str = "") -> T:
+    async def _generate_structured(self, prompt: str, schema_model: Type[T], context: str = "", model: Optional[str] = None) -> T:
         """
         Generates structured JSON.
         """
-        full_prompt = f"{context}\n\nTask: {prompt}\n\nOutput strictly in JSON format matching this schema:\n{json.dumps(schema_model.model_json_schema())}"
+        # Stable prefix (instruction + schema) first, variable context last
+        system_prompt = f"You are a helpful AI assistant. Output strictly valid JSON.\n\nTask: {prompt}\n\nOutput strictly in JSON format matching this schema:\n{json.dumps(schema_model.model_json_schema())}"
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.model_name,
+            start = time.monotonic()
+            response = await self._chat_completion(
+                model=model,
                 messages=[
-                    {"role": "system", "content": "You are a helpful AI assistant. Output strictly valid JSON."},
-                    {"role": "user", "content": full_prompt}
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": context or "(no additional context)"}
                 ],
                 # response_format={"type": "json_object"}, # Not supported by all local models
                 temperature=0.2
             )
+            self._record_usage(response, time.monotonic() - start)
             content = response.choices[0].message.content
             # Clean up markdown
             if "```json" in content:
@@ -63,7 +467,7 @@ class LocalProvider:
             print(f"❌ Local LLM Error: {e}")
             raise e
 
-    async def analyze_image(self, image: Any, prompt: str, schema_model: Type[T]) -> T:
+    async def _analyze_image(self, image: Any, prompt: str, schema_model: Type[T], model: Optional[str] = None) -> T:
         """
         Vision capability for Local LLM (e.g., Qwen-VL).
         Accepts PIL Image, converts to base64, and sends to API.
@@ -98,8 +502,8 @@ class LocalProvider:
         full_prompt = f"Task: {prompt}\n\nOutput strictly in JSON format matching this schema:\n{json.dumps(schema_model.model_json_schema())}"
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.model_name,
+            response = await self._chat_completion(
+                model=model,
                 messages=[
                     {
                         "role": "user",
@@ -138,41 +542,138 @@ class LocalProvider:
             # We can't easily construct a generic dummy for T, so we raise.
             raise e
 
-    async def get_embedding(self, text: str) -> list[float]:
+    async def _embed_batch(self, texts: list[str]) -> list[list[float]]:
         try:
-            response = self.client.embeddings.create(
-                model="text-embedding-nomic-embed-text-v1.5", # Common local embedding model
-                input=text
+            response = await self._with_endpoint(
+                lambda ep: ep.client.embeddings.create(model=self.embedding_model, input=texts)
             )
-            return response.data[0].embedding
+            data = sorted(response.data, key=lambda d: d.index)
+            return [d.embedding for d in data]
         except Exception as e:
             print(f"❌ Local Embedding Error: {e}")
-            return []
+            return [[] for _ in texts]
 
-    async def generate_chat(self, messages: list[Any]) -> str:
+    def _format_messages(self, messages: list[Any]) -> list[dict]:
         formatted_msgs = []
         for msg in messages:
             role = "user"
             if msg.type == "system": role = "system"
             elif msg.type == "ai": role = "assistant"
-            formatted_msgs.append({"role": role, "content": msg.content})
-            
+            elif msg.type == "tool":
+                formatted_msgs.append({"role": "tool", "tool_call_id": msg.tool_call_id, "content": str(msg.content)})
+                continue
+            formatted = {"role": role, "content": msg.content}
+            if getattr(msg, "tool_calls", None):
+                formatted["tool_calls"] = [
+                    {"id": c["id"], "type": "function", "function": {"name": c["name"], "arguments": json.dumps(c["args"])}}
+                    for c in msg.tool_calls
+                ]
+            formatted_msgs.append(formatted)
+        return formatted_msgs
+
+    @staticmethod
+    def _record_usage(response: Any, latency: float):
+        """Prompt/cached token counts (cached_tokens is reported by vLLM and recent llama.cpp builds)."""
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", None) if details is not None else None
+        token_usage.record(usage.prompt_tokens, cached, usage.completion_tokens, latency)
+
+    async def _generate_chat(self, messages: list[Any], model: Optional[str] = None) -> str:
         try:
-            response = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=formatted_msgs,
+            start = time.monotonic()
+            response = await self._chat_completion(
+                model=model,
+                messages=self._format_messages(messages),
                 temperature=0.7
             )
+            self._record_usage(response, time.monotonic() - start)
             return response.choices[0].message.content
         except Exception as e:
             print(f"❌ Local Chat Error: {e}")
             return "I'm offline."
 
-    async def summarize_day(self, context: str) -> str:
+    async def _generate_chat_stream(self, messages: list[Any], model: Optional[str] = None) -> AsyncIterator[str]:
+        streamed = False
+        try:
+            stream = await self._chat_completion(
+                model=model,
+                messages=self._format_messages(messages),
+                temperature=0.7,
+                stream=True
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    streamed = True
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            print(f"❌ Local Chat Stream Error: {e}")
+            if not streamed:
+                yield "I'm offline."
+
+    async def _generate_tool_turn(self, messages: list[Any], tools: list[dict], model: Optional[str] = None,
+                                  on_token: Optional[Callable[[str], Awaitable[None]]] = None) -> ToolTurn:
+        """
+        Native OpenAI-style function calling (vLLM, llama.cpp, LM Studio,
+        Ollama). Servers that reject `tools` are switched to the prompt-based
+        protocol for the rest of the process.
+        """
+        if not self.native_tools:
+            return await super()._generate_tool_turn(messages, tools, model=model, on_token=on_token)
+        from openai import BadRequestError
+        request = dict(model=model, messages=self._format_messages(messages), tools=tools, temperature=0.7)
+        turn = ToolTurn()
+        try:
+            if on_token is None:
+                start = time.monotonic()
+                response = await self._chat_completion(**request)
+                self._record_usage(response, time.monotonic() - start)
+                message = response.choices[0].message
+                turn.text = message.content or ""
+                turn.tool_calls = [ToolCall(name=c.function.name, args=parse_arguments(c.function.arguments), id=c.id)
+                                   for c in message.tool_calls or []]
+                return turn
+
+            # Streamed: text deltas go out live, tool call fragments are assembled by index
+            stream = await self._chat_completion(stream=True, **request)
+            parts, fragments = [], {}
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                if delta.content:
+                    parts.append(delta.content)
+                    turn.streamed = True
+                    await on_token(delta.content)
+                for fragment in delta.tool_calls or []:
+                    call = fragments.setdefault(fragment.index, {"id": None, "name": "", "arguments": ""})
+                    call["id"] = fragment.id or call["id"]
+                    if fragment.function is not None:
+                        call["name"] += fragment.function.name or ""
+                        call["arguments"] += fragment.function.arguments or ""
+            turn.text = "".join(parts)
+            turn.tool_calls = [ToolCall(name=c["name"], args=parse_arguments(c["arguments"]), **({"id": c["id"]} if c["id"] else {}))
+                               for _, c in sorted(fragments.items())]
+            return turn
+        except BadRequestError as e:
+            if turn.streamed:
+                raise
+            print(f"⚠️ Local LLM rejected native tool calling ({e}). Using the prompt-based protocol.")
+            self.native_tools = False
+            return await super()._generate_tool_turn(messages, tools, model=model, on_token=on_token)
+        except Exception as e:
+            print(f"❌ Local Tool Turn Error: {e}")
+            if not turn.streamed and on_token is not None:
+                await on_token("I'm offline.")
+            return ToolTurn(text=turn.text or "I'm offline.", streamed=on_token is not None)
+
+    async def _summarize_day(self, context: str, model: Optional[str] = None) -> str:
         prompt = f"Summarize these logs into a narrative:\n{context}"
         try:
-            response = self.client.chat.completions.create(
-                model=self.model_name,
+            response = await self._chat_completion(
+                model=model,
                 messages=[{"role": "user", "content": prompt}]
             )
             return response.choices[0].message.content
@@ -182,51 +683,119 @@ class LocalProvider:
     async def extract_memory_dimensions(self, full_log: str) -> T:
         # Avoid circular import
         from backend.agents.schemas import MemoryEntry
-        prompt = f"Analyze log and extract MemoryEntry JSON:\n{full_log}"
-        return await self.generate_structured(prompt, MemoryEntry)
+        prompt = "Analyze log and extract MemoryEntry JSON."
+        return await self.generate_structured(prompt, MemoryEntry, context=full_log, call_site="memory_extraction")
 
 
-class GeminiProvider:
+class GeminiProvider(BaseLLMProvider):
     """
     Wrapper for Google's Gemini API using the official `google-genai` SDK.
     """
+    name = "gemini"
+    embedding_model = "text-embedding-004"
+
     def __init__(self):
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
+        self.api_key = os.getenv("GEMINI_API_KEY")
+        if not self.api_key:
             print("⚠️ WARNING: GEMINI_API_KEY not found in environment variables.")
         
-        self.client = genai.Client(api_key=api_key)
         self.model_name = "gemini-2.5-flash"
+        self._client: Optional[Any] = None # genai.Client, built on first use
+        self._client_http: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> Any:
+        """
+        The genai `aio` surface, bound to the shared connection pool.
+        """
+        http_client = get_http_client()
+        if self._client is None or self._client_http is not http_client:
+            genai, types = _genai()
+            self._client = genai.Client(
+                api_key=self.api_key,
+                http_options=types.HttpOptions(httpx_async_client=http_client)
+            )
+            self._client_http = http_client
+        return self._client.aio
+
+    async def warmup(self):
+        try:
+            await asyncio.to_thread(_genai)
+            self.client # Builds the genai client on the shared pool
+        except Exception as e:
+            print(f"⚠️ Gemini warmup failed: {e}")
+
+    def get_stats(self) -> dict:
+        return {**super().get_stats(), "context_cache": gemini_context_cache.get_stats()}
+
+    async def _create_context_cache(self, model: str, system_instruction: str, ttl: int) -> str:
+        _, types = _genai()
+        cache = await self.client.caches.create(
+            model=model,
+            config=types.CreateCachedContentConfig(system_instruction=system_instruction, ttl=f"{ttl}s")
+        )
+        return cache.name
 
-    async def generate_structured(self, prompt: str, schema_model: Type[T], context: str = "") -> T:
+    async def _generate(self, model: str, contents: Any, system_instruction: Optional[str] = None, stream: bool = False, **config) -> Any:
+        """
+        generate_content with the stable system instruction as the request
+        prefix: served from an explicit context cache when enabled (see
+        core/prompt_cache.py), otherwise sent inline where Gemini's implicit
+        prefix caching can match it.
+        """
+        _, types = _genai()
+        # Cached content can't be combined with per-request tools; tool turns
+        # rely on implicit prefix caching instead
+        cacheable = system_instruction if "tools" not in config else ""
+        cached = await gemini_context_cache.get(model, cacheable or "", estimate_tokens, self._create_context_cache)
+        if cached:
+            config["cached_content"] = cached
+        else:
+            config["system_instruction"] = system_instruction
+        generate = self.client.models.generate_content_stream if stream else self.client.models.generate_content
+        try:
+            return await generate(model=model, contents=contents, config=types.GenerateContentConfig(**config))
+        except Exception:
+            if cached:
+                gemini_context_cache.invalidate(model, system_instruction)
+            raise
+
+    @staticmethod
+    def _record_usage(response: Any, latency: float):
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None and usage.prompt_token_count is not None:
+            token_usage.record(usage.prompt_token_count, usage.cached_content_token_count, usage.candidates_token_count, latency)
+
+    async def _generate_structured(self, prompt: str, schema_model: Type[T], context: str = "", model: Optional[str] = None) -> T:
         """
         Generates a structured response strictly adhering to the Pydantic schema.
+        The persona prompt is the system instruction; the context is the turn.
         """
-        full_prompt = f"{context}\n\nTask: {prompt}"
-        
         try:
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=full_prompt,
-                config={
-                    "response_mime_type": "application/json",
-                    "response_json_schema": schema_model.model_json_schema(),
-                },
+            start = time.monotonic()
+            response = await self._generate(
+                model or self.model_name,
+                contents=context or "(no additional context)",
+                system_instruction=f"Task: {prompt}",
+                response_mime_type="application/json",
+                response_json_schema=schema_model.model_json_schema(),
             )
+            self._record_usage(response, time.monotonic() - start)
             return schema_model.model_validate_json(response.text)
             
         except Exception as e:
             print(f"❌ Gemini API Error: {e}")
             raise e
 
-    async def analyze_image(self, image: Any, prompt: str, schema_model: Type[T]) -> T:
+    async def _analyze_image(self, image: Any, prompt: str, schema_model: Type[T], model: Optional[str] = None) -> T:
         """
         Multimodal analysis: Image + Prompt -> Structured Output.
         """
         try:
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=[image, prompt],
+            # Stable prompt first, then the (always different) screenshot
+            response = await self.client.models.generate_content(
+                model=model or self.model_name,
+                contents=[prompt, image],
                 config={
                     "response_mime_type": "application/json",
                     "response_json_schema": schema_model.model_json_schema(),
@@ -237,19 +806,19 @@ class GeminiProvider:
             print(f"❌ Gemini Vision Error: {e}")
             raise e
 
-    async def get_embedding(self, text: str) -> list[float]:
+    async def _embed_batch(self, texts: list[str]) -> list[list[float]]:
         """
-        Generates vector embedding for text using 'text-embedding-004'.
+        Generates vector embeddings for texts using 'text-embedding-004'.
         """
         try:
-            result = self.client.models.embed_content(
-                model="text-embedding-004",
-                contents=text
+            result = await self.client.models.embed_content(
+                model=self.embedding_model,
+                contents=texts
             )
-            return result.embeddings[0].values
+            return [e.values for e in result.embeddings]
         except Exception as e:
             print(f"❌ Gemini Embedding Error: {e}")
-            return []
+            return [[] for _ in texts]
 
     async def extract_memory_dimensions(self, full_log: str) -> T:
         """
@@ -259,24 +828,17 @@ class GeminiProvider:
         from backend.agents.schemas import MemoryEntry
         
         prompt = """
-        Analyze the following health event log.
+        Analyze the health event log given as context.
         Extract structured memory dimensions for the Knowledge Graph.
         
-        Log:
-        {log}
-        
         Return a JSON matching the MemoryEntry schema.
-        """.format(log=full_log)
+        """
         
-        return await self.generate_structured(prompt, MemoryEntry)
+        return await self.generate_structured(prompt, MemoryEntry, context=f"Log:\n{full_log}", call_site="memory_extraction")
 
-    async def generate_chat(self, messages: list[Any]) -> str:
-        """
-        Generates a chat response.
-        Args:
-            messages: List of LangChain message objects (SystemMessage, HumanMessage, AIMessage).
-        """
-        # Convert LangChain messages to Gemini format
+    def _chat_request(self, messages: list[Any]) -> tuple[list[Any], Optional[str]]:
+        """Converts LangChain messages to Gemini contents + system instruction."""
+        _, types = _genai()
         gemini_messages = []
         system_instruction = None
         
@@ -286,21 +848,119 @@ class GeminiProvider:
             elif msg.type == "human":
                 gemini_messages.append(types.Content(role="user", parts=[types.Part.from_text(text=msg.content)]))
             elif msg.type == "ai":
-                gemini_messages.append(types.Content(role="model", parts=[types.Part.from_text(text=msg.content)]))
+                parts = [types.Part.from_text(text=msg.content)] if msg.content else []
+                parts += [types.Part(function_call=types.FunctionCall(name=c["name"], args=c["args"], id=c["id"]))
+                          for c in getattr(msg, "tool_calls", None) or []]
+                gemini_messages.append(types.Content(role="model", parts=parts))
+            elif msg.type == "tool":
+                part = types.Part.from_function_response(name=msg.name, response={"result": str(msg.content)})
+                part.function_response.id = msg.tool_call_id
+                # All results of one parallel call go back in a single turn
+                previous = gemini_messages[-1] if gemini_messages else None
+                if previous is not None and previous.role == "user" and all(p.function_response for p in previous.parts):
+                    previous.parts.append(part)
+                else:
+                    gemini_messages.append(types.Content(role="user", parts=[part]))
                 
+        return gemini_messages, system_instruction
+
+    @staticmethod
+    def _tool_config(tools: list[dict]) -> dict:
+        _, types = _genai()
+        declarations = [
+            types.FunctionDeclaration(name=t["function"]["name"], description=t["function"].get("description", ""),
+                                      parameters_json_schema=t["function"].get("parameters"))
+            for t in tools
+        ]
+        return {
+            "tools": [types.Tool(function_declarations=declarations)],
+            "automatic_function_calling": types.AutomaticFunctionCallingConfig(disable=True),
+        }
+
+    @staticmethod
+    def _split_parts(response: Any) -> tuple[str, list[ToolCall]]:
+        """Reply text and function calls of one response (or stream chunk)."""
+        text, calls = [], []
+        for candidate in (response.candidates or [])[:1]:
+            for part in (candidate.content.parts if candidate.content else None) or []:
+                if part.function_call is not None:
+                    call = part.function_call
+                    calls.append(ToolCall(name=call.name, args=parse_arguments(call.args), **({"id": call.id} if call.id else {})))
+                elif part.text and not part.thought:
+                    text.append(part.text)
+        return "".join(text), calls
+
+    async def _generate_tool_turn(self, messages: list[Any], tools: list[dict], model: Optional[str] = None,
+                                  on_token: Optional[Callable[[str], Awaitable[None]]] = None) -> ToolTurn:
+        """Native Gemini function calling; parallel calls come back as several parts."""
+        contents, system_instruction = self._chat_request(messages)
+        config = self._tool_config(tools)
+        turn = ToolTurn()
         try:
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=gemini_messages,
-                config=types.GenerateContentConfig(
-                    system_instruction=system_instruction
-                )
-            )
+            start = time.monotonic()
+            if on_token is None:
+                response = await self._generate(model or self.model_name, contents, system_instruction, **config)
+                self._record_usage(response, time.monotonic() - start)
+                turn.text, turn.tool_calls = self._split_parts(response)
+                return turn
+
+            stream = await self._generate(model or self.model_name, contents, system_instruction, stream=True, **config)
+            parts, last = [], None
+            async for chunk in stream:
+                last = chunk
+                text, calls = self._split_parts(chunk)
+                turn.tool_calls.extend(calls)
+                if text:
+                    parts.append(text)
+                    turn.streamed = True
+                    await on_token(text)
+            if last is not None:
+                self._record_usage(last, time.monotonic() - start)
+            turn.text = "".join(parts)
+            return turn
+        except Exception as e:
+            print(f"❌ Gemini Tool Turn Error: {e}")
+            fallback = "I'm having trouble connecting to my thought process right now."
+            if not turn.streamed and on_token is not None:
+                await on_token(fallback)
+            return ToolTurn(text=turn.text or fallback, streamed=on_token is not None)
+
+    async def _generate_chat(self, messages: list[Any], model: Optional[str] = None) -> str:
+        """
+        Generates a chat response.
+        Args:
+            messages: List of LangChain message objects (SystemMessage, HumanMessage, AIMessage).
+        """
+        contents, system_instruction = self._chat_request(messages)
+        try:
+            start = time.monotonic()
+            response = await self._generate(model or self.model_name, contents, system_instruction)
+            self._record_usage(response, time.monotonic() - start)
             return response.text if response.text else ""
         except Exception as e:
             print(f"❌ Gemini Chat Error: {e}")
             return "I'm having trouble connecting to my thought process right now."
-    async def summarize_day(self, context: str) -> str:
+
+    async def _generate_chat_stream(self, messages: list[Any], model: Optional[str] = None) -> AsyncIterator[str]:
+        contents, system_instruction = self._chat_request(messages)
+        streamed = False
+        try:
+            start = time.monotonic()
+            stream = await self._generate(model or self.model_name, contents, system_instruction, stream=True)
+            last = None
+            async for chunk in stream:
+                last = chunk
+                if chunk.text:
+                    streamed = True
+                    yield chunk.text
+            if last is not None:
+                self._record_usage(last, time.monotonic() - start) # Usage arrives on the final chunk
+        except Exception as e:
+            print(f"❌ Gemini Chat Stream Error: {e}")
+            if not streamed:
+                yield "I'm having trouble connecting to my thought process right now."
+
+    async def _summarize_day(self, context: str, model: Optional[str] = None) -> str:
         """
         Summarizes a list of raw memory logs into a cohesive narrative.
         """
@@ -320,8 +980,8 @@ class GeminiProvider:
         """
         
         try:
-            response = self.client.models.generate_content(
-                model=self.model_name,
+            response = await self.client.models.generate_content(
+                model=model or self.model_name,
                 contents=prompt
             )
             return response.text if response.text else "No significant events."
@@ -333,5 +993,9 @@ class GeminiProvider:
 provider_type = os.getenv("LLM_PROVIDER", "gemini").lower()
 if provider_type == "local":
     llm_provider = LocalProvider()
+elif provider_type == "replay":
+    # Offline record/replay (see core/replay.py)
+    from backend.core.replay import ReplayProvider
+    llm_provider = ReplayProvider()
 else:
     llm_provider = GeminiProvider()
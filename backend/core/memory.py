@@ -1,97 +1,450 @@
-import chromadb
+import os
 import uuid
+import time
+import asyncio
 import json
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Union
 from backend.core.llm import llm_provider
 from backend.agents.schemas import MemoryEntry
 from backend.core.graph_service import graph_service
+from backend.core.enricher import graph_enricher
+from backend.core.scheduler import llm_priority, Priority
+from backend.core.consolidation import Consolidator, to_epoch
+from backend.core.cold_storage import ColdArchive
+from backend.core.text_index import TextIndex, query_terms
+from backend.core.vector_store import open_vector_store, VECTOR_BACKEND
+from backend.core.dedup import Deduplicator
+from backend.core.recall_cache import RecallCache
+from backend.core.tiers import HotTier, merge_tiers, RECALL_TIERS, RECALL_HOT_K, RECALL_COLD_K, RECALL_COLD_BLOCKS
+
+# Bulk import (add_memories): memories per Chroma write / concurrent LLM extractions
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "64"))
+IMPORT_CONCURRENCY = int(os.getenv("IMPORT_CONCURRENCY", "8"))
+
+# Recall: hybrid | vector | keyword | auto (hybrid, but short keyword queries skip the embedding)
+RECALL_MODE = os.getenv("RECALL_MODE", "auto")
+RECALL_HYBRID_ALPHA = float(os.getenv("RECALL_HYBRID_ALPHA", "0.5")) # Vector weight; 1 - alpha goes to BM25
+RECALL_KEYWORD_TERMS = int(os.getenv("RECALL_KEYWORD_TERMS", "2"))
+RECALL_CANDIDATES = int(os.getenv("RECALL_CANDIDATES", "4")) # Candidates per source, as a multiple of k
 
 class Hippocampus:
     """
     The Long-term Memory System of VitalOS.
-    Uses ChromaDB to store and retrieve 'Health Episodes'.
+    Stores and retrieves 'Health Episodes' in a vector store: ChromaDB, or
+    the in-process NumPy store (VECTOR_BACKEND=numpy, core/vector_store.py).
+
+    Recall spans three tiers: hot (the last HOT_TIER_HOURS in RAM), warm
+    (the vector store + text index) and cold (consolidated memories in
+    the compressed archive, see core/tiers.py).
     """
-    def __init__(self):
-        # Persistent local storage
-        self.client = chromadb.PersistentClient(path="backend/data/chroma")
-        self.collection = self.client.get_or_create_collection(name="health_episodes")
+    def __init__(self, path: str = None, backend: str = VECTOR_BACKEND):
+        # Persistent local storage, opened on first use (chromadb takes ~0.6s
+        # to import). The startup warmup opens it off the event loop.
+        self.backend = backend
+        self.path = path = path or ("backend/data/vectors" if backend == "numpy" else "backend/data/chroma")
+        self._client = None
+        self._collection = None
+        self._open_lock = threading.Lock()
+        self._ts_backfilled = False
+        data_dir = os.path.dirname(os.path.normpath(path))
+        # Consolidated raw memories (compressed, time-indexed segments)
+        self.cold_storage = ColdArchive(os.path.join(data_dir, "cold_storage"))
+        # BM25 index mirroring the collection (hybrid recall)
+        self.text_index = TextIndex(os.path.join(data_dir, "memory_fts.sqlite3"))
+        self._text_index_synced = False
+        self.recall_stats = {"keyword_only": 0, "hybrid": 0, "vector": 0}
+        # Folds repeated readings ("Work, Duration: N minutes") into one memory
+        self.deduper = Deduplicator()
+        # Recent memories with their embeddings, searched exactly in RAM
+        self.hot = HotTier()
+        self.tier_stats = {"hot": 0, "warm": 0, "cold": 0}
+        # Bumped on every change to what recall can return; tags cached results
+        self.generation = 0
+        self._generation_lock = threading.Lock()
+        self.recall_cache = RecallCache()
+
+    def _open(self):
+        with self._open_lock:
+            if self._collection is None:
+                self._client, self._collection = open_vector_store(self.path, self.backend)
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._open()
+        return self._client
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            self._open()
+        return self._collection
 
-    async def add_memory(self, full_log: str):
+    async def warmup(self):
+        """Opens the store in a worker thread so startup never blocks on it."""
+        await asyncio.to_thread(self._open)
+
+    async def add_memory(self, full_log: str, save_graph: bool = True) -> bool:
         """
         Extracts structure, embeds summary, and stores in ChromaDB.
+        Returns False if the memory could not be stored. Hot paths should go
+        through `ingestion_queue.submit` instead (see core/ingestion.py).
         """
+        with llm_priority(Priority.INGESTION):
+            return await self._add_memory(full_log, save_graph)
+
+    async def _add_memory(self, full_log: str, save_graph: bool = True) -> bool:
         try:
             # 1. Extract Structure (GraphRAG Ready)
             entry: MemoryEntry = await llm_provider.extract_memory_dimensions(full_log)
             
             # 2. Generate Summary for Indexing
-            # We use the 'statement' + 'scene' + 'outcome' as the semantic index
-            index_text = f"{entry.scene}: {entry.statement}. Result: {entry.outcome}"
-            
-            # 3. Generate Embedding
-            embedding = await llm_provider.get_embedding(index_text)
-            
+            ts = to_epoch(entry.timestamp) or time.time()
+            index_text = self._index_text(entry)
+
+            # 3. Embed. Near-duplicate of a recent memory? Merge it before paying for enrichment
+            enrichment = None
+            if self.deduper.has_candidates(entry.scene, ts):
+                embedding = await llm_provider.get_embedding(index_text)
+                duplicate = (self.deduper.match_text(entry.scene, entry.statement, ts)
+                             or self.deduper.match_embedding(entry.scene, entry.statement, embedding, ts))
+                if embedding and duplicate and await asyncio.to_thread(self._merge, duplicate, entry, index_text, embedding, ts):
+                    return True
+            else:
+                # Nothing to merge into: embedding and graph enrichment only depend on the extraction, run both at once
+                embedding, enrichment = await asyncio.gather(
+                    llm_provider.get_embedding(index_text),
+                    graph_enricher.enrich_memory(entry.statement),
+                )
+
             if not embedding:
                 print("[Hippocampus] Failed to generate embedding. Skipping.")
-                return
-
-            # 4. Store
-            # ChromaDB metadata cannot hold lists or None. We must serialize/filter them.
-            metadata = json.loads(entry.model_dump_json())
-            clean_metadata = {}
-            for key, value in metadata.items():
-                if value is None:
-                    continue # Skip None values (ChromaDB doesn't support them)
-                if isinstance(value, list):
-                    clean_metadata[key] = json.dumps(value)
-                else:
-                    clean_metadata[key] = value
-            
-            self.collection.add(
+                return False
+
+            # 4. Graph enrichment (never paid for a merged duplicate)
+            if enrichment is None:
+                enrichment = await graph_enricher.enrich_memory(entry.statement)
+
+            # 5. Store
+            # Chroma writes are blocking (SQLite + HNSW); keep them off the event loop
+            memory_id, metadata = str(uuid.uuid4()), self._to_metadata(entry)
+            await asyncio.to_thread(
+                self._write,
+                ids=[memory_id],
                 documents=[index_text],
                 embeddings=[embedding],
-                metadatas=[clean_metadata], 
-                ids=[str(uuid.uuid4())]
+                metadatas=[metadata]
             )
+            self.deduper.remember(memory_id, metadata, embedding, ts)
             print(f"[Hippocampus] Memory Stored: {entry.statement}")
             
-            # 5. Update Knowledge Graph (GraphRAG)
-            await graph_service.add_memory_node(entry)
+            # 6. Update Knowledge Graph (GraphRAG)
+            await graph_service.add_memory_node(entry, enrichment=enrichment, save=save_graph)
+            return True
             
         except Exception as e:
             print(f"[Hippocampus] Error adding memory: {e}")
+            return False
+
+    @staticmethod
+    def _index_text(entry: MemoryEntry) -> str:
+        # We use the 'statement' + 'scene' + 'outcome' as the semantic index
+        return f"{entry.scene}: {entry.statement}. Result: {entry.outcome}"
+
+    @staticmethod
+    def _to_metadata(entry: MemoryEntry) -> Dict[str, Any]:
+        # ChromaDB metadata cannot hold lists or None. We must serialize/filter them.
+        clean_metadata = {}
+        for key, value in json.loads(entry.model_dump_json()).items():
+            if value is None:
+                continue # Skip None values (ChromaDB doesn't support them)
+            clean_metadata[key] = json.dumps(value) if isinstance(value, list) else value
+        # Numeric copy of the timestamp: Chroma only range-filters numbers
+        ts = to_epoch(entry.timestamp)
+        if ts is not None:
+            clean_metadata["ts"] = ts
+        return clean_metadata
+
+    def _max_batch_size(self) -> int:
+        # Chroma reports it on the client; other stores on the collection
+        return self.client.get_max_batch_size() if self.client is not None else self.collection.get_max_batch_size()
+
+    def _bump(self):
+        with self._generation_lock:
+            self.generation += 1
 
-    async def recall(self, query: str, k: int = 3) -> List[MemoryEntry]:
+    @contextmanager
+    def _mutation(self):
         """
-        Retrieves relevant past memories based on semantic similarity.
+        Bumps the generation before and after a store change, so a recall
+        overlapping it (and tagged with either value) is never served later.
         """
+        self._bump()
         try:
-            # 1. Embed Query
-            embedding = await llm_provider.get_embedding(query)
-            if not embedding:
-                return []
-            
-            # 2. Search
-            results = self.collection.query(
-                query_embeddings=[embedding],
-                n_results=k
-            )
-            
+            yield
+        finally:
+            self._bump()
+
+    def _write(self, ids: List[str], documents: List[str], embeddings: List[List[float]], metadatas: List[Dict[str, Any]]):
+        """Upserts into Chroma, the text index and the hot tier (blocking)."""
+        with self._mutation():
+            self.collection.upsert(ids=ids, documents=documents, embeddings=embeddings, metadatas=metadatas)
+            self.text_index.upsert(list(zip(ids, metadatas)))
+            for memory_id, embedding, metadata in zip(ids, embeddings, metadatas):
+                self.hot.add(memory_id, metadata, embedding, metadata.get("ts"))
+
+    def _delete_ids(self, ids: List[str]):
+        """Deletes from Chroma and the text index (blocking)."""
+        with self._mutation():
+            self.collection.delete(ids=ids)
+            self.text_index.delete(ids)
+            self.deduper.forget(ids)
+            self.hot.remove(ids)
+
+    def _merge(self, duplicate, entry: MemoryEntry, index_text: str, embedding: List[float], ts: float) -> bool:
+        """
+        Folds `entry` into a recent near-identical memory: bumps `count`,
+        extends the span to `last_seen` and keeps the newest statement with
+        its document and embedding (blocking). False if that memory is gone
+        (pruned or deleted).
+        """
+        if not self.collection.get(ids=[duplicate.id], include=[])["ids"]:
+            self.deduper.forget([duplicate.id])
+            return False
+        metadata = {**duplicate.metadata, "count": duplicate.metadata.get("count", 1) + 1,
+                    "last_seen": entry.timestamp, "last_ts": ts, "statement": entry.statement}
+        with self._mutation():
+            self.collection.upsert(ids=[duplicate.id], documents=[index_text], embeddings=[embedding], metadatas=[metadata])
+            self.text_index.upsert([(duplicate.id, metadata)])
+            self.hot.update(duplicate.id, metadata, ts, embedding)
+        duplicate.metadata, duplicate.embedding, duplicate.last_ts = metadata, embedding, ts
+        print(f"[Hippocampus] Merged near-duplicate into {duplicate.id} (x{metadata['count']}): {entry.statement}")
+        return True
+
+    def _sync_text_index(self, page_size: int = 1000):
+        """Rebuilds the text index if it drifted from the collection (once per process)."""
+        if self._text_index_synced:
+            return
+        self.backfill_timestamps()
+        if self.text_index.count() != self.collection.count():
+            self.text_index.clear()
+            offset = 0
+            while True:
+                page = self.collection.get(include=["metadatas"], limit=page_size, offset=offset)
+                self.text_index.upsert(list(zip(page["ids"], page["metadatas"])))
+                if len(page["ids"]) < page_size:
+                    break
+                offset += page_size
+            print(f"[Hippocampus] Rebuilt the text index ({self.text_index.count()} memories).")
+        self._text_index_synced = True
+
+    def _load_hot_tier(self):
+        """Fills the hot tier from the store's last HOT_TIER_HOURS (once per process)."""
+        if self.hot.loaded:
+            return
+        self.hot.loaded = True
+        if self.hot.window <= 0:
+            return
+        page = self.collection.get(where={"ts": {"$gte": self.hot.cutoff()}}, include=["metadatas", "embeddings"])
+        embeddings = page.get("embeddings")
+        for i, (memory_id, meta) in enumerate(zip(page["ids"], page["metadatas"])):
+            self.hot.add(memory_id, meta, embeddings[i] if embeddings is not None else None, meta.get("ts"))
+        if len(self.hot):
+            print(f"[Hippocampus] Hot tier loaded with {len(self.hot)} recent memories.")
+
+    def _prepare_recall(self):
+        self._sync_text_index()
+        self._load_hot_tier()
+
+    @staticmethod
+    def _from_metadata(meta: Dict[str, Any], memory_id: str = None) -> Optional[MemoryEntry]:
+        meta = dict(meta)
+        # Deserialize lists (ChromaDB stores them as strings)
+        for key, value in meta.items():
+            if isinstance(value, str) and value.startswith("[") and value.endswith("]"):
+                try:
+                    meta[key] = json.loads(value)
+                except json.JSONDecodeError:
+                    pass
+        try:
+            entry = MemoryEntry(**meta)
+        except Exception as e:
+            print(f"[Hippocampus] Failed to parse memory {memory_id}: {e}")
+            return None
+        if memory_id is not None:
+            entry.id = memory_id
+        return entry
+
+    def backfill_timestamps(self, page_size: int = 1000) -> int:
+        """Adds the numeric `ts` field to memories stored before it existed (once per process)."""
+        if self._ts_backfilled:
+            return 0
+        updated, offset = 0, 0
+        while True:
+            page = self.collection.get(include=["metadatas"], limit=page_size, offset=offset)
+            ids, metadatas = [], []
+            for memory_id, meta in zip(page["ids"], page["metadatas"]):
+                ts = to_epoch(meta.get("timestamp"))
+                if "ts" not in meta and ts is not None:
+                    ids.append(memory_id)
+                    metadatas.append({**meta, "ts": ts})
+            if ids:
+                with self._mutation():
+                    self.collection.update(ids=ids, metadatas=metadatas)
+                    if self._text_index_synced:
+                        self.text_index.upsert(list(zip(ids, metadatas)))
+                updated += len(ids)
+            if len(page["ids"]) < page_size:
+                break
+            offset += page_size
+        self._ts_backfilled = True
+        if updated:
+            print(f"[Hippocampus] Backfilled timestamps on {updated} memories.")
+        return updated
+
+    async def add_memories(self, batch: List[Union[str, MemoryEntry]], batch_size: int = IMPORT_BATCH_SIZE,
+                           enrich: bool = True, concurrency: int = IMPORT_CONCURRENCY) -> Dict[str, Any]:
+        """
+        Bulk path for imports and consolidation. Raw logs (str) are extracted
+        `concurrency` at a time; MemoryEntry items skip extraction. Each chunk
+        of `batch_size` is embedded in batched requests and written with one
+        Chroma upsert (entries keeping their id are imported idempotently).
+        The knowledge graph is saved once at the end; enrich=False skips the
+        per-memory LLM enrichment. Returns a throughput report.
+        """
+        with llm_priority(Priority.INGESTION):
+            return await self._add_memories(batch, batch_size, enrich, concurrency)
+
+    async def _add_memories(self, batch: List[Union[str, MemoryEntry]], batch_size: int, enrich: bool, concurrency: int) -> Dict[str, Any]:
+        start = time.monotonic()
+        report = {"received": len(batch), "stored": 0, "failed": 0}
+        timings = {"extract": 0.0, "embed": 0.0, "write": 0.0, "graph": 0.0}
+        limit = asyncio.Semaphore(concurrency)
+
+        async def extract(item: Union[str, MemoryEntry]) -> Optional[MemoryEntry]:
+            if isinstance(item, MemoryEntry):
+                return item
+            async with limit:
+                try:
+                    return await llm_provider.extract_memory_dimensions(item)
+                except Exception as e:
+                    print(f"[Hippocampus] Extraction failed during import: {e}")
+                    return None
+
+        async def enrichment_for(entry: MemoryEntry) -> Dict[str, Any]:
+            async with limit:
+                return await graph_enricher.enrich_memory(entry.statement)
+
+        size = max(1, min(batch_size, await asyncio.to_thread(self._max_batch_size)))
+        for offset in range(0, len(batch), size):
+            chunk = batch[offset:offset + size]
+
+            # 1. Extract (concurrently, bounded)
+            t = time.monotonic()
+            entries = [e for e in await asyncio.gather(*(extract(item) for item in chunk)) if e is not None]
+            timings["extract"] += time.monotonic() - t
+
+            # 2. Embed (batched requests, cache-aware)
+            t = time.monotonic()
+            embeddings = await llm_provider.get_embeddings([self._index_text(e) for e in entries])
+            timings["embed"] += time.monotonic() - t
+            stored = [(e, v) for e, v in zip(entries, embeddings) if v]
+            report["failed"] += len(chunk) - len(stored)
+            if not stored:
+                continue
+            for entry, _ in stored:
+                entry.id = entry.id or str(uuid.uuid4())
+
+            # 3. One write per chunk
+            t = time.monotonic()
+            try:
+                await asyncio.to_thread(
+                    self._write,
+                    ids=[e.id for e, _ in stored],
+                    documents=[self._index_text(e) for e, _ in stored],
+                    embeddings=[v for _, v in stored],
+                    metadatas=[self._to_metadata(e) for e, _ in stored],
+                )
+            except Exception as e:
+                print(f"[Hippocampus] Batch write failed: {e}")
+                report["failed"] += len(stored)
+                continue
+            timings["write"] += time.monotonic() - t
+            report["stored"] += len(stored)
+
+            # 4. Knowledge graph (saved once at the end)
+            t = time.monotonic()
+            if enrich:
+                enrichments = await asyncio.gather(*(enrichment_for(e) for e, _ in stored))
+            else:
+                enrichments = [{"nodes": [], "edges": []}] * len(stored)
+            for (entry, _), enrichment in zip(stored, enrichments):
+                await graph_service.add_memory_node(entry, enrichment=enrichment, save=False)
+            timings["graph"] += time.monotonic() - t
+
+        await graph_service.flush()
+        elapsed = time.monotonic() - start
+        report["seconds"] = round(elapsed, 3)
+        report["memories_per_sec"] = round(report["stored"] / elapsed, 1) if elapsed > 0 else None
+        report["stage_seconds"] = {stage: round(v, 3) for stage, v in timings.items()}
+        print(f"[Hippocampus] Imported {report['stored']}/{report['received']} memories ({report['memories_per_sec']} memories/sec)")
+        return report
+
+    async def recall(self, query: str, k: int = 3, scene: str = None, user_state: str = None,
+                     start: str = None, end: str = None, mode: str = RECALL_MODE,
+                     tiers: Union[str, List[str]] = RECALL_TIERS) -> List[MemoryEntry]:
+        """
+        Retrieves relevant past memories across the hot, warm and cold tiers.
+
+        Warm: BM25 keyword hits and vector neighbours, with min-max
+        normalized scores blended by RECALL_HYBRID_ALPHA. In "auto" mode,
+        queries of at most RECALL_KEYWORD_TERMS keywords that fill k from
+        the text index are answered without an embedding call.
+        Hot: exact search over recent memories in RAM (RECALL_HOT_K, default k).
+        Cold: keyword search over the archive (RECALL_COLD_K hits from at
+        most RECALL_COLD_BLOCKS decompressed blocks).
+        Filters (scene, user_state, timestamps in [start, end)) apply to
+        every tier; the tiers' [0, 1] scores are merged into the top k.
+        Results are cached until the store changes (see core/recall_cache.py).
+        """
+        try:
+            tiers = [t.strip() for t in tiers.split(",")] if isinstance(tiers, str) else list(tiers)
+            filters = {"scene": scene, "user_state": user_state,
+                       "start_ts": to_epoch(start) if start else None, "end_ts": to_epoch(end) if end else None}
+            if self.hot.evict(): # Aged out of the hot tier
+                self._bump()
+            generation = self.generation
+            key = self.recall_cache.make_key(query, k, filters, mode, tiers)
+            cached = self.recall_cache.get(key, generation)
+            if cached is not None:
+                print(f"[Hippocampus] Recalled {len(cached)} memories (cached).")
+                return cached
+            await asyncio.to_thread(self._prepare_recall)
+            # Cold reads disk only: overlap it with the warm search
+            cold = asyncio.create_task(self._recall_cold(query, filters)) if "cold" in tiers and RECALL_COLD_K > 0 else None
+
+            found, embedding = {}, None
+            if "warm" in tiers:
+                found["warm"], embedding = await self._recall_warm(query, k, filters, mode)
+            if "hot" in tiers and len(self.hot):
+                if embedding is None and "warm" not in tiers and mode != "keyword":
+                    embedding = await llm_provider.get_embedding(query)
+                found["hot"] = self.hot.search(query, embedding, RECALL_HOT_K or k, filters, alpha=RECALL_HYBRID_ALPHA)
+            if cold is not None:
+                found["cold"] = await cold
+
+            hits = merge_tiers({tier: found[tier] for tier in ("hot", "warm", "cold") if tier in found}, k)
             memories = []
-            if results['metadatas']:
-                for meta in results['metadatas'][0]:
-                    # Deserialize lists (ChromaDB stores them as strings)
-                    for key, value in meta.items():
-                        if isinstance(value, str) and value.startswith("[") and value.endswith("]"):
-                            try:
-                                meta[key] = json.loads(value)
-                            except json.JSONDecodeError:
-                                pass
-                                
-                    # Reconstruct Pydantic model from metadata
-                    memories.append(MemoryEntry(**meta))
-                    
+            for memory_id, _, meta, tier in hits:
+                memory = self._from_metadata(meta, memory_id)
+                if memory is not None:
+                    memories.append(memory)
+                    self.tier_stats[tier] += 1
+            # Tagged with the generation read before searching: writes bump before and after, so one overlapping this recall makes it stale
+            self.recall_cache.put(key, generation, memories)
             print(f"[Hippocampus] Recalled {len(memories)} memories.")
             return memories
             
@@ -99,17 +452,78 @@ class Hippocampus:
             print(f"[Hippocampus] Error recalling memory: {e}")
             return []
 
-            return memories
+    async def _recall_warm(self, query: str, k: int, filters: Dict[str, Any], mode: str) -> tuple:
+        """Hybrid search of the vector store and text index: (hits scored in [0, 1], query embedding or None)."""
+        depth = k * max(1, RECALL_CANDIDATES)
+
+        # 1. Keyword search (local, no LLM call)
+        keyword = [] if mode == "vector" else self.text_index.search(query, depth, filters)
+        if mode == "keyword" or (mode == "auto" and len(keyword) >= k and len(query_terms(query)) <= RECALL_KEYWORD_TERMS):
+            self.recall_stats["keyword_only"] += 1
+            top = max((score for _, score, _ in keyword), default=0.0)
+            return [(memory_id, score / top if top > 0 else 1.0, meta) for memory_id, score, meta in keyword[:k]], None
+
+        # 2. Embed Query and Search (same filters)
+        embedding = await llm_provider.get_embedding(query)
+        vector = await asyncio.to_thread(self._vector_search, embedding, depth, filters) if embedding else []
+        if mode == "vector":
+            self.recall_stats["vector"] += 1
+            return vector[:k], embedding
+        self.recall_stats["hybrid"] += 1
+        return self._fuse(keyword, vector, k), embedding
+
+    async def _recall_cold(self, query: str, filters: Dict[str, Any]) -> List[tuple]:
+        try:
+            return await asyncio.to_thread(self.cold_storage.search, query, RECALL_COLD_K, filters, RECALL_COLD_BLOCKS)
         except Exception as e:
-            print(f"[Hippocampus] Error fetching all memories: {e}")
+            print(f"[Hippocampus] Cold tier search failed: {e}")
             return []
 
+    @staticmethod
+    def _where(filters: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Chroma `where` clause for recall filters."""
+        clauses = [{field: filters[field]} for field in ("scene", "user_state") if filters.get(field) is not None]
+        if filters.get("start_ts") is not None:
+            clauses.append({"ts": {"$gte": filters["start_ts"]}})
+        if filters.get("end_ts") is not None:
+            clauses.append({"ts": {"$lt": filters["end_ts"]}})
+        if not clauses:
+            return None
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+    def _vector_search(self, embedding: List[float], n: int, filters: Dict[str, Any]) -> List[tuple]:
+        results = self.collection.query(query_embeddings=[embedding], n_results=n, where=self._where(filters),
+                                        include=["metadatas", "distances"])
+        if not results["ids"]:
+            return []
+        return [(memory_id, 1.0 / (1.0 + distance), meta)
+                for memory_id, distance, meta in zip(results["ids"][0], results["distances"][0], results["metadatas"][0])]
+
+    @staticmethod
+    def _fuse(keyword: List[tuple], vector: List[tuple], k: int) -> List[tuple]:
+        """Blends min-max normalized BM25 and vector scores; memories found by both add up."""
+        def normalized(hits):
+            if not hits:
+                return {}
+            scores = [score for _, score, _ in hits]
+            low, high = min(scores), max(scores)
+            return {memory_id: (score - low) / (high - low) if high > low else 1.0 for memory_id, score, _ in hits}
+
+        blended: Dict[str, list] = {}
+        for hits, weight in ((keyword, 1.0 - RECALL_HYBRID_ALPHA), (vector, RECALL_HYBRID_ALPHA)):
+            scores = normalized(hits)
+            for memory_id, _, meta in hits:
+                entry = blended.setdefault(memory_id, [0.0, meta])
+                entry[0] += weight * scores[memory_id]
+        ranked = sorted(blended.items(), key=lambda item: item[1][0], reverse=True)
+        return [(memory_id, score, meta) for memory_id, (score, meta) in ranked[:k]]
+
     async def delete_memory(self, memory_id: str):
         """
         Deletes a specific memory by ID.
         """
         try:
-            self.collection.delete(ids=[memory_id])
+            self._delete_ids([memory_id])
             print(f"[Hippocampus] Deleted memory: {memory_id}")
             return True
         except Exception as e:
@@ -121,10 +535,14 @@ class Hippocampus:
         Deletes ALL memories.
         """
         try:
-            # ChromaDB doesn't have a truncate, so we get all IDs and delete
-            all_ids = self.collection.get()['ids']
-            if all_ids:
-                self.collection.delete(ids=all_ids)
+            with self._mutation():
+                # ChromaDB doesn't have a truncate, so we get all IDs and delete
+                all_ids = self.collection.get()['ids']
+                if all_ids:
+                    self.collection.delete(ids=all_ids)
+                self.text_index.clear()
+                self.deduper.clear()
+                self.hot.clear()
             print(f"[Hippocampus] Cleared all memories.")
             return True
         except Exception as e:
@@ -136,15 +554,23 @@ class Hippocampus:
         Deletes memories within a time range.
         """
         try:
-            # Use metadata filtering
-            self.collection.delete(
-                where={
-                    "$and": [
-                        {"timestamp": {"$gte": start_iso}},
-                        {"timestamp": {"$lte": end_iso}}
-                    ]
-                }
-            )
+            # Use metadata filtering (on the numeric `ts`: Chroma can't compare strings)
+            start_ts, end_ts = to_epoch(start_iso), to_epoch(end_iso)
+            if start_ts is None or end_ts is None:
+                raise ValueError("start and end must be ISO timestamps")
+            await asyncio.to_thread(self.backfill_timestamps)
+            with self._mutation():
+                self.collection.delete(
+                    where={
+                        "$and": [
+                            {"ts": {"$gte": start_ts}},
+                            {"ts": {"$lte": end_ts}}
+                        ]
+                    }
+                )
+                self.text_index.delete_range(start_ts, end_ts)
+                self.deduper.clear()
+                self.hot.remove_range(start_ts, end_ts)
             print(f"[Hippocampus] Deleted memories between {start_iso} and {end_iso}")
             return True
         except Exception as e:
@@ -161,23 +587,10 @@ class Hippocampus:
             
             print(f"[Hippocampus] Raw results count: {len(results['ids']) if results['ids'] else 0}")
             
-            if results['metadatas']:
-                for i, meta in enumerate(results['metadatas']):
-                    # Deserialize lists
-                    for key, value in meta.items():
-                        if isinstance(value, str) and value.startswith("[") and value.endswith("]"):
-                            try:
-                                meta[key] = json.loads(value)
-                            except json.JSONDecodeError:
-                                pass
-                    
-                    # Inject ID
-                    try:
-                        entry = MemoryEntry(**meta)
-                        entry.id = results['ids'][i]
-                        memories.append(entry)
-                    except Exception as e:
-                         print(f"[Hippocampus] Failed to parse memory {results['ids'][i]}: {e}")
+            for memory_id, meta in zip(results['ids'], results['metadatas'] or []):
+                entry = self._from_metadata(meta, memory_id)
+                if entry is not None:
+                    memories.append(entry)
 
             print(f"[Hippocampus] Returning {len(memories)} valid memories.")
             return memories
@@ -185,6 +598,23 @@ class Hippocampus:
             print(f"[Hippocampus] Error fetching all memories: {e}")
             return []
 
+    async def rehydrate(self, start: str = None, end: str = None, batch_size: int = IMPORT_BATCH_SIZE) -> Dict[str, Any]:
+        """
+        Restores archived memories in [start, end) to active memory, streaming
+        the cold segments batch by batch. Ids are kept, so it is idempotent.
+        """
+        report = {"restored": 0, "failed": 0}
+        batches = self.cold_storage.scan_batches(start, end, size=batch_size)
+        while True:
+            batch = await asyncio.to_thread(next, batches, None)
+            if batch is None:
+                break
+            result = await self.add_memories(batch, batch_size=batch_size, enrich=False)
+            report["restored"] += result["stored"]
+            report["failed"] += result["failed"]
+        print(f"[Hippocampus] Rehydrated {report['restored']} archived memories.")
+        return report
+
     async def get_debug_stats(self):
         """
         Returns raw stats from ChromaDB.
@@ -194,69 +624,31 @@ class Hippocampus:
             peek = self.collection.peek(limit=1)
             return {
                 "count": count,
+                "text_index_count": self.text_index.count(),
+                "recall": self.recall_stats,
+                "tiers": {"hot_memories": len(self.hot), "served": self.tier_stats},
+                "generation": self.generation,
+                "recall_cache": self.recall_cache.get_stats(),
                 "peek_ids": peek['ids'],
                 "peek_metadatas": peek['metadatas']
             }
         except Exception as e:
             return {"error": str(e)}
 
-    async def consolidate_memories(self):
+    async def consolidate_memories(self, start: str = None, end: str = None, **options) -> Dict[str, Any]:
         """
         Wake-Up Consolidation Protocol.
         Summarizes raw 'Moment' logs into 'Episode' nodes and moves raw data to Cold Storage.
+        Works window by window over [start, end) and resumes interrupted runs (see core/consolidation.py).
         """
-        print("[Hippocampus] Starting Consolidation...")
-        try:
-            # 1. Fetch Candidates (All memories for now, ideally filter by type='moment')
-            # In this prototype, we treat all existing memories as candidates for the "previous day"
-            memories = await self.get_all_memories()
-            if not memories:
-                print("[Hippocampus] No memories to consolidate.")
-                return
-
-            # Filter out already consolidated episodes (heuristic: check if 'Summary' in statement)
-            raw_memories = [m for m in memories if "Summary of" not in m.statement]
-            
-            if len(raw_memories) < 5:
-                print("[Hippocampus] Not enough raw memories to consolidate (<5).")
-                return
-
-            # 2. Generate Summary via LLM
-            # We'll just concat the statements for the prompt
-            context = "\n".join([f"[{m.timestamp}] {m.statement}" for m in raw_memories])
-            summary_text = await llm_provider.summarize_day(context)
-            
-            # 3. Create Episode Memory
-            episode = MemoryEntry(
-                id=str(uuid.uuid4()),
-                timestamp=datetime.now().isoformat(),
-                statement=f"Summary of previous session: {summary_text}",
-                scene="Mind Palace",
-                outcome="Consolidated",
-                entities=[],
-                user_state="Reflective",
-                remarks="Generated by Wake-Up Consolidation"
-            )
-            await self.add_memory(episode.model_dump_json()) # Add back to graph/chroma
-            
-            # 4. Cold Storage (Zero Data Loss)
-            import os
-            cold_path = "backend/data/cold_storage/archive.jsonl"
-            os.makedirs(os.path.dirname(cold_path), exist_ok=True)
-            
-            with open(cold_path, "a") as f:
-                for m in raw_memories:
-                    f.write(m.model_dump_json() + "\n")
-            
-            print(f"[Hippocampus] Archived {len(raw_memories)} memories to {cold_path}")
-
-            # 5. Prune from Active Memory
-            ids_to_delete = [m.id for m in raw_memories]
-            self.collection.delete(ids=ids_to_delete)
-            print(f"[Hippocampus] Pruned {len(ids_to_delete)} raw memories from active storage.")
-            
-        except Exception as e:
-            print(f"[Hippocampus] Consolidation failed: {e}")
+        with llm_priority(Priority.BACKGROUND):
+            try:
+                return await Consolidator(self, **options).run(start, end)
+            except Exception as e:
+                print(f"[Hippocampus] Consolidation failed: {e}")
+                return {"error": str(e)}
+            finally:
+                self._bump() # Memories moved to the cold tier
 
 # Global Instance
 hippocampus = Hippocampus()
@@ -0,0 +1,101 @@
+import os
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+# Cheapest first. Validation failures escalate along this ladder.
+TIERS = ["fast", "standard", "pro"]
+
+# Call site -> tier. Cheap, schema-constrained decisions run on the fast tier;
+# the synthesizer and free-form reasoning stay on the standard model.
+ROUTES: Dict[str, str] = {
+    "triage": "fast",
+    "enricher": "fast",
+    "maestro": "fast",
+    "memory_extraction": "fast",
+    "chat_summary": "fast",
+    "doctor": "standard",
+    "coach": "standard",
+    "synthesizer": "standard",
+    "vision": "standard",
+    "chat": "standard",
+    "summary": "standard",
+}
+
+# Provider -> tier -> model. None means "the provider's default model"
+# (for LocalProvider: whatever each endpoint auto-detected). Cloud Mode keeps
+# the fast tier on gemini-2.5-flash unless GEMINI_MODEL_FAST picks a cheaper one.
+TIER_MODELS: Dict[str, Dict[str, Optional[str]]] = {
+    "gemini": {
+        "fast": os.getenv("GEMINI_MODEL_FAST", "gemini-2.5-flash"),
+        "standard": os.getenv("GEMINI_MODEL_STANDARD", "gemini-2.5-flash"),
+        "pro": os.getenv("GEMINI_MODEL_PRO", "gemini-2.5-pro"),
+    },
+    "local": {
+        "fast": os.getenv("LOCAL_LLM_MODEL_FAST"),
+        "standard": os.getenv("LOCAL_LLM_MODEL_STANDARD"),
+        "pro": os.getenv("LOCAL_LLM_MODEL_PRO"),
+    },
+}
+
+def _parse_route_overrides(raw: str) -> Dict[str, str]:
+    """'triage=standard,synthesizer=pro' -> {'triage': 'standard', 'synthesizer': 'pro'}"""
+    overrides = {}
+    for pair in raw.split(","):
+        if "=" in pair:
+            site, tier = (x.strip() for x in pair.split("=", 1))
+            if tier in TIERS:
+                overrides[site] = tier
+    return overrides
+
+class ModelRouter:
+    """
+    Maps call sites to model tiers and records per-route latency so the
+    routing table can be tuned from real traffic (see /llm/stats).
+    """
+    def __init__(self, routes: Optional[Dict[str, str]] = None, tier_models: Optional[Dict[str, Dict[str, Optional[str]]]] = None):
+        self.routes = dict(ROUTES if routes is None else routes)
+        self.tier_models = TIER_MODELS if tier_models is None else tier_models
+        self._latencies: Dict[Tuple[str, str], Deque[float]] = {}
+        self._counts: Dict[Tuple[str, str], Dict[str, int]] = {}
+
+    def tier_for(self, call_site: Optional[str]) -> str:
+        return self.routes.get(call_site or "", "standard")
+
+    def resolve(self, provider: str, call_site: Optional[str]) -> Optional[str]:
+        """Model for a call site (None = provider default)."""
+        return self.candidates(provider, call_site)[0]
+
+    def candidates(self, provider: str, call_site: Optional[str]) -> List[Optional[str]]:
+        """
+        Models to try for a call site, in order: the routed tier first, then
+        every bigger tier as a fallback. Duplicates are dropped.
+        """
+        models = self.tier_models.get(provider, {})
+        ladder = TIERS[TIERS.index(self.tier_for(call_site)):]
+        ordered: List[Optional[str]] = []
+        for tier in ladder:
+            model = models.get(tier)
+            if model not in ordered:
+                ordered.append(model)
+        return ordered
+
+    def record(self, call_site: Optional[str], model: Optional[str], latency: float, outcome: str = "ok"):
+        """outcome: 'ok', 'fallback' (schema validation failed) or 'error'."""
+        key = (call_site or "unrouted", model or "default")
+        self._latencies.setdefault(key, deque(maxlen=256)).append(latency)
+        counts = self._counts.setdefault(key, {"ok": 0, "fallback": 0, "error": 0})
+        counts[outcome] = counts.get(outcome, 0) + 1
+
+    def get_stats(self) -> dict:
+        stats = {}
+        for (site, model), latencies in self._latencies.items():
+            ordered = sorted(latencies)
+            stats.setdefault(site, {})[model] = {
+                **self._counts[(site, model)],
+                "avg_ms": round(1000 * sum(ordered) / len(ordered), 1),
+                "p95_ms": round(1000 * ordered[int(0.95 * (len(ordered) - 1))], 1),
+            }
+        return {"routes": {site: self.tier_for(site) for site in self.routes}, "latency": stats}
+
+# Global Instance
+model_router = ModelRouter(routes={**ROUTES, **_parse_route_overrides(os.getenv("LLM_ROUTES", ""))})
@@ -0,0 +1,142 @@
+import os
+import time
+import asyncio
+import hashlib
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+# Share of the price of a prompt token that a cached token saves (Gemini
+# bills cached input at a discount; vLLM/llama.cpp skip the prefill instead).
+CACHED_TOKEN_DISCOUNT = float(os.getenv("LLM_CACHED_TOKEN_DISCOUNT", "0.75"))
+
+# The call site of the LLM call currently running (set by BaseLLMProvider) so
+# providers can attribute token usage without threading it through every call.
+current_call_site: ContextVar[str] = ContextVar("llm_call_site", default="unrouted")
+
+@contextmanager
+def llm_call_site(call_site: Optional[str]):
+    token = current_call_site.set(call_site or "unrouted")
+    try:
+        yield
+    finally:
+        current_call_site.reset(token)
+
+class TokenUsage:
+    """
+    Per-call-site prompt token accounting: how much of each prompt was served
+    from the server's prefix/context cache, and how latency compares between
+    calls that hit the cache and calls that didn't.
+    """
+    def __init__(self, window: int = 256):
+        self.window = window
+        self._totals: Dict[str, Dict[str, int]] = {}
+        self._latency: Dict[Tuple[str, bool], Deque[float]] = {}
+
+    def record(self, prompt_tokens: Optional[int], cached_tokens: Optional[int], output_tokens: Optional[int] = None,
+               latency: Optional[float] = None, call_site: Optional[str] = None):
+        site = call_site or current_call_site.get()
+        totals = self._totals.setdefault(site, {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0, "output_tokens": 0})
+        totals["calls"] += 1
+        totals["prompt_tokens"] += prompt_tokens or 0
+        totals["cached_tokens"] += cached_tokens or 0
+        totals["output_tokens"] += output_tokens or 0
+        if latency is not None:
+            self._latency.setdefault((site, bool(cached_tokens)), deque(maxlen=self.window)).append(latency)
+
+    def _avg_ms(self, site: str, cached: bool) -> Optional[float]:
+        samples = self._latency.get((site, cached))
+        return round(1000 * sum(samples) / len(samples), 1) if samples else None
+
+    def get_stats(self) -> dict:
+        stats = {}
+        for site, totals in self._totals.items():
+            ratio = totals["cached_tokens"] / totals["prompt_tokens"] if totals["prompt_tokens"] else 0.0
+            stats[site] = {
+                **totals,
+                "cached_ratio": round(ratio, 4),
+                "est_prompt_cost_saved": round(ratio * CACHED_TOKEN_DISCOUNT, 4),
+                "avg_ms_cache_hit": self._avg_ms(site, True),
+                "avg_ms_cache_miss": self._avg_ms(site, False),
+            }
+        return stats
+
+class GeminiContextCache:
+    """
+    Explicit Gemini context caching for stable prompt prefixes (persona
+    system instructions).
+
+    One cached-content resource per (model, prefix). Prefixes below the
+    model's minimum cacheable size are skipped up front; a prefix the API
+    refuses is not retried for `retry_after` seconds. Entries are renewed
+    shortly before their TTL runs out. Gemini's implicit prefix caching still
+    applies when this is off: the layout alone (stable system text first)
+    is what makes it hit.
+    """
+    def __init__(self, enabled: bool = False, ttl: int = 3600, min_tokens: int = 1024, retry_after: float = 600.0):
+        self.enabled = enabled
+        self.ttl = ttl
+        self.min_tokens = min_tokens
+        self.retry_after = retry_after
+        self._entries: Dict[str, Tuple[str, float]] = {} # key -> (cache name, expires_at)
+        self._refused: Dict[str, float] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.stats = {"created": 0, "reused": 0, "skipped_small": 0, "errors": 0}
+
+    @staticmethod
+    def key(model: str, system_instruction: str) -> str:
+        return hashlib.sha256(f"{model}\n{system_instruction}".encode("utf-8")).hexdigest()
+
+    async def get(self, model: str, system_instruction: str, estimate_tokens: Callable[[str], int],
+                  create: Callable[[str, str, int], Any]) -> Optional[str]:
+        """
+        Returns the cached-content name for this prefix, creating it with
+        `create(model, system_instruction, ttl_seconds)` if needed. None
+        means: send the prefix inline.
+        """
+        if not self.enabled or not system_instruction:
+            return None
+        if estimate_tokens(system_instruction) < self.min_tokens:
+            self.stats["skipped_small"] += 1
+            return None
+        key = self.key(model, system_instruction)
+        now = time.monotonic()
+        if self._refused.get(key, 0.0) > now:
+            return None
+        entry = self._entries.get(key)
+        if entry and entry[1] > now:
+            self.stats["reused"] += 1
+            return entry[0]
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            entry = self._entries.get(key)
+            if entry and entry[1] > time.monotonic():
+                self.stats["reused"] += 1
+                return entry[0]
+            try:
+                name = await create(model, system_instruction, self.ttl)
+            except Exception as e:
+                print(f"⚠️ Gemini context cache unavailable for {model}: {e}")
+                self.stats["errors"] += 1
+                self._refused[key] = time.monotonic() + self.retry_after
+                return None
+            # Renew a minute early so requests never reference an expired cache
+            self._entries[key] = (name, time.monotonic() + max(1, self.ttl - 60))
+            self.stats["created"] += 1
+            return name
+
+    def invalidate(self, model: str, system_instruction: str):
+        self._entries.pop(self.key(model, system_instruction), None)
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "enabled": self.enabled, "entries": len(self._entries)}
+
+# Global Instances
+token_usage = TokenUsage()
+gemini_context_cache = GeminiContextCache(
+    enabled=os.getenv("GEMINI_CONTEXT_CACHE", "0") == "1",
+    ttl=int(os.getenv("GEMINI_CONTEXT_CACHE_TTL", "3600")),
+    min_tokens=int(os.getenv("GEMINI_CONTEXT_CACHE_MIN_TOKENS", "1024")),
+)
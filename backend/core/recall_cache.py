@@ -0,0 +1,72 @@
+import os
+import json
+import time
+import hashlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from backend.agents.schemas import MemoryEntry
+from backend.core.embedding_cache import normalize_text
+
+RECALL_CACHE = os.getenv("RECALL_CACHE", "1") != "0"
+RECALL_CACHE_SIZE = int(os.getenv("RECALL_CACHE_SIZE", "256"))
+RECALL_CACHE_TTL = float(os.getenv("RECALL_CACHE_TTL", "600")) # Bounds drift from hot-tier aging
+
+class RecallCache:
+    """
+    LRU cache for `Hippocampus.recall` results, keyed by (query hash, k,
+    filters, mode, tiers). Each entry is tagged with the store generation
+    it was computed at; Hippocampus bumps the generation on every write,
+    delete, clear and consolidation, so an entry from an older generation
+    is never served.
+    """
+    def __init__(self, max_entries: int = RECALL_CACHE_SIZE, enabled: bool = RECALL_CACHE, ttl: float = RECALL_CACHE_TTL):
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple[int, float, List[MemoryEntry]]]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "stale": 0, "expired": 0, "evicted": 0}
+
+    @staticmethod
+    def make_key(query: str, k: int, filters: Dict[str, Any], mode: str, tiers: List[str]) -> str:
+        digest = hashlib.sha256(normalize_text(query).encode("utf-8")).hexdigest()
+        raw = json.dumps([digest, k, filters, mode, sorted(tiers)], sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, generation: int) -> Optional[List[MemoryEntry]]:
+        if not self.enabled:
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        tagged, expires_at, memories = entry
+        if tagged != generation or time.monotonic() >= expires_at:
+            del self._entries[key]
+            self.stats["stale" if tagged != generation else "expired"] += 1
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        # Callers may edit the entries they get back
+        return [m.model_copy(deep=True) for m in memories]
+
+    def put(self, key: str, generation: int, memories: List[MemoryEntry]):
+        if not self.enabled:
+            return
+        self._entries[key] = (generation, time.monotonic() + self.ttl, [m.model_copy(deep=True) for m in memories])
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evicted"] += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+        }
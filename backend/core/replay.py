@@ -0,0 +1,378 @@
+import os
+import gzip
+import json
+import time
+import base64
+import random
+import struct
+import asyncio
+import hashlib
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Type, TypeVar
+from pydantic import BaseModel
+from backend.core.llm import BaseLLMProvider, GeminiProvider, LocalProvider
+from backend.core.embedding_cache import normalize_text
+from backend.core.response_cache import schema_fingerprint
+from backend.core.tool_calling import ToolTurn
+
+T = TypeVar("T", bound=BaseModel)
+
+CASSETTE_VERSION = 1
+DEFAULT_CASSETTE = "backend/data/llm_cassette.jsonl.gz"
+DEFAULT_EMBED_DIM = 768
+
+# Providers a cassette can be recorded from (also decides which memory
+# extraction prompt is used on replay, so keys line up).
+PROVIDER_CLASSES = {"gemini": GeminiProvider, "local": LocalProvider}
+
+# --- Compact encoding ---
+
+def encode_vector(vector: List[float]) -> str:
+    """float16 + base64: ~2.7 bytes per dimension instead of ~20 in JSON."""
+    return base64.b64encode(struct.pack(f"<{len(vector)}e", *vector)).decode("ascii")
+
+def decode_vector(blob: str) -> List[float]:
+    raw = base64.b64decode(blob)
+    return list(struct.unpack(f"<{len(raw) // 2}e", raw))
+
+def synthetic_vector(text: str, dim: int) -> List[float]:
+    """Deterministic unit vector for texts missing from the cassette."""
+    rng = random.Random(hashlib.sha256(text.encode("utf-8")).digest())
+    vector = [rng.gauss(0.0, 1.0) for _ in range(dim)]
+    norm = sum(v * v for v in vector) ** 0.5 or 1.0
+    return [v / norm for v in vector]
+
+def _key(*parts: Any) -> str:
+    raw = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:24]
+
+def _messages_key(messages: List[Any]) -> list:
+    key = []
+    for msg in messages:
+        entry = [msg.type, normalize_text(str(msg.content))]
+        # Tool calls are keyed by name and args (their ids are random)
+        if getattr(msg, "tool_calls", None):
+            entry.append([[c["name"], c["args"]] for c in msg.tool_calls])
+        key.append(entry)
+    return key
+
+def _image_digest(image: Any) -> str:
+    try:
+        return hashlib.sha256(image.tobytes()).hexdigest()[:16]
+    except Exception:
+        return hashlib.sha256(repr(image).encode("utf-8")).hexdigest()[:16]
+
+# --- Synthetic latency ---
+
+class LatencyModel:
+    """
+    Synthetic latency for replayed calls, per call kind.
+
+    Spec examples (LLM_REPLAY_LATENCY):
+      'recorded'                              - sleep what the real call took (default)
+      'none'                                  - no delay
+      'fixed:200'                             - 200 ms
+      'normal:800,150'                        - mean, stddev (ms)
+      'lognormal:600,0.5'                     - median (ms), sigma
+      'chat=lognormal:900,0.4;embedding=fixed:30;*=recorded'
+    Samples come from a seeded RNG, so runs are reproducible.
+    """
+    def __init__(self, spec: str = "recorded", seed: int = 0, scale: float = 1.0):
+        self.rules: Dict[str, tuple] = {}
+        self.scale = scale
+        self._rng = random.Random(seed)
+        for part in (spec or "recorded").split(";"):
+            part = part.strip()
+            if not part:
+                continue
+            kind, _, dist = part.partition("=") if "=" in part.split(":")[0] else ("*", "", part)
+            self.rules[kind.strip() or "*"] = self._parse(dist.strip())
+
+    @staticmethod
+    def _parse(dist: str) -> tuple:
+        name, _, args = dist.partition(":")
+        params = [float(x) for x in args.split(",") if x.strip()]
+        if name not in ("recorded", "none", "fixed", "normal", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {dist}")
+        return (name, params)
+
+    def sample(self, kind: str, recorded: Optional[float]) -> float:
+        name, params = self.rules.get(kind, self.rules.get("*", ("recorded", [])))
+        if name == "recorded":
+            seconds = recorded or 0.0
+        elif name == "none":
+            seconds = 0.0
+        elif name == "fixed":
+            seconds = params[0] / 1000
+        elif name == "normal":
+            seconds = max(0.0, self._rng.gauss(params[0], params[1] if len(params) > 1 else 0.0)) / 1000
+        else:
+            seconds = self._rng.lognormvariate(0.0, params[1] if len(params) > 1 else 0.5) * params[0] / 1000
+        return seconds * self.scale
+
+# --- Cassette ---
+
+class Cassette:
+    """
+    Append-only, gzip-compressed JSONL of recorded calls.
+
+    One header line ({"v", "provider", "embedding_model"}) followed by one
+    record per call: {"t": kind, "k": key, "g": group, "l": latency, "r": response}.
+    `group` clusters interchangeable records (e.g. same schema) so unseen
+    inputs can be answered deterministically from a recorded neighbour.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.header: Dict[str, Any] = {}
+        self.records: Dict[str, dict] = {}
+        self.groups: Dict[str, List[str]] = {}
+        if os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if "v" in record:
+                    self.header = record
+                else:
+                    self._index(record)
+
+    def _index(self, record: dict):
+        if record["k"] not in self.records:
+            self.groups.setdefault(f'{record["t"]}:{record["g"]}', []).append(record["k"])
+        self.records[record["k"]] = record
+
+    def _append(self, lines: List[dict]):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # gzip members concatenate, so appending keeps the file readable
+        with gzip.open(self.path, "at", encoding="utf-8") as f:
+            for line in lines:
+                f.write(json.dumps(line, separators=(",", ":")) + "\n")
+
+    def start(self, provider: str, embedding_model: str):
+        if not self.header:
+            self.header = {"v": CASSETTE_VERSION, "provider": provider, "embedding_model": embedding_model}
+            self._append([self.header])
+
+    def add(self, kind: str, key: str, group: str, latency: float, response: Any):
+        record = {"t": kind, "k": key, "g": group, "l": round(latency, 4), "r": response}
+        self._index(record)
+        self._append([record])
+
+    def get(self, key: str) -> Optional[dict]:
+        return self.records.get(key)
+
+    def nearest(self, kind: str, group: str, key: str) -> Optional[dict]:
+        """Deterministic stand-in for a missing key: same kind and group, picked by key hash."""
+        keys = self.groups.get(f"{kind}:{group}")
+        if not keys:
+            return None
+        return self.records[keys[int(key, 16) % len(keys)]]
+
+class CassetteMiss(KeyError):
+    pass
+
+# --- Provider ---
+
+class ReplayProvider(BaseLLMProvider):
+    """
+    Records real provider calls into a cassette, or replays them offline.
+
+    Only the raw backend calls are recorded/replayed; caching, coalescing,
+    batching, scheduling and routing in BaseLLMProvider run for real, so
+    benchmarks measure our own code paths. In replay mode unseen inputs get
+    a deterministic stand-in (a recorded neighbour, or a synthetic embedding)
+    unless `strict` is set.
+    """
+    def __init__(self, mode: Optional[str] = None, cassette_path: Optional[str] = None,
+                 inner: Optional[BaseLLMProvider] = None, latency: Optional[LatencyModel] = None,
+                 strict: Optional[bool] = None):
+        self.mode = (mode or os.getenv("LLM_REPLAY_MODE", "replay")).lower()
+        self.cassette = Cassette(cassette_path or os.getenv("LLM_REPLAY_CASSETTE", DEFAULT_CASSETTE))
+        self.latency = latency or LatencyModel(
+            os.getenv("LLM_REPLAY_LATENCY", "recorded"),
+            seed=int(os.getenv("LLM_REPLAY_SEED", "0")),
+            scale=float(os.getenv("LLM_REPLAY_LATENCY_SCALE", "1")),
+        )
+        self.strict = os.getenv("LLM_REPLAY_STRICT", "0") == "1" if strict is None else strict
+        self.stats = {"hits": 0, "stand_ins": 0, "synthetic": 0, "recorded": 0}
+
+        if self.mode == "record":
+            if inner is None:
+                inner_type = os.getenv("LLM_REPLAY_INNER", "gemini").lower()
+                inner = PROVIDER_CLASSES[inner_type]()
+            self.inner = inner
+            # Route and cache exactly like the recorded provider
+            self.name = inner.name
+            self.embedding_model = inner.embedding_model
+            self.cassette.start(inner.name, inner.embedding_model)
+            print(f"📼 Recording LLM calls from '{inner.name}' to {self.cassette.path}")
+        else:
+            self.inner = None
+            self.name = "replay"
+            self.embedding_model = self.cassette.header.get("embedding_model", "replay")
+            print(f"📼 Replaying LLM calls from {self.cassette.path} ({len(self.cassette.records)} records)")
+
+    @property
+    def model_name(self) -> str:
+        return self.inner.model_name if self.inner is not None else "replay"
+
+    @property
+    def cache_model(self) -> str:
+        return self.inner.cache_model if self.inner is not None else "replay"
+
+    @property
+    def source_provider(self) -> str:
+        return self.inner.name if self.inner is not None else self.cassette.header.get("provider", "gemini")
+
+    # --- Record / replay core ---
+
+    async def _call(self, kind: str, key: str, group: str, record_fn, encode, decode) -> Any:
+        if self.inner is not None:
+            start = time.monotonic()
+            result = await record_fn()
+            self.cassette.add(kind, key, group, time.monotonic() - start, encode(result))
+            self.stats["recorded"] += 1
+            return result
+
+        record = self._lookup(kind, key, group)
+        await asyncio.sleep(self.latency.sample(kind, record.get("l")))
+        return decode(record["r"])
+
+    def _lookup(self, kind: str, key: str, group: str) -> dict:
+        record = self.cassette.get(key)
+        if record is not None:
+            self.stats["hits"] += 1
+            return record
+        if not self.strict:
+            record = self.cassette.nearest(kind, group, key)
+            if record is not None:
+                self.stats["stand_ins"] += 1
+                return record
+        raise CassetteMiss(f"No recorded {kind} call for key {key} (group {group})")
+
+    async def _generate_structured(self, prompt: str, schema_model: Type[T], context: str = "", model: Optional[str] = None) -> T:
+        group = schema_fingerprint(schema_model)
+        return await self._call(
+            "structured", _key("structured", prompt, context, group), group,
+            lambda: self.inner._generate_structured(prompt, schema_model, context, model=model),
+            lambda result: result.model_dump(mode="json"),
+            schema_model.model_validate,
+        )
+
+    async def _analyze_image(self, image: Any, prompt: str, schema_model: Type[T], model: Optional[str] = None) -> T:
+        group = schema_fingerprint(schema_model)
+        return await self._call(
+            "vision", _key("vision", prompt, _image_digest(image), group), group,
+            lambda: self.inner._analyze_image(image, prompt, schema_model, model=model),
+            lambda result: result.model_dump(mode="json"),
+            schema_model.model_validate,
+        )
+
+    async def _generate_chat(self, messages: list[Any], model: Optional[str] = None) -> str:
+        return await self._call(
+            "chat", _key("chat", _messages_key(messages)), "chat",
+            lambda: self.inner._generate_chat(messages, model=model),
+            lambda text: text, lambda text: text,
+        )
+
+    async def _generate_chat_stream(self, messages: list[Any], model: Optional[str] = None) -> AsyncIterator[str]:
+        if self.inner is not None:
+            # Record the stream as one chat entry (replay re-chunks it)
+            start = time.monotonic()
+            parts = []
+            async for delta in self.inner._generate_chat_stream(messages, model=model):
+                parts.append(delta)
+                yield delta
+            self.cassette.add("chat", _key("chat", _messages_key(messages)), "chat", time.monotonic() - start, "".join(parts))
+            self.stats["recorded"] += 1
+            return
+
+        record = self._lookup("chat", _key("chat", _messages_key(messages)), "chat")
+
+        # ~30% of the latency before the first token, the rest spread over the chunks
+        total = self.latency.sample("chat", record.get("l"))
+        words = record["r"].split(" ")
+        chunks = [" ".join(words[i:i + 4]) + (" " if i + 4 < len(words) else "") for i in range(0, len(words), 4)]
+        await asyncio.sleep(0.3 * total)
+        for chunk in chunks:
+            await asyncio.sleep(0.7 * total / len(chunks))
+            yield chunk
+
+    async def _generate_tool_turn(self, messages: list[Any], tools: list[dict], model: Optional[str] = None,
+                                  on_token: Optional[Callable[[str], Awaitable[None]]] = None) -> ToolTurn:
+        key = _key("tools", _messages_key(messages), sorted(t["function"]["name"] for t in tools))
+        if self.inner is not None:
+            start = time.monotonic()
+            turn = await self.inner._generate_tool_turn(messages, tools, model=model, on_token=on_token)
+            self.cassette.add("tools", key, "tools", time.monotonic() - start, turn.to_dict())
+            self.stats["recorded"] += 1
+            return turn
+
+        record = self._lookup("tools", key, "tools")
+        await asyncio.sleep(self.latency.sample("tools", record.get("l")))
+        turn = ToolTurn.from_dict(record["r"])
+        if on_token is not None and turn.text:
+            await on_token(turn.text)
+            turn.streamed = True
+        return turn
+
+    async def _summarize_day(self, context: str, model: Optional[str] = None) -> str:
+        return await self._call(
+            "summary", _key("summary", context), "summary",
+            lambda: self.inner._summarize_day(context, model=model),
+            lambda text: text, lambda text: text,
+        )
+
+    async def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        if self.inner is not None:
+            start = time.monotonic()
+            vectors = await self.inner._embed_batch(texts)
+            latency = (time.monotonic() - start) / max(1, len(texts))
+            for text, vector in zip(texts, vectors):
+                if vector:
+                    self.cassette.add("embedding", _key("embedding", normalize_text(text)), "embedding", latency, encode_vector(vector))
+                    self.stats["recorded"] += 1
+            return vectors
+
+        vectors, latency = [], 0.0
+        for text in texts:
+            record = self.cassette.get(_key("embedding", normalize_text(text)))
+            if record is not None:
+                self.stats["hits"] += 1
+                vectors.append(decode_vector(record["r"]))
+                latency = max(latency, self.latency.sample("embedding", record.get("l")))
+            elif self.strict:
+                raise CassetteMiss(f"No recorded embedding for: {text[:60]}")
+            else:
+                # Synthetic vectors keep cosine geometry stable across runs
+                self.stats["synthetic"] += 1
+                vectors.append(synthetic_vector(normalize_text(text), self._embed_dim()))
+                latency = max(latency, self.latency.sample("embedding", None))
+        # One batch request: pay the slowest item once
+        await asyncio.sleep(latency)
+        return vectors
+
+    def _embed_dim(self) -> int:
+        keys = self.cassette.groups.get("embedding:embedding")
+        if keys:
+            return len(decode_vector(self.cassette.records[keys[0]]["r"]))
+        return DEFAULT_EMBED_DIM
+
+    async def extract_memory_dimensions(self, full_log: str) -> T:
+        # Same prompt as the recorded provider, so keys match on replay
+        source = PROVIDER_CLASSES.get(self.source_provider, GeminiProvider)
+        return await source.extract_memory_dimensions(self, full_log)
+
+    async def warmup(self):
+        if self.inner is not None:
+            await self.inner.warmup()
+
+    async def aclose(self):
+        if self.inner is not None:
+            await self.inner.aclose()
+
+    def get_stats(self) -> dict:
+        return {**super().get_stats(), "replay": {"mode": self.mode, "records": len(self.cassette.records), **self.stats}}
@@ -0,0 +1,98 @@
+import os
+import json
+import time
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Optional, Type
+from pydantic import BaseModel
+
+# Per-call-site TTLs (seconds). Call sites missing here (chat, summaries, anything
+# creative) bypass the cache entirely - caching is strictly opt-in. Only the
+# deterministic routing/extraction calls are cached by default.
+CACHE_POLICIES: Dict[str, float] = {
+    "triage": 900,
+    "maestro": 900,
+    "memory_extraction": 3600,
+}
+
+# Health assessments: cached only with LLM_RESPONSE_CACHE_ASSESSMENTS=1
+ASSESSMENT_POLICIES: Dict[str, float] = {
+    "doctor": 600,
+    "coach": 600,
+    "synthesizer": 600,
+}
+if os.getenv("LLM_RESPONSE_CACHE_ASSESSMENTS", "0") == "1":
+    CACHE_POLICIES.update(ASSESSMENT_POLICIES)
+
+_schema_fingerprints: Dict[Type[BaseModel], str] = {}
+
+def schema_fingerprint(schema_model: Type[BaseModel]) -> str:
+    """Stable hash of a Pydantic model's JSON schema (memoized per class)."""
+    fingerprint = _schema_fingerprints.get(schema_model)
+    if fingerprint is None:
+        schema = json.dumps(schema_model.model_json_schema(), sort_keys=True)
+        fingerprint = hashlib.sha256(schema.encode("utf-8")).hexdigest()[:16]
+        _schema_fingerprints[schema_model] = fingerprint
+    return fingerprint
+
+class ResponseCache:
+    """
+    TTL + LRU cache for validated `generate_structured` results.
+    Keyed by (model, prompt, context, schema fingerprint).
+    """
+    def __init__(self, max_entries: int = 512, enabled: bool = True, policies: Optional[Dict[str, float]] = None):
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.policies = CACHE_POLICIES if policies is None else policies
+        self._entries: "OrderedDict[str, tuple[float, BaseModel]]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "bypassed": 0, "expired": 0, "evicted": 0}
+
+    def ttl_for(self, call_site: Optional[str]) -> Optional[float]:
+        """Returns the TTL for a call site, or None if it should bypass the cache."""
+        if not self.enabled or call_site is None:
+            return None
+        return self.policies.get(call_site)
+
+    def make_key(self, model: str, prompt: str, context: str, schema_model: Type[BaseModel]) -> str:
+        raw = json.dumps([model, prompt, context, schema_fingerprint(schema_model)])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[BaseModel]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            self.stats["expired"] += 1
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        # Callers mutate results (e.g. graph_highlights), so never hand out the cached instance
+        return value.model_copy(deep=True)
+
+    def put(self, key: str, value: BaseModel, ttl: float):
+        self._entries[key] = (time.monotonic() + ttl, value.model_copy(deep=True))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evicted"] += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, float]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+# Global Instance
+response_cache = ResponseCache(
+    max_entries=int(os.getenv("LLM_RESPONSE_CACHE_SIZE", "512")),
+    enabled=os.getenv("LLM_RESPONSE_CACHE", "1") != "0"
+)
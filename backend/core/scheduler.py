@@ -0,0 +1,132 @@
+import os
+import time
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Deque, Dict, Optional
+
+class Priority(IntEnum):
+    """LLM traffic classes, most urgent first."""
+    INTERACTIVE = 0  # Liaison chat
+    COUNCIL = 1      # Council runs, Maestro
+    INGESTION = 2    # Memory extraction, embedding, graph enrichment, vision
+    BACKGROUND = 3   # Consolidation and other maintenance
+
+# The priority of the code currently running. Entry points (chat handler, council
+# dispatcher, Hippocampus...) set it; every LLM call underneath inherits it.
+current_priority: ContextVar[Priority] = ContextVar("llm_priority", default=Priority.COUNCIL)
+
+@contextmanager
+def llm_priority(priority: Priority):
+    """Runs the enclosed block (and tasks it spawns) at the given priority."""
+    token = current_priority.set(priority)
+    try:
+        yield
+    finally:
+        current_priority.reset(token)
+
+DEFAULT_CLASS_LIMITS = {
+    Priority.INTERACTIVE: int(os.getenv("LLM_LIMIT_INTERACTIVE", "8")),
+    Priority.COUNCIL: int(os.getenv("LLM_LIMIT_COUNCIL", "4")),
+    Priority.INGESTION: int(os.getenv("LLM_LIMIT_INGESTION", "2")),
+    Priority.BACKGROUND: int(os.getenv("LLM_LIMIT_BACKGROUND", "1")),
+}
+
+class LLMScheduler:
+    """
+    Priority-aware admission control in front of the LLM provider.
+
+    At most `max_concurrency` upstream calls run at once, and each class is
+    additionally capped by its own limit. Low-priority caps are kept below the
+    global limit so background work can never occupy every slot. When a slot
+    frees up, queued callers are admitted highest-priority first (FIFO within
+    a class).
+    """
+    def __init__(self, max_concurrency: int = 8, class_limits: Optional[Dict[Priority, int]] = None):
+        self.max_concurrency = max_concurrency
+        self.class_limits = dict(DEFAULT_CLASS_LIMITS if class_limits is None else class_limits)
+        self._queues: Dict[Priority, Deque[asyncio.Future]] = {p: deque() for p in Priority}
+        self._running: Dict[Priority, int] = {p: 0 for p in Priority}
+        self._total = 0
+        self._waits: Dict[Priority, Deque[float]] = {p: deque(maxlen=256) for p in Priority}
+        self._admitted: Dict[Priority, int] = {p: 0 for p in Priority}
+        self._max_wait: Dict[Priority, float] = {p: 0.0 for p in Priority}
+
+    def _can_run(self, priority: Priority) -> bool:
+        return self._total < self.max_concurrency and self._running[priority] < self.class_limits.get(priority, 1)
+
+    def _has_precedence(self, priority: Priority) -> bool:
+        """True if nobody of equal or higher priority is already queued."""
+        return not any(self._queues[p] for p in Priority if p <= priority)
+
+    def _grant(self, priority: Priority):
+        self._running[priority] += 1
+        self._total += 1
+
+    def _dispatch(self):
+        for priority in Priority:
+            queue = self._queues[priority]
+            while queue and self._can_run(priority):
+                future = queue.popleft()
+                if future.done(): # Cancelled while queued
+                    continue
+                self._grant(priority)
+                future.set_result(None)
+
+    def _release(self, priority: Priority):
+        self._running[priority] -= 1
+        self._total -= 1
+        self._dispatch()
+
+    async def _acquire(self, priority: Priority):
+        if self._has_precedence(priority) and self._can_run(priority):
+            self._grant(priority)
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._queues[priority].append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release(priority) # Granted just as we were cancelled
+            else:
+                try:
+                    self._queues[priority].remove(future)
+                except ValueError:
+                    pass
+            raise
+
+    @asynccontextmanager
+    async def slot(self, priority: Optional[Priority] = None):
+        """Holds one upstream slot for the enclosed call."""
+        priority = current_priority.get() if priority is None else priority
+        start = time.monotonic()
+        await self._acquire(priority)
+        wait = time.monotonic() - start
+        self._waits[priority].append(wait)
+        self._admitted[priority] += 1
+        self._max_wait[priority] = max(self._max_wait[priority], wait)
+        try:
+            yield
+        finally:
+            self._release(priority)
+
+    def get_stats(self) -> dict:
+        stats = {"max_concurrency": self.max_concurrency, "running": self._total, "classes": {}}
+        for p in Priority:
+            waits = sorted(self._waits[p])
+            stats["classes"][p.name.lower()] = {
+                "limit": self.class_limits.get(p, 1),
+                "running": self._running[p],
+                "queued": sum(1 for f in self._queues[p] if not f.done()),
+                "admitted": self._admitted[p],
+                "wait_avg_ms": round(1000 * sum(waits) / len(waits), 2) if waits else 0.0,
+                "wait_p95_ms": round(1000 * waits[int(0.95 * (len(waits) - 1))], 2) if waits else 0.0,
+                "wait_max_ms": round(1000 * self._max_wait[p], 2),
+            }
+        return stats
+
+# Global Instance
+llm_scheduler = LLMScheduler(max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")))
@@ -0,0 +1,141 @@
+import os
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, List, Optional, Set
+from backend.core.context_builder import estimate_tokens, truncate_to_tokens
+
+# Chat history budget (estimated tokens). Past this, older turns are folded
+# into the rolling summary; the newest turns always stay verbatim.
+SESSION_HISTORY_TOKENS = int(os.getenv("SESSION_HISTORY_TOKENS", "1200"))
+SESSION_KEEP_MESSAGES = int(os.getenv("SESSION_KEEP_MESSAGES", "4"))
+SESSION_SUMMARY_TOKENS = int(os.getenv("SESSION_SUMMARY_TOKENS", "300"))
+
+# (previous summary, messages to fold in) -> new summary
+Summarizer = Callable[[str, List[Any]], Awaitable[str]]
+
+class ChatSession:
+    """Recent turns of one conversation plus a summary of everything older."""
+    def __init__(self, key: str, now: float):
+        self.key = key
+        self.messages: List[Any] = [] # User messages and final Liaison replies only
+        self.summary = ""
+        self.turns = 0
+        self.last_active = now
+        self.lock = asyncio.Lock() # One turn at a time per conversation
+        self.compacting = False
+
+    def history_tokens(self) -> int:
+        return sum(estimate_tokens(str(m.content)) + 4 for m in self.messages)
+
+    def record_turn(self, user_msg: Any, reply_msg: Any):
+        self.messages += [user_msg, reply_msg]
+        self.turns += 1
+
+class SessionStore:
+    """
+    Per-sid / per-user chat sessions with a bounded prompt cost.
+
+    Sessions are kept in LRU order: idle ones expire after `ttl` seconds and
+    the least recently used go first beyond `max_sessions`. Once a session's
+    history crosses `max_tokens`, all but the last `keep_messages` messages
+    are summarized in the background (the reply never waits for it). If the
+    summarizer keeps failing, the oldest turns are dropped at twice the
+    budget so history can't grow without limit.
+    """
+    def __init__(self, max_sessions: int = 256, ttl: float = 3600.0, max_tokens: int = SESSION_HISTORY_TOKENS,
+                 keep_messages: int = SESSION_KEEP_MESSAGES, clock: Callable[[], float] = time.monotonic):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_tokens = max_tokens
+        self.keep_messages = keep_messages
+        self.clock = clock
+        self._sessions: "OrderedDict[str, ChatSession]" = OrderedDict()
+        self._tasks: Set[asyncio.Task] = set()
+        self.stats = {"created": 0, "expired": 0, "evicted": 0, "compactions": 0, "compaction_errors": 0, "dropped_messages": 0}
+
+    @staticmethod
+    def key_for(sid: str, user_id: Optional[str] = None) -> str:
+        """Clients that send a user id share one session across tabs/reconnects."""
+        return f"user:{user_id}" if user_id else f"sid:{sid}"
+
+    def get(self, key: str) -> ChatSession:
+        now = self.clock()
+        self._expire(now)
+        session = self._sessions.get(key)
+        if session is None:
+            session = self._sessions[key] = ChatSession(key, now)
+            self.stats["created"] += 1
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.stats["evicted"] += 1
+        self._sessions.move_to_end(key)
+        session.last_active = now
+        return session
+
+    def drop(self, key: str):
+        self._sessions.pop(key, None)
+
+    def _expire(self, now: float):
+        # LRU order == last-activity order, so expired sessions sit at the front
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if now - oldest.last_active <= self.ttl:
+                break
+            self._sessions.popitem(last=False)
+            self.stats["expired"] += 1
+
+    def needs_compaction(self, session: ChatSession) -> bool:
+        return session.history_tokens() > self.max_tokens and len(session.messages) > self.keep_messages
+
+    def schedule_compaction(self, session: ChatSession, summarize: Summarizer):
+        """Starts a background compaction if the session is over budget."""
+        if session.compacting or not self.needs_compaction(session):
+            return
+        session.compacting = True
+        task = asyncio.create_task(self.compact(session, summarize))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def compact(self, session: ChatSession, summarize: Summarizer):
+        # Turns recorded while the summary is generated are appended after this
+        # prefix, so only the snapshot is removed afterwards.
+        session.compacting = True
+        try:
+            fold = len(session.messages) - self.keep_messages
+            if fold <= 0:
+                return
+            fold -= fold % 2 # Keep user/reply pairs together
+            try:
+                summary = await summarize(session.summary, session.messages[:fold])
+                session.summary = truncate_to_tokens(summary.strip(), SESSION_SUMMARY_TOKENS)
+                del session.messages[:fold]
+                self.stats["compactions"] += 1
+                print(f"🗜️ [Session] {session.key}: folded {fold} messages into the summary")
+            except Exception as e:
+                print(f"⚠️ [Session] Summarization failed for {session.key}: {e}")
+                self.stats["compaction_errors"] += 1
+                while session.history_tokens() > 2 * self.max_tokens and len(session.messages) > self.keep_messages:
+                    del session.messages[:2]
+                    self.stats["dropped_messages"] += 2
+        finally:
+            session.compacting = False
+
+    async def wait_compactions(self):
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    def get_stats(self) -> dict:
+        sessions = list(self._sessions.values())
+        return {
+            **self.stats,
+            "active": len(sessions),
+            "avg_history_tokens": round(sum(s.history_tokens() for s in sessions) / len(sessions), 1) if sessions else 0,
+            "summarized": sum(1 for s in sessions if s.summary),
+        }
+
+# Global Instance
+session_store = SessionStore(
+    max_sessions=int(os.getenv("SESSION_MAX", "256")),
+    ttl=float(os.getenv("SESSION_TTL", "3600")),
+)
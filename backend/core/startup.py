@@ -0,0 +1,72 @@
+import time
+import asyncio
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Dict, Optional
+
+class StartupProfiler:
+    """
+    Records how long each subsystem takes to import and initialize, so slow
+    boots can be traced to a module instead of guessed at.
+
+    Blocking steps are timed with `measure()`; background warmups (vector
+    store, agent graphs, LLM SDKs) run via `background()` and are reported
+    once they finish, without delaying readiness.
+    """
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.timings: Dict[str, float] = {}
+        self.background_timings: Dict[str, float] = {}
+        self.failures: Dict[str, str] = {}
+        self.ready_after: Optional[float] = None
+        self._tasks = []
+
+    @contextmanager
+    def measure(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = time.perf_counter() - start
+
+    def background(self, name: str, fn: Callable[[], Awaitable[None]]) -> asyncio.Task:
+        """Runs an async warmup step without blocking startup."""
+        async def _run():
+            start = time.perf_counter()
+            try:
+                await fn()
+            except Exception as e:
+                self.failures[name] = str(e)
+                print(f"⚠️ [Startup] Warmup '{name}' failed: {e}")
+            finally:
+                self.background_timings[name] = time.perf_counter() - start
+        task = asyncio.create_task(_run(), name=name)
+        self._tasks.append(task)
+        return task
+
+    async def wait_background(self):
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def cancel_background(self):
+        for task in self._tasks:
+            if not task.done():
+                task.cancel()
+
+    def mark_ready(self):
+        self.ready_after = time.perf_counter() - self.started_at
+        print(f"--- [VitalOS] Ready in {1000 * self.ready_after:.0f} ms ---")
+        for name, seconds in sorted(self.timings.items(), key=lambda kv: -kv[1]):
+            print(f"    [Startup] {name:<28} {1000 * seconds:8.1f} ms")
+
+    def get_stats(self) -> dict:
+        to_ms = lambda timings: {k: round(1000 * v, 1) for k, v in timings.items()}
+        return {
+            "ready_ms": round(1000 * self.ready_after, 1) if self.ready_after is not None else None,
+            "blocking": to_ms(self.timings),
+            "background": to_ms(self.background_timings),
+            "pending": [t.get_name() for t in self._tasks if not t.done()],
+            "failures": dict(self.failures),
+        }
+
+# Global Instance
+startup_profiler = StartupProfiler()
@@ -0,0 +1,129 @@
+import os
+import re
+import json
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# Ignored when deciding whether a query is "just keywords"
+STOPWORDS = {
+    "a", "an", "and", "are", "did", "do", "does", "for", "from", "have", "how", "i", "in", "is", "it",
+    "me", "my", "of", "on", "or", "the", "to", "was", "were", "what", "when", "where", "which", "who", "with",
+}
+
+def query_terms(query: str) -> List[str]:
+    """Lower-cased word tokens minus stopwords, in order, without repeats."""
+    terms = []
+    for word in re.findall(r"\w+", query.lower()):
+        if word not in STOPWORDS and word not in terms:
+            terms.append(word)
+    return terms
+
+def keyword_terms(text: str) -> Set[str]:
+    """query_terms with plural -s stripped, for exact term overlap outside FTS5 (hot/cold tiers)."""
+    return {term[:-1] if len(term) > 3 and term.endswith("s") and not term.endswith("ss") else term
+            for term in query_terms(text)}
+
+def memory_body(meta: Dict[str, Any]) -> str:
+    """Searchable text of a memory's metadata (entities may be a JSON string, as stored in Chroma)."""
+    entities = meta.get("entities", "")
+    if isinstance(entities, str) and entities.startswith("["):
+        try:
+            entities = json.loads(entities)
+        except json.JSONDecodeError:
+            pass
+    if isinstance(entities, list):
+        entities = " ".join(map(str, entities))
+    return " ".join(str(meta.get(field) or "") for field in ("statement", "scene", "outcome", "user_state", "remarks")) + f" {entities}"
+
+class TextIndex:
+    """
+    Local BM25 full-text index over memories (SQLite FTS5), kept in sync
+    with the Chroma collection by Hippocampus. Each row also holds the
+    memory's metadata, so keyword hits are served without touching Chroma,
+    and the scene/user_state/ts columns let filters run inside the query.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            # Porter stemming: "migraines" finds "migraine"
+            self._db.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS memories USING fts5("
+                "id UNINDEXED, body, scene UNINDEXED, user_state UNINDEXED, ts UNINDEXED, meta UNINDEXED, "
+                "tokenize = 'porter unicode61')"
+            )
+            self._db.commit()
+        return self._db
+
+    def upsert(self, rows: List[Tuple[str, Dict[str, Any]]]):
+        """Indexes (id, Chroma metadata) pairs, replacing existing rows."""
+        if not rows:
+            return
+        with self._lock:
+            db = self._conn()
+            db.executemany("DELETE FROM memories WHERE id = ?", [(memory_id,) for memory_id, _ in rows])
+            db.executemany(
+                "INSERT INTO memories (id, body, scene, user_state, ts, meta) VALUES (?, ?, ?, ?, ?, ?)",
+                [(memory_id, memory_body(meta), meta.get("scene"), meta.get("user_state"), meta.get("ts"), json.dumps(meta))
+                 for memory_id, meta in rows]
+            )
+            db.commit()
+
+    def delete(self, ids: List[str]):
+        with self._lock:
+            db = self._conn()
+            db.executemany("DELETE FROM memories WHERE id = ?", [(memory_id,) for memory_id in ids])
+            db.commit()
+
+    def delete_range(self, start_ts: float, end_ts: float):
+        with self._lock:
+            db = self._conn()
+            db.execute("DELETE FROM memories WHERE ts >= ? AND ts <= ?", (start_ts, end_ts))
+            db.commit()
+
+    def clear(self):
+        with self._lock:
+            db = self._conn()
+            db.execute("DELETE FROM memories")
+            db.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn().execute("SELECT count(*) FROM memories").fetchone()[0]
+
+    def search(self, query: str, k: int, filters: Optional[Dict[str, Any]] = None) -> List[Tuple[str, float, Dict[str, Any]]]:
+        """
+        Top-k (id, score, metadata) by BM25 (higher is better). Any query term
+        may match; `filters` (scene, user_state, start_ts, end_ts) are applied
+        in the same SQL statement.
+        """
+        terms = query_terms(query) or re.findall(r"\w+", query.lower())
+        if not terms:
+            return []
+        match = " OR ".join(f'"{term}"' for term in terms)
+        sql = "SELECT id, bm25(memories), meta FROM memories WHERE memories MATCH ?"
+        params: List[Any] = [match]
+        filters = filters or {}
+        for column in ("scene", "user_state"):
+            if filters.get(column) is not None:
+                sql += f" AND {column} = ?"
+                params.append(filters[column])
+        if filters.get("start_ts") is not None:
+            sql += " AND ts >= ?"
+            params.append(filters["start_ts"])
+        if filters.get("end_ts") is not None:
+            sql += " AND ts < ?"
+            params.append(filters["end_ts"])
+        sql += " ORDER BY bm25(memories) LIMIT ?"
+        params.append(k)
+        with self._lock:
+            rows = self._conn().execute(sql, params).fetchall()
+        # FTS5's bm25() is negative, best first
+        return [(memory_id, -score, json.loads(meta)) for memory_id, score, meta in rows]
@@ -0,0 +1,139 @@
+import os
+import time
+import threading
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+from backend.core.text_index import keyword_terms, memory_body
+
+# Memory tiers: hot (RAM, last hours) / warm (vector store) / cold (archived segments)
+RECALL_TIERS = os.getenv("RECALL_TIERS", "hot,warm,cold")
+HOT_TIER_HOURS = float(os.getenv("HOT_TIER_HOURS", "6"))
+HOT_TIER_MAX = int(os.getenv("HOT_TIER_MAX", "2000"))
+RECALL_HOT_K = int(os.getenv("RECALL_HOT_K", "0")) # 0 = k
+RECALL_COLD_K = int(os.getenv("RECALL_COLD_K", "1"))
+RECALL_COLD_BLOCKS = int(os.getenv("RECALL_COLD_BLOCKS", "4")) # Archive blocks decompressed per recall
+
+def filter_match(meta: Dict[str, Any], ts: Optional[float], filters: Dict[str, Any]) -> bool:
+    """Applies recall filters (scene, user_state, [start_ts, end_ts)) to one memory."""
+    for field in ("scene", "user_state"):
+        if filters.get(field) is not None and meta.get(field) != filters[field]:
+            return False
+    if filters.get("start_ts") is not None or filters.get("end_ts") is not None:
+        if ts is None:
+            return False
+        if filters.get("start_ts") is not None and ts < filters["start_ts"]:
+            return False
+        if filters.get("end_ts") is not None and ts >= filters["end_ts"]:
+            return False
+    return True
+
+class HotTier:
+    """
+    The last `hours` of memories, held in RAM with their embeddings and
+    searched exactly (cosine + keyword overlap). Hippocampus mirrors every
+    write, merge and delete here; older memories age out on access.
+    """
+    def __init__(self, hours: float = HOT_TIER_HOURS, max_items: int = HOT_TIER_MAX, clock: Callable[[], float] = time.time):
+        self.window = hours * 3600
+        self.max_items = max_items
+        self.clock = clock
+        self._items: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.loaded = False
+
+    def cutoff(self) -> float:
+        return self.clock() - self.window
+
+    def add(self, memory_id: str, metadata: Dict[str, Any], embedding: Optional[List[float]], ts: Optional[float]):
+        if self.window <= 0 or ts is None or ts < self.cutoff():
+            return
+        vector = np.asarray(embedding, dtype=np.float32) if embedding is not None and len(embedding) else None
+        with self._lock:
+            self._items[memory_id] = {"metadata": metadata, "ts": ts, "vector": vector,
+                                      "norm": float(np.linalg.norm(vector)) if vector is not None else 0.0,
+                                      "terms": keyword_terms(memory_body(metadata))}
+            if len(self._items) > self.max_items:
+                for old in sorted(self._items, key=lambda i: self._items[i]["ts"])[:len(self._items) - self.max_items]:
+                    del self._items[old]
+
+    def update(self, memory_id: str, metadata: Dict[str, Any], ts: Optional[float] = None,
+               embedding: Optional[List[float]] = None):
+        with self._lock:
+            item = self._items.get(memory_id)
+            if item is not None:
+                if embedding is not None and len(embedding):
+                    item["vector"] = np.asarray(embedding, dtype=np.float32)
+                    item["norm"] = float(np.linalg.norm(item["vector"]))
+                item["metadata"] = metadata
+                item["terms"] = keyword_terms(memory_body(metadata))
+                item["ts"] = max(item["ts"], ts or 0.0) # Merged readings stay hot while they repeat
+
+    def remove(self, ids: List[str]):
+        with self._lock:
+            for memory_id in ids:
+                self._items.pop(memory_id, None)
+
+    def remove_range(self, start_ts: float, end_ts: float):
+        with self._lock:
+            for memory_id in [i for i, item in self._items.items() if start_ts <= item["ts"] <= end_ts]:
+                del self._items[memory_id]
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def evict(self) -> int:
+        cutoff = self.cutoff()
+        with self._lock:
+            stale = [i for i, item in self._items.items() if item["ts"] < cutoff]
+            for memory_id in stale:
+                del self._items[memory_id]
+        return len(stale)
+
+    def search(self, query: str, embedding: Optional[List[float]], k: int, filters: Dict[str, Any],
+               alpha: float = 0.5) -> List[tuple]:
+        """
+        Exact search: (id, score, metadata) with score in [0, 1], blending
+        cosine (weight `alpha`) and the share of query terms matched. With
+        no query embedding, only keyword matches are returned.
+        """
+        self.evict()
+        terms = keyword_terms(query)
+        with self._lock:
+            items = [(i, item) for i, item in self._items.items() if filter_match(item["metadata"], item["ts"], filters)]
+        if not items or k <= 0:
+            return []
+        q = np.asarray(embedding, dtype=np.float32) if embedding is not None and len(embedding) else None
+        q_norm = float(np.linalg.norm(q)) if q is not None else 0.0
+        hits = []
+        for memory_id, item in items:
+            overlap = len(terms & item["terms"]) / len(terms) if terms else 0.0
+            vector = item["vector"]
+            if q is not None and q_norm and vector is not None and vector.shape == q.shape and item["norm"]:
+                cos = max(0.0, float(q @ vector) / (q_norm * item["norm"]))
+                score = alpha * cos + (1 - alpha) * overlap
+            elif overlap:
+                score = overlap
+            else:
+                continue
+            hits.append((memory_id, score, item["metadata"]))
+        hits.sort(key=lambda hit: hit[1], reverse=True)
+        return hits[:k]
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+def merge_tiers(results: Dict[str, List[tuple]], k: int) -> List[tuple]:
+    """
+    Merges per-tier hits (id, score in [0, 1], metadata) into the top k,
+    keeping each memory's best score. Earlier tiers win ties (hot first).
+    Returns (id, score, metadata, tier).
+    """
+    best: Dict[str, tuple] = {}
+    for rank, (tier, hits) in enumerate(results.items()):
+        for memory_id, score, meta in hits:
+            current = best.get(memory_id)
+            if current is None or score > current[1]:
+                best[memory_id] = (memory_id, score, meta, tier, rank)
+    ranked = sorted(best.values(), key=lambda hit: (-hit[1], hit[4]))
+    return [hit[:4] for hit in ranked[:k]]
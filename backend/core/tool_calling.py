@@ -0,0 +1,206 @@
+import re
+import json
+import time
+import uuid
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+# --- Turn representation (provider-neutral) ---
+
+@dataclass
+class ToolCall:
+    name: str
+    args: Dict[str, Any]
+    id: str = field(default_factory=lambda: f"call_{uuid.uuid4().hex[:12]}")
+
+@dataclass
+class ToolTurn:
+    """One model turn: reply text and/or the tool calls it requested."""
+    text: str = ""
+    tool_calls: List[ToolCall] = field(default_factory=list)
+    streamed: bool = False # Some of `text` was already sent to on_token
+
+    @classmethod
+    def from_text(cls, text: str) -> "ToolTurn":
+        """A complete prompt-protocol turn (tool calls as JSON blocks)."""
+        return cls(text=text, tool_calls=parse_text_tool_calls(text))
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ToolTurn":
+        return cls(text=data.get("text", ""), tool_calls=[ToolCall(**c) for c in data.get("tool_calls", [])])
+
+    def to_dict(self) -> dict:
+        return {"text": self.text, "tool_calls": [{"name": c.name, "args": c.args, "id": c.id} for c in self.tool_calls]}
+
+    def to_message(self) -> AIMessage:
+        return AIMessage(content=self.text, tool_calls=[{"name": c.name, "args": c.args, "id": c.id} for c in self.tool_calls])
+
+def parse_arguments(raw: Any) -> Dict[str, Any]:
+    """Function-call arguments arrive as a JSON string (OpenAI) or a dict (Gemini)."""
+    if isinstance(raw, dict):
+        return raw
+    try:
+        args = json.loads(raw or "{}")
+    except json.JSONDecodeError:
+        print(f"⚠️ [Tools] Unparseable tool arguments: {raw!r}")
+        return {}
+    return args if isinstance(args, dict) else {}
+
+# --- Prompt-based protocol (providers without native function calling) ---
+
+# Tool turns must be bare JSON blocks, so a turn is a reply as soon as it
+# starts with anything else.
+TOOL_CALL_PATTERN = re.compile(r"```json\s*(\{.*?\})\s*```", re.DOTALL)
+TOOL_CALL_PREFIXES = ("```", "{")
+LOOKAHEAD_CHARS = 3
+
+TEXT_TOOL_PROTOCOL = """
+
+**Tool Calling Protocol (CRITICAL):**
+To use a tool, output a JSON block strictly following this format:
+```json
+{{"tool": "tool_name", "args": {{"arg_name": "value"}}}}
+```
+Independent tools can be called in the same turn: output one block per call.
+If you output a tool call, do NOT output any other text in that turn.
+Available tools:
+{tool_list}
+"""
+
+def parse_text_tool_calls(text: str) -> List[ToolCall]:
+    calls = []
+    for match in TOOL_CALL_PATTERN.finditer(text):
+        try:
+            data = json.loads(match.group(1))
+        except json.JSONDecodeError:
+            continue
+        if data.get("tool"):
+            calls.append(ToolCall(name=data["tool"], args=data.get("args") or {}))
+    return calls
+
+def to_text_protocol(messages: List[Any], tools: List[dict]) -> List[Any]:
+    """
+    Rewrites a native tool-calling conversation for a plain chat model: the
+    protocol is appended to the system prompt, tool calls become JSON blocks
+    and tool results become 'Tool Output' user turns.
+    """
+    tool_list = "\n".join(f"- `{t['function']['name']}`: {t['function'].get('description', '').splitlines()[0]} "
+                          f"Args: {json.dumps(t['function'].get('parameters', {}).get('properties', {}))}" for t in tools)
+    protocol = TEXT_TOOL_PROTOCOL.format(tool_list=tool_list)
+    converted = []
+    for msg in messages:
+        if msg.type == "system":
+            converted.append(SystemMessage(content=msg.content + protocol))
+        elif msg.type == "ai" and getattr(msg, "tool_calls", None):
+            blocks = "\n".join(f'```json\n{json.dumps({"tool": c["name"], "args": c["args"]})}\n```' for c in msg.tool_calls)
+            converted.append(AIMessage(content=(msg.content + "\n" if msg.content else "") + blocks))
+        elif msg.type == "tool":
+            converted.append(HumanMessage(content=f"Tool Output: {msg.content}"))
+        else:
+            converted.append(msg)
+    return converted
+
+async def stream_text_turn(deltas: AsyncIterator[str], on_token: Callable[[str], Awaitable[None]]) -> ToolTurn:
+    """
+    Consumes a streamed prompt-protocol turn. Text is forwarded to `on_token`
+    once the turn is known not to be a tool call; tool-call turns are held
+    back. A turn that streamed prose and then called a tool is marked
+    `streamed`, so the caller can tell the client to discard it.
+    """
+    parts = []
+    streaming = None # None: undecided, True: reply, False: tool call
+    async for delta in deltas:
+        parts.append(delta)
+        if streaming is None:
+            head = "".join(parts).lstrip()
+            if len(head) >= LOOKAHEAD_CHARS:
+                streaming = not head.startswith(TOOL_CALL_PREFIXES)
+                if streaming:
+                    await on_token("".join(parts))
+        elif streaming:
+            await on_token(delta)
+
+    text = "".join(parts)
+    calls = parse_text_tool_calls(text)
+    if not streaming and not calls and text.strip():
+        await on_token(text) # Held back (or shorter than the lookahead), but a reply after all
+        streaming = True
+    return ToolTurn(text=text, tool_calls=calls, streamed=bool(streaming))
+
+# --- Execution ---
+
+async def execute_tool_calls(calls: List[ToolCall], registry: Dict[str, Any]) -> List[ToolMessage]:
+    """
+    Runs the tool calls of one turn concurrently and returns their results in
+    call order. Async tools (graph queries, memory search) overlap; sync
+    tools run inline on the loop, so profile writes never interleave.
+    Failures become error results for the model instead of raising.
+    """
+    async def run(call: ToolCall) -> ToolMessage:
+        tool = registry.get(call.name)
+        start = time.monotonic()
+        ok = True
+        try:
+            if tool is None:
+                ok = False
+                result = f"Error: Tool '{call.name}' not found."
+            elif tool.coroutine is not None:
+                result = await tool.ainvoke(call.args)
+            else:
+                result = tool.invoke(call.args)
+        except Exception as e:
+            ok = False
+            result = f"Tool Execution Error: {e}"
+        latency = time.monotonic() - start
+        tool_metrics.record_call(call.name, latency, ok)
+        print(f"--- [Tools] {call.name}({call.args}) in {latency * 1000:.0f}ms -> {result} ---")
+        return ToolMessage(content=str(result), tool_call_id=call.id, name=call.name)
+
+    return list(await asyncio.gather(*(run(call) for call in calls)))
+
+class ToolMetrics:
+    """Agent loop stats: turns per request, calls per turn and per-tool latency (see /llm/stats)."""
+    def __init__(self, window: int = 256):
+        self.window = window
+        self._runs: Deque[dict] = deque(maxlen=window)
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    def record_call(self, name: str, latency: float, ok: bool = True):
+        self._latencies.setdefault(name, deque(maxlen=self.window)).append(latency)
+        counts = self._counts.setdefault(name, {"calls": 0, "errors": 0})
+        counts["calls"] += 1
+        counts["errors"] += 0 if ok else 1
+
+    def record_run(self, turns: int, calls_per_turn: List[int], hit_limit: bool = False):
+        self._runs.append({"turns": turns, "calls": calls_per_turn, "hit_limit": hit_limit})
+
+    def get_stats(self) -> dict:
+        tools = {}
+        for name, latencies in self._latencies.items():
+            ordered = sorted(latencies)
+            tools[name] = {
+                **self._counts[name],
+                "avg_ms": round(1000 * sum(ordered) / len(ordered), 1),
+                "p95_ms": round(1000 * ordered[int(0.95 * (len(ordered) - 1))], 1),
+            }
+        runs = list(self._runs)
+        histogram: Dict[int, int] = {}
+        for run in runs:
+            histogram[run["turns"]] = histogram.get(run["turns"], 0) + 1
+        tool_turns = [n for run in runs for n in run["calls"] if n]
+        return {
+            "runs": len(runs),
+            "avg_turns": round(sum(r["turns"] for r in runs) / len(runs), 2) if runs else None,
+            "turns_histogram": dict(sorted(histogram.items())),
+            "avg_calls_per_tool_turn": round(sum(tool_turns) / len(tool_turns), 2) if tool_turns else None,
+            "parallel_turns": sum(1 for n in tool_turns if n > 1),
+            "hit_turn_limit": sum(1 for r in runs if r["hit_limit"]),
+            "tools": tools,
+        }
+
+# Global Instance
+tool_metrics = ToolMetrics()
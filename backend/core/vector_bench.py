@@ -0,0 +1,185 @@
+"""
+Vector store benchmark: Chroma vs the in-process NumPy store, including
+quantized (int8) storage.
+
+    python -m backend.core.vector_bench --sizes 10000 100000 1000000
+    python -m backend.core.vector_bench --sizes 10000 --configs chroma numpy-f16 --dim 384
+    python -m backend.core.vector_bench --sizes 100000 --configs numpy numpy-int8 numpy-int8-lean
+
+Every (config, size) pair is built in one subprocess and queried from a
+fresh one, so cold start and RSS are measured without the other runs'
+imports or caches. Reports ingest rate, cold start (import + open + first
+query), recall latency p50/p95, RSS, disk footprint and recall@10
+against exact float32 search (the recall vs footprint trade-off).
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import resource
+import subprocess
+import tempfile
+from typing import Any, Dict, List
+
+CONFIGS = {
+    "chroma": {"backend": "chroma"},
+    "numpy": {"backend": "numpy", "dtype": "float32", "index": "exact"},
+    "numpy-f16": {"backend": "numpy", "dtype": "float16", "index": "exact"},
+    "numpy-ivf": {"backend": "numpy", "dtype": "float16", "index": "ivf"},
+    "numpy-int8": {"backend": "numpy", "dtype": "int8", "index": "exact", "rerank": "float16"},
+    "numpy-int8-lean": {"backend": "numpy", "dtype": "int8", "index": "exact", "rerank": "none"},
+    "numpy-int8-ivf": {"backend": "numpy", "dtype": "int8", "index": "ivf", "rerank": "float16"},
+}
+K = 10
+BATCH = 5000
+
+def _rss_mb() -> Dict[str, float]:
+    current = 0.0
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                current = int(line.split()[1]) / 1024
+    return {"rss_mb": round(current, 1), "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)}
+
+def _open(config: Dict[str, Any], path: str):
+    from backend.core.vector_store import NumpyVectorStore, open_vector_store
+    if config["backend"] == "numpy":
+        return NumpyVectorStore(path, dtype=config["dtype"], index=config["index"], rerank=config.get("rerank", "none"))
+    return open_vector_store(path, "chroma")[1]
+
+def _vectors(start: int, count: int, dim: int):
+    import numpy as np
+    rng = np.random.default_rng(start)
+    # Clustered, like real embeddings (topics), so IVF has structure to exploit
+    centers = np.random.default_rng(0).normal(size=(64, dim)).astype(np.float32) * 2
+    return (centers[rng.integers(0, 64, count)] + rng.normal(size=(count, dim)).astype(np.float32)).astype(np.float32)
+
+def build(config: Dict[str, Any], path: str, size: int, dim: int) -> Dict[str, Any]:
+    store = _open(config, path)
+    started = time.perf_counter()
+    for offset in range(0, size, BATCH):
+        count = min(BATCH, size - offset)
+        vectors = _vectors(offset, count, dim)
+        store.upsert(ids=[f"m{offset + i}" for i in range(count)], embeddings=vectors.tolist(),
+                     metadatas=[{"ts": float(offset + i), "scene": "Work" if i % 2 else "Home"} for i in range(count)])
+    elapsed = time.perf_counter() - started
+    return {"ingest_per_sec": round(size / elapsed, 1), "ingest_seconds": round(elapsed, 2), **_rss_mb()}
+
+def query(config: Dict[str, Any], path: str, size: int, dim: int, queries: int) -> Dict[str, Any]:
+    started = time.perf_counter()
+    store = _open(config, path)
+    probes = _vectors(10 ** 9, queries + 1, dim)
+    store.query(query_embeddings=[probes[0].tolist()], n_results=10)
+    cold_start = time.perf_counter() - started
+    latencies, found = [], []
+    for i in range(1, queries + 1):
+        t = time.perf_counter()
+        found.append(store.query(query_embeddings=[probes[i].tolist()], n_results=K)["ids"][0])
+        latencies.append(time.perf_counter() - t)
+    latencies.sort()
+    return {"cold_start_ms": round(cold_start * 1000, 1), "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+            "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2), **_rss_mb(), "ids": found}
+
+def truth(size: int, dim: int, queries: int) -> Dict[str, Any]:
+    """Exact float32 top-K ids for the measured probes, streaming the vectors batch by batch."""
+    import numpy as np
+    probes = _vectors(10 ** 9, queries + 1, dim)[1:]
+    best_ids = np.empty((queries, 0), dtype=np.int64)
+    best = np.empty((queries, 0), dtype=np.float32)
+    for offset in range(0, size, BATCH):
+        vectors = _vectors(offset, min(BATCH, size - offset), dim)
+        distances = (vectors ** 2).sum(axis=1) - 2.0 * probes @ vectors.T
+        ids = np.broadcast_to(np.arange(offset, offset + len(vectors)), distances.shape)
+        distances, ids = np.concatenate([best, distances], axis=1), np.concatenate([best_ids, ids], axis=1)
+        top = np.argsort(distances, axis=1)[:, :K]
+        best, best_ids = np.take_along_axis(distances, top, axis=1), np.take_along_axis(ids, top, axis=1)
+    return {"ids": [[f"m{i}" for i in row] for row in best_ids.tolist()]}
+
+def _disk_mb(path: str) -> float:
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return round(total / 2 ** 20, 1)
+
+def _worker(args: List[str]) -> Dict[str, Any]:
+    result = subprocess.run([sys.executable, "-m", "backend.core.vector_bench", "--worker", *args],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "worker failed")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def run(configs: List[str], sizes: List[int], dim: int, queries: int, workdir: str) -> List[Dict[str, Any]]:
+    rows = []
+    for size in sizes:
+        exact = _worker(["truth", "numpy", "-", str(size), str(dim), str(queries)])["ids"]
+        for name in configs:
+            path = os.path.join(workdir, f"{name}-{size}")
+            shutil.rmtree(path, ignore_errors=True)
+            print(f"⏱️ [Bench] {name} @ {size:,} memories...", file=sys.stderr)
+            try:
+                built = _worker(["build", name, path, str(size), str(dim)])
+                queried = _worker(["query", name, path, str(size), str(dim), str(queries)])
+            except RuntimeError as e:
+                rows.append({"config": name, "size": size, "error": str(e)})
+                continue
+            rows.append({"config": name, "size": size, "ingest_per_sec": built["ingest_per_sec"],
+                         "build_peak_rss_mb": built["peak_rss_mb"], "cold_start_ms": queried["cold_start_ms"],
+                         "p50_ms": queried["p50_ms"], "p95_ms": queried["p95_ms"], "query_rss_mb": queried["rss_mb"],
+                         "disk_mb": _disk_mb(path), f"recall@{K}": _recall(queried["ids"], exact)})
+            shutil.rmtree(path, ignore_errors=True)
+    return rows
+
+def _recall(found: List[List[str]], exact: List[List[str]]) -> float:
+    hits = sum(len(set(f) & set(e)) for f, e in zip(found, exact))
+    return round(hits / sum(len(e) for e in exact), 4) if exact else 1.0
+
+def format_table(rows: List[Dict[str, Any]]) -> str:
+    columns = ["config", "size", f"recall@{K}", "ingest_per_sec", "cold_start_ms", "p50_ms", "p95_ms", "query_rss_mb",
+               "build_peak_rss_mb", "disk_mb"]
+    lines = ["| " + " | ".join(columns) + " |", "|" + "---|" * len(columns)]
+    for row in rows:
+        if "error" in row:
+            lines.append(f"| {row['config']} | {row['size']} | error: {row['error']} |")
+        else:
+            lines.append("| " + " | ".join(str(row[c]) for c in columns) + " |")
+    return "\n".join(lines)
+
+def main(argv: List[str] = None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "--worker":
+        phase, name, path, size, dim, *rest = argv[1:]
+        config = CONFIGS[name]
+        if phase == "truth":
+            result = truth(int(size), int(dim), int(rest[0]))
+        elif phase == "build":
+            result = build(config, path, int(size), int(dim))
+        else:
+            result = query(config, path, int(size), int(dim), int(rest[0]))
+        print(json.dumps(result))
+        return 0
+
+    parser = argparse.ArgumentParser(description="Benchmark Hippocampus vector store backends.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--configs", nargs="+", default=list(CONFIGS), choices=list(CONFIGS))
+    parser.add_argument("--dim", type=int, default=768, help="Embedding size (text-embedding-004: 768)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--workdir", default=None, help="Scratch directory (default: a temp dir)")
+    parser.add_argument("--out", default=None, help="Also write the rows as JSON")
+    args = parser.parse_args(argv)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="vector_bench_")
+    try:
+        rows = run(args.configs, args.sizes, args.dim, args.queries, workdir)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+    print(format_table(rows))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(rows, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+Migrates an existing collection into a NumPy store with another storage
+dtype (e.g. int8), then reports recall@k against the source and the
+footprint of both.
+
+    python -m backend.core.vector_migrate --source backend/data/chroma --target backend/data/vectors --dtype int8
+    python -m backend.core.vector_migrate --source backend/data/vectors --source-backend numpy --dtype int8 --replace
+
+Chroma sources are copied into a new directory; point VECTOR_BACKEND=numpy
+at it afterwards. With --replace, a NumPy source is swapped for the
+migrated copy and kept as <source>.bak-<timestamp>.
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+from typing import Any, Dict, List
+from backend.core.vector_store import NumpyVectorStore, open_vector_store, VECTOR_INDEX, VECTOR_RERANK
+
+def _disk_bytes(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
+
+def recall_at_k(source, target, probes: List[List[float]], k: int = 10) -> float:
+    """Share of the source's top-k neighbours the target also returns, over `probes`."""
+    found = 0
+    expected = 0
+    for probe in probes:
+        truth = set(source.query(query_embeddings=[probe], n_results=k, include=[])["ids"][0])
+        found += len(truth & set(target.query(query_embeddings=[probe], n_results=k, include=[])["ids"][0]))
+        expected += len(truth)
+    return round(found / expected, 4) if expected else 1.0
+
+def migrate(source_path: str, target_path: str, source_backend: str = "chroma", dtype: str = "int8",
+            rerank: str = VECTOR_RERANK, index: str = VECTOR_INDEX, page_size: int = 2000,
+            probes: int = 100, k: int = 10) -> Dict[str, Any]:
+    """Copies every record (ids, embeddings, metadata, documents) page by page; returns a report."""
+    import numpy as np
+    _, source = open_vector_store(source_path, source_backend)
+    target = NumpyVectorStore(target_path, dtype=dtype, index=index, rerank=rerank)
+    if target.count():
+        raise ValueError(f"{target_path} already holds {target.count()} records")
+
+    started = time.monotonic()
+    total = source.count()
+    picks = set(np.random.default_rng(0).choice(total, min(probes, total), replace=False).tolist()) if total else set()
+    copied, sample = 0, []
+    while copied < total:
+        page = source.get(include=["embeddings", "metadatas", "documents"], limit=page_size, offset=copied)
+        if not len(page["ids"]):
+            break
+        embeddings = np.asarray(page["embeddings"], dtype=np.float32)
+        target.upsert(page["ids"], embeddings, page["metadatas"], page["documents"])
+        sample += [embeddings[i].tolist() for i in range(len(page["ids"])) if copied + i in picks]
+        copied += len(page["ids"])
+        print(f"📦 [Migrate] {copied}/{total} records", file=sys.stderr)
+
+    report = {
+        "records": copied,
+        "dtype": target.dtype.name,
+        "rerank": target.rerank,
+        "seconds": round(time.monotonic() - started, 1),
+        f"recall@{k}": recall_at_k(source, target, sample, k),
+        "source_bytes": _disk_bytes(source_path),
+        "target_bytes": _disk_bytes(target_path),
+    }
+    if copied != target.count():
+        raise RuntimeError(f"Copied {copied} records but the target holds {target.count()}")
+    target.close()
+    if hasattr(source, "close"):
+        source.close()
+    return report
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Copy a memory collection into a (quantized) NumPy vector store.")
+    parser.add_argument("--source", required=True)
+    parser.add_argument("--source-backend", default="chroma", choices=["chroma", "numpy"])
+    parser.add_argument("--target", default=None, help="Default: backend/data/vectors (or <source>.migrated with --replace)")
+    parser.add_argument("--dtype", default="int8", choices=["float32", "float16", "int8"])
+    parser.add_argument("--rerank", default=VECTOR_RERANK, choices=["float32", "float16", "none"])
+    parser.add_argument("--index", default=VECTOR_INDEX, choices=["exact", "ivf"])
+    parser.add_argument("--probes", type=int, default=100, help="Stored vectors used as queries for the recall check")
+    parser.add_argument("--replace", action="store_true", help="Swap a NumPy source for the migrated store")
+    args = parser.parse_args(argv)
+
+    if args.replace and args.source_backend != "numpy":
+        parser.error("--replace only applies to --source-backend numpy")
+    target = args.target or (os.path.normpath(args.source) + ".migrated" if args.replace else "backend/data/vectors")
+    report = migrate(args.source, target, args.source_backend, args.dtype, args.rerank, args.index, probes=args.probes)
+    if args.replace:
+        backup = f"{os.path.normpath(args.source)}.bak-{time.strftime('%Y%m%d%H%M%S')}"
+        shutil.move(args.source, backup)
+        shutil.move(target, args.source)
+        report["backup"] = backup
+    for key, value in report.items():
+        print(f"{key}: {value}")
+    if args.source_backend == "chroma":
+        print(f"Set VECTOR_BACKEND=numpy to use it (Hippocampus opens backend/data/vectors; migrated to {target}).")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
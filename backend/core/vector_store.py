@@ -0,0 +1,466 @@
+import os
+import re
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma") # chroma | numpy
+VECTOR_DTYPE = os.getenv("VECTOR_DTYPE", "float32") # float32 | float16 | int8 (numpy backend)
+VECTOR_RERANK = os.getenv("VECTOR_RERANK", "float16") # int8 only: full-precision copy for re-ranking (float16 | float32 | none)
+VECTOR_RERANK_FACTOR = int(os.getenv("VECTOR_RERANK_FACTOR", "4")) # Candidates re-ranked, as a multiple of n
+VECTOR_INDEX = os.getenv("VECTOR_INDEX", "exact") # exact | ivf (numpy backend)
+IVF_NPROBE = int(os.getenv("IVF_NPROBE", "8"))
+IVF_MIN_ROWS = int(os.getenv("IVF_MIN_ROWS", "20000"))
+
+COLLECTION_NAME = "health_episodes"
+
+class VectorStore(ABC):
+    """
+    The part of the Chroma Collection API the Hippocampus relies on, so any
+    backend can stand in for `hippocampus.collection`: same method names,
+    same result shapes, same `where` filter syntax ($and/$or, $eq, $ne,
+    $gt, $gte, $lt, $lte, $in, $nin) and squared-L2 distances.
+    """
+    name = "base"
+
+    @abstractmethod
+    def upsert(self, ids: List[str], embeddings: List[List[float]], metadatas: Optional[List[Dict[str, Any]]] = None,
+               documents: Optional[List[str]] = None):
+        pass
+
+    @abstractmethod
+    def get(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None, limit: Optional[int] = None,
+            offset: Optional[int] = None, include: Optional[List[str]] = None) -> Dict[str, Any]:
+        pass
+
+    @abstractmethod
+    def query(self, query_embeddings: List[List[float]], n_results: int = 10, where: Optional[Dict[str, Any]] = None,
+              include: Optional[List[str]] = None) -> Dict[str, Any]:
+        pass
+
+    @abstractmethod
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None):
+        pass
+
+    @abstractmethod
+    def update(self, ids: List[str], metadatas: Optional[List[Dict[str, Any]]] = None):
+        pass
+
+    @abstractmethod
+    def count(self) -> int:
+        pass
+
+    def add(self, ids: List[str], embeddings: List[List[float]], metadatas: Optional[List[Dict[str, Any]]] = None,
+            documents: Optional[List[str]] = None):
+        """Like upsert, but existing ids are left untouched (Chroma semantics)."""
+        existing = set(self.get(ids=ids, include=[])["ids"])
+        keep = [i for i, memory_id in enumerate(ids) if memory_id not in existing]
+        if keep:
+            self.upsert([ids[i] for i in keep], [embeddings[i] for i in keep],
+                        [metadatas[i] for i in keep] if metadatas else None, [documents[i] for i in keep] if documents else None)
+
+    def peek(self, limit: int = 10) -> Dict[str, Any]:
+        return self.get(limit=limit, include=["metadatas", "documents"])
+
+    def get_max_batch_size(self) -> int:
+        return 5000
+
+_OPERATORS = {"$eq": "=", "$ne": "!=", "$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+
+def where_to_sql(where: Dict[str, Any], column: str = "metadata") -> Tuple[str, List[Any]]:
+    """Translates a Chroma `where` filter into SQL over a JSON metadata column."""
+    if len(where) != 1:
+        return where_to_sql({"$and": [{key: value} for key, value in where.items()]}, column)
+    key, value = next(iter(where.items()))
+    if key in ("$and", "$or"):
+        parts = [where_to_sql(clause, column) for clause in value]
+        joiner = " AND " if key == "$and" else " OR "
+        return "(" + joiner.join(sql for sql, _ in parts) + ")", [p for _, params in parts for p in params]
+    if not re.fullmatch(r"\w+", key):
+        raise ValueError(f"Unsupported metadata field: {key}")
+    field = f"json_extract({column}, '$.{key}')"
+    op, operand = next(iter(value.items())) if isinstance(value, dict) else ("$eq", value)
+    if op in ("$in", "$nin"):
+        placeholders = ", ".join("?" for _ in operand)
+        return f"{field} {'IN' if op == '$in' else 'NOT IN'} ({placeholders})", list(operand)
+    if op not in _OPERATORS:
+        raise ValueError(f"Unsupported filter operator: {op}")
+    return f"{field} {_OPERATORS[op]} ?", [operand]
+
+class NumpyVectorStore(VectorStore):
+    """
+    Lean in-process vector store for a single-user memory.
+
+    Embeddings live in a memory-mapped .npy matrix (float32, float16 or
+    int8) next to their squared norms; ids, documents and metadata live in a
+    small SQLite table whose `row` points into the matrix. Filters run as
+    SQL, search runs as blocked matrix products over the matching rows.
+
+    index="exact" scans every candidate. index="ivf" clusters the rows
+    (k-means, ~sqrt(n) lists) once the store holds `ivf_min_rows`, and
+    only scans the `nprobe` lists closest to the query. Training happens
+    on write, and again whenever the store has doubled since.
+
+    dtype="int8" quantizes each vector with its own scale (max |x| / 127):
+    a quarter of float32, scanned the same way. With `rerank` set, a
+    full-precision copy (raw.npy) is kept on disk and only the top
+    n * `rerank_factor` candidates are read back from it and re-ranked by
+    exact distance, so the copy costs disk but almost no RSS.
+    """
+    name = "numpy"
+    BLOCK = 65536
+
+    def __init__(self, path: str, dtype: str = VECTOR_DTYPE, index: str = VECTOR_INDEX,
+                 nprobe: int = IVF_NPROBE, ivf_min_rows: int = IVF_MIN_ROWS, rerank: str = VECTOR_RERANK,
+                 rerank_factor: int = VECTOR_RERANK_FACTOR):
+        import numpy as np
+        if dtype not in ("float32", "float16", "int8"):
+            raise ValueError(f"Unsupported vector dtype: {dtype}")
+        if index not in ("exact", "ivf"):
+            raise ValueError(f"Unknown vector index: {index}")
+        if rerank not in ("float32", "float16", "none"):
+            raise ValueError(f"Unsupported re-rank dtype: {rerank}")
+        self.np = np
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.index = index
+        self.nprobe = nprobe
+        self.ivf_min_rows = ivf_min_rows
+        self._lock = threading.RLock()
+        os.makedirs(path, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(path, "records.sqlite3"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS records (row INTEGER PRIMARY KEY, id TEXT UNIQUE, document TEXT, metadata TEXT)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT)")
+        self._db.commit()
+        self._settings = dict(self._db.execute("SELECT key, value FROM settings").fetchall())
+        if self._settings.get("dtype", dtype) != dtype:
+            print(f"⚠️ [VectorStore] {path} holds {self._settings['dtype']} vectors; ignoring VECTOR_DTYPE={dtype}")
+            self.dtype = np.dtype(self._settings["dtype"])
+        if self.dtype != np.int8:
+            rerank = "none" # Nothing to re-rank: the matrix is already float
+        elif "dtype" in self._settings:
+            rerank = self._settings.get("rerank", "none")
+        self.rerank = rerank
+        self.rerank_factor = max(1, rerank_factor)
+        self._vectors = self._norms = self._alive = self._lists = self._scales = self._raw = None
+        self._centroids = None
+        self._size = int(self._db.execute("SELECT coalesce(max(row) + 1, 0) FROM records").fetchone()[0])
+        self._load_arrays()
+
+    # --- Storage ---
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name + ".npy")
+
+    def _load_arrays(self):
+        np = self.np
+        if not os.path.exists(self._file("vectors")):
+            return
+        self._vectors = np.load(self._file("vectors"), mmap_mode="r+")
+        self._norms = np.load(self._file("norms"), mmap_mode="r+")
+        self._alive = np.load(self._file("alive"), mmap_mode="r+")
+        self._lists = np.load(self._file("lists"), mmap_mode="r+")
+        for name in ("scales", "raw"):
+            if os.path.exists(self._file(name)):
+                setattr(self, "_" + name, np.load(self._file(name), mmap_mode="r+"))
+        if os.path.exists(self._file("centroids")):
+            self._centroids = np.load(self._file("centroids"))
+
+    @property
+    def capacity(self) -> int:
+        return 0 if self._vectors is None else self._vectors.shape[0]
+
+    def _grow(self, needed: int, dim: int):
+        """Re-allocates the memmaps with room for `needed` rows (1.5x growth)."""
+        np = self.np
+        if self._vectors is not None and self._vectors.shape[1] != dim:
+            raise ValueError(f"Embedding dimension {dim} does not match the store ({self._vectors.shape[1]})")
+        capacity = max(needed, self.capacity + self.capacity // 2, 1024)
+        specs = {"vectors": (self.dtype, (capacity, dim)), "norms": (np.float32, (capacity,)),
+                 "alive": (np.bool_, (capacity,)), "lists": (np.int32, (capacity,))}
+        if self.dtype == np.int8:
+            specs["scales"] = (np.float32, (capacity,))
+            if self.rerank != "none":
+                specs["raw"] = (np.dtype(self.rerank), (capacity, dim))
+        for name, (dtype, shape) in specs.items():
+            fresh = np.lib.format.open_memmap(self._file(name) + ".tmp", mode="w+", dtype=dtype, shape=shape)
+            old = getattr(self, "_" + name)
+            if name == "lists":
+                fresh[:] = -1
+            if old is not None:
+                fresh[:old.shape[0]] = old
+            fresh.flush()
+            del fresh
+            setattr(self, "_" + name, None)
+            del old
+            os.replace(self._file(name) + ".tmp", self._file(name))
+        self._db.executemany("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                             [("dtype", self.dtype.name), ("rerank", self.rerank)])
+        self._db.commit()
+        self._load_arrays()
+
+    def _flush(self):
+        for array in (self._vectors, self._norms, self._alive, self._lists, self._scales, self._raw):
+            if array is not None:
+                array.flush()
+
+    def _free_rows(self, count: int) -> List[int]:
+        """Rows for new records: deleted slots first, then the end of the matrix."""
+        free = []
+        if self._size and count:
+            free = self.np.flatnonzero(~self._alive[:self._size])[:count].tolist()
+        free += list(range(self._size, self._size + count - len(free)))
+        return free
+
+    # --- Writes ---
+
+    def upsert(self, ids, embeddings, metadatas=None, documents=None):
+        np = self.np
+        if not ids:
+            return
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        with self._lock:
+            placeholders = ", ".join("?" for _ in ids)
+            existing = dict(self._db.execute(f"SELECT id, row FROM records WHERE id IN ({placeholders})", ids).fetchall())
+            new_rows = iter(self._free_rows(len([i for i in ids if i not in existing])))
+            rows = np.array([existing[i] if i in existing else next(new_rows) for i in ids], dtype=np.int64)
+            if self._vectors is None or rows.max() >= self.capacity:
+                self._grow(int(rows.max()) + 1, matrix.shape[1])
+            stored = self._encode(rows, matrix) # Norms of what is actually stored (float16/int8 rounding)
+            self._norms[rows] = np.einsum("ij,ij->i", stored, stored)
+            self._alive[rows] = True
+            self._lists[rows] = self._assign(stored) if self._centroids is not None else -1
+            self._flush()
+            self._db.executemany(
+                "INSERT OR REPLACE INTO records (row, id, document, metadata) VALUES (?, ?, ?, ?)",
+                [(int(row), memory_id, documents[i] if documents else None, json.dumps(metadatas[i] if metadatas else {}))
+                 for i, (memory_id, row) in enumerate(zip(ids, rows))]
+            )
+            self._db.commit()
+            self._size = max(self._size, int(rows.max()) + 1)
+            if self.index == "ivf" and self._needs_training():
+                self.train_ivf() # At write time, so queries never pay for it
+
+    def _encode(self, rows, matrix):
+        """Writes `matrix` at `rows`; returns the float32 vectors as stored."""
+        np = self.np
+        if self.dtype != np.int8:
+            self._vectors[rows] = matrix.astype(self.dtype)
+            return self._vectors[rows].astype(np.float32)
+        scales = np.abs(matrix).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.rint(matrix / scales[:, None]).astype(np.int8)
+        self._vectors[rows] = codes
+        self._scales[rows] = scales
+        if self._raw is not None:
+            self._raw[rows] = matrix.astype(self._raw.dtype)
+        return codes.astype(np.float32) * scales[:, None]
+
+    def _floats(self, rows):
+        """float32 vectors at `rows`: the full-precision copy if there is one."""
+        np = self.np
+        if self._raw is not None:
+            return self._raw[rows].astype(np.float32)
+        vectors = self._vectors[rows].astype(np.float32)
+        if self._scales is not None:
+            vectors *= self._scales[rows][:, None]
+        return vectors
+
+    def update(self, ids, metadatas=None):
+        if not metadatas:
+            return
+        with self._lock:
+            self._db.executemany("UPDATE records SET metadata = ? WHERE id = ?",
+                                 [(json.dumps(meta), memory_id) for memory_id, meta in zip(ids, metadatas)])
+            self._db.commit()
+
+    def delete(self, ids=None, where=None):
+        with self._lock:
+            sql, params = self._select("row", ids, where)
+            rows = [row for (row,) in self._db.execute(sql, params).fetchall()]
+            if not rows:
+                return
+            self._alive[rows] = False
+            self._alive.flush()
+            self._db.executemany("DELETE FROM records WHERE row = ?", [(row,) for row in rows])
+            self._db.commit()
+
+    # --- Reads ---
+
+    def _select(self, columns: str, ids=None, where=None) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        if ids is not None:
+            clauses.append(f"id IN ({', '.join('?' for _ in ids)})" if ids else "0")
+            params += list(ids)
+        if where:
+            sql, where_params = where_to_sql(where)
+            clauses.append(sql)
+            params += where_params
+        return f"SELECT {columns} FROM records" + (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT count(*) FROM records").fetchone()[0]
+
+    def get(self, ids=None, where=None, limit=None, offset=None, include=None):
+        include = ["metadatas", "documents"] if include is None else include
+        with self._lock:
+            sql, params = self._select("row, id, document, metadata", ids, where)
+            sql += " ORDER BY row"
+            if limit is not None or offset:
+                sql += " LIMIT ? OFFSET ?"
+                params += [-1 if limit is None else limit, offset or 0]
+            records = self._db.execute(sql, params).fetchall()
+            embeddings = self._floats([r[0] for r in records]) if "embeddings" in include and records else None
+        return {
+            "ids": [r[1] for r in records],
+            "documents": [r[2] for r in records] if "documents" in include else None,
+            "metadatas": [json.loads(r[3]) for r in records] if "metadatas" in include else None,
+            "embeddings": embeddings,
+        }
+
+    def query(self, query_embeddings, n_results=10, where=None, include=None):
+        include = ["metadatas", "documents", "distances"] if include is None else include
+        np = self.np
+        results = {"ids": [], "distances": [], "metadatas": [], "documents": []}
+        with self._lock:
+            if self._vectors is None:
+                return {key: [[] for _ in query_embeddings] for key in results}
+            candidates = None
+            if where:
+                sql, params = self._select("row", None, where)
+                candidates = np.array([row for (row,) in self._db.execute(sql, params).fetchall()], dtype=np.int64)
+            for embedding in query_embeddings:
+                q = np.asarray(embedding, dtype=np.float32)
+                rows, distances = self._search(q, n_results, candidates)
+                found = {r[0]: r[1:] for r in self._db.execute(
+                    f"SELECT row, id, document, metadata FROM records WHERE row IN ({', '.join('?' for _ in rows)})",
+                    [int(r) for r in rows]).fetchall()} if len(rows) else {}
+                hits = [(found[int(r)], float(d)) for r, d in zip(rows, distances) if int(r) in found]
+                results["ids"].append([h[0][0] for h in hits])
+                results["distances"].append([d for _, d in hits])
+                results["documents"].append([h[0][1] for h in hits])
+                results["metadatas"].append([json.loads(h[0][2]) for h in hits])
+        return {key: (value if key == "ids" or key in include else None) for key, value in results.items()}
+
+    def _search(self, q, n: int, candidates=None):
+        """Top-n (rows, squared L2 distances) among live rows, optionally restricted to `candidates`."""
+        np = self.np
+        size = self._size
+        keep = n * self.rerank_factor if self._raw is not None else n
+        if self._centroids is not None and self.index == "ivf":
+            probes = np.argsort(self._sq_distances(self._centroids, q))[:self.nprobe]
+            in_lists = np.flatnonzero(np.isin(self._lists[:size], probes) & self._alive[:size])
+            candidates = in_lists if candidates is None else np.intersect1d(in_lists, candidates)
+        best_rows, best_distances = [], []
+        if candidates is None:
+            # Contiguous blocks: no gather copies for a full scan
+            for start in range(0, size, self.BLOCK):
+                stop = min(start + self.BLOCK, size)
+                rows = np.flatnonzero(self._alive[start:stop]) + start
+                if len(rows) == stop - start:
+                    distances = self._block_distances(slice(start, stop), q)
+                else:
+                    distances = self._block_distances(rows, q)
+                self._keep_best(rows, distances, keep, best_rows, best_distances)
+        else:
+            candidates = candidates[self._alive[candidates]] if len(candidates) else candidates
+            for start in range(0, len(candidates), self.BLOCK):
+                rows = candidates[start:start + self.BLOCK]
+                self._keep_best(rows, self._block_distances(rows, q), keep, best_rows, best_distances)
+        if not best_rows:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.float32)
+        rows, distances = np.concatenate(best_rows), np.concatenate(best_distances)
+        order = np.argsort(distances)[:keep]
+        rows, distances = rows[order], distances[order]
+        if self._raw is not None:
+            # Re-rank the shortlist by exact distance (reads only these rows of raw.npy)
+            distances = ((self._raw[rows].astype(np.float32) - q) ** 2).sum(axis=1)
+            order = np.argsort(distances)[:n]
+            rows, distances = rows[order], distances[order]
+        return rows, distances
+
+    def _block_distances(self, rows, q):
+        block = self._vectors[rows].astype(self.np.float32, copy=False) # float16/int8 pay a conversion here
+        dots = block @ q
+        if self._scales is not None:
+            dots *= self._scales[rows]
+        return self.np.maximum(self._norms[rows] - 2.0 * dots + float(q @ q), 0.0)
+
+    def _keep_best(self, rows, distances, n, best_rows, best_distances):
+        if len(rows) > n:
+            top = self.np.argpartition(distances, n - 1)[:n]
+            rows, distances = rows[top], distances[top]
+        best_rows.append(rows)
+        best_distances.append(distances)
+
+    def _sq_distances(self, matrix, q):
+        return ((matrix - q) ** 2).sum(axis=1)
+
+    # --- IVF ---
+
+    def _needs_training(self) -> bool:
+        live = int(self._alive[:self._size].sum())
+        if live < self.ivf_min_rows:
+            return False
+        trained_at = int(self._settings.get("ivf_trained_rows", 0))
+        return self._centroids is None or live >= 2 * trained_at
+
+    def _assign(self, vectors):
+        np = self.np
+        scores = (vectors @ self._centroids.T) * -2.0 + (self._centroids ** 2).sum(axis=1)
+        return np.argmin(scores, axis=1).astype(np.int32)
+
+    def train_ivf(self, nlist: Optional[int] = None, iterations: int = 8, sample: int = 65536, seed: int = 0):
+        """Clusters the live rows into `nlist` lists (default ~sqrt(n)) and assigns every row."""
+        np = self.np
+        with self._lock:
+            live = np.flatnonzero(self._alive[:self._size])
+            if len(live) == 0:
+                return
+            nlist = nlist or max(1, int(np.sqrt(len(live))))
+            rng = np.random.default_rng(seed)
+            training = self._floats(np.sort(rng.choice(live, min(sample, len(live)), replace=False)))
+            centroids = training[rng.choice(len(training), min(nlist, len(training)), replace=False)]
+            for _ in range(iterations):
+                self._centroids = centroids
+                labels = self._assign(training)
+                for c in range(len(centroids)):
+                    members = training[labels == c]
+                    if len(members):
+                        centroids[c] = members.mean(axis=0)
+            self._centroids = centroids
+            for start in range(0, len(live), self.BLOCK):
+                rows = live[start:start + self.BLOCK]
+                self._lists[rows] = self._assign(self._floats(rows))
+            self._lists.flush()
+            np.save(self._file("centroids"), centroids)
+            self._settings["ivf_trained_rows"] = str(len(live))
+            self._db.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('ivf_trained_rows', ?)", (str(len(live)),))
+            self._db.commit()
+            print(f"🧭 [VectorStore] Trained IVF: {len(centroids)} lists over {len(live)} vectors")
+
+    def close(self):
+        with self._lock:
+            if self._vectors is not None:
+                self._flush()
+            self._vectors = self._norms = self._alive = self._lists = self._scales = self._raw = None
+            self._db.close()
+
+    def footprint(self) -> Dict[str, int]:
+        """Bytes on disk per file."""
+        return {name: os.path.getsize(os.path.join(self.path, name)) for name in os.listdir(self.path)
+                if os.path.isfile(os.path.join(self.path, name))}
+
+def open_vector_store(path: str, backend: str = VECTOR_BACKEND):
+    """(client, collection) for `backend`. The NumPy store has no separate client."""
+    if backend == "numpy":
+        return None, NumpyVectorStore(path)
+    if backend != "chroma":
+        raise ValueError(f"Unknown vector backend: {backend}")
+    import chromadb
+    client = chromadb.PersistentClient(path=path)
+    return client, client.get_or_create_collection(name=COLLECTION_NAME)
@@ -1,27 +1,51 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-import uvicorn
-import asyncio
-import socketio
-from datetime import datetime
-from contextlib import asynccontextmanager
-
-from backend.core.events import event_bus, Event, EventType
-from backend.perception.mock_sensor import MockSensor
-from backend.perception.screen_sensor import ScreenSensorComplete as ScreenSensor
-from backend.perception.file_sensor import FileSensor
-from backend.agents.council import council_graph
-from backend.agents.liaison import liaison_agent, LiaisonState
-from langchain_core.messages import HumanMessage
-
-from backend.core.actuators import NotificationActuator
-from backend.core.memory import hippocampus
+from backend.core.startup import startup_profiler
+
+with startup_profiler.measure("import:web (fastapi, socketio)"):
+    from fastapi import FastAPI, Body
+    from fastapi.middleware.cors import CORSMiddleware
+    import uvicorn
+    import asyncio
+    import importlib
+    import socketio
+    import uuid
+    from datetime import datetime
+    from contextlib import asynccontextmanager
+    from typing import Any, List, Optional
+
+with startup_profiler.measure("import:perception"):
+    from backend.core.events import event_bus, Event, EventType
+    from backend.perception.mock_sensor import MockSensor
+    from backend.perception.screen_sensor import ScreenSensorComplete as ScreenSensor
+    from backend.perception.file_sensor import FileSensor
+    from langchain_core.messages import HumanMessage, AIMessage
+
+with startup_profiler.measure("import:core"):
+    from backend.core.actuators import NotificationActuator
+    from backend.core.memory import hippocampus
+    from backend.core.ingestion import ingestion_queue
+    from backend.core.llm import llm_provider, close_http_client
+    from backend.core.context_builder import context_metrics
+    from backend.core.tool_calling import tool_metrics
+    from backend.core.session_store import session_store
+    from backend.core.scheduler import llm_priority, Priority
+
+# The agent graphs (langgraph + prompts) are imported by the startup warmup,
+# off the event loop; handlers import them on first use if warmup is still running.
+AGENT_MODULES = ["backend.agents.council", "backend.agents.liaison"]
+
+async def _warm_agents():
+    for module in AGENT_MODULES:
+        await asyncio.to_thread(importlib.import_module, module)
+
+# Sent as the `chat_reply` when the Liaison fails, so a stream always ends with a reply
+CHAT_FALLBACK_REPLY = "I'm having trouble connecting to my thought process right now."
 
 # --- Socket.IO Setup ---
 sio = socketio.AsyncServer(async_mode='asgi', cors_allowed_origins='*')
 
-# --- Lifecycle Manager ---
-from backend.core.pulse import vital_pulse
+# --- Heartbeat ---
+with startup_profiler.measure("import:pulse"):
+    from backend.core.pulse import vital_pulse
 
 # --- Lifecycle Manager ---
 @asynccontextmanager
@@ -29,24 +53,40 @@ async def lifespan(app: FastAPI):
     # Startup
     print("--- [VitalOS] System Boot Sequence Initiated ---")
     
+    # Heavy subsystems warm up in the background; nothing below waits for them
+    startup_profiler.background("warmup:vector_store", hippocampus.warmup)
+    startup_profiler.background("warmup:agents", _warm_agents)
+    startup_profiler.background("warmup:llm_provider", llm_provider.warmup)
+    
+    # Memory persistence runs behind the handlers (see core/ingestion.py)
+    with startup_profiler.measure("init:ingestion"):
+        await ingestion_queue.start()
+    
     # 0. Initialize Pulse (Heartbeat)
-    vital_pulse.socket_manager = sio
-    pulse_task = asyncio.create_task(vital_pulse.start())
+    with startup_profiler.measure("init:pulse"):
+        vital_pulse.socket_manager = sio
+        pulse_task = asyncio.create_task(vital_pulse.start())
     
     # 1. Initialize Sensors & Actuators
     # mock_sensor = MockSensor(event_bus)
     # await mock_sensor.start()
     
-    screen_sensor = ScreenSensor(event_bus, interval=30) 
-    await screen_sensor.start()
+    with startup_profiler.measure("init:screen_sensor"):
+        screen_sensor = ScreenSensor(event_bus, interval=30) 
+        await screen_sensor.start()
     
-    file_sensor = FileSensor(event_bus)
-    await file_sensor.start()
+    with startup_profiler.measure("init:file_sensor"):
+        file_sensor = FileSensor(event_bus)
+        await file_sensor.start()
     
     notifier = NotificationActuator()
     
     # 2. Subscribe The Council
     async def run_council(event: Event):
+        with llm_priority(Priority.COUNCIL):
+            await _run_council(event)
+
+    async def _run_council(event: Event):
         print(f"--- [VitalOS] Dispatching to Council: {event.payload['text'][:30]}... ---")
         
         # Emit to Frontend
@@ -55,6 +95,7 @@ async def lifespan(app: FastAPI):
         inputs = {"input_data": event.payload["text"], "source": event.payload["type"]}
         
         # Run LangGraph
+        from backend.agents.council import council_graph
         result = await council_graph.ainvoke(inputs)
         
         # Parse result
@@ -82,23 +123,59 @@ async def lifespan(app: FastAPI):
         Council Decision: {final_plan.risk_level} Risk.
         Actions: {final_plan.actions}
         """
-        await hippocampus.add_memory(council_log)
+        await ingestion_queue.submit(council_log, source="council")
             
     # 5. Chat Handler
     @sio.on('chat_message')
     async def handle_chat(sid, data):
+        with llm_priority(Priority.INTERACTIVE):
+            await _handle_chat(sid, data)
+
+    @sio.on('disconnect')
+    async def handle_disconnect(sid):
+        # Anonymous (per-sid) conversations end with the socket; per-user ones expire by TTL
+        session_store.drop(session_store.key_for(sid))
+
+    async def _handle_chat(sid, data):
         print(f"--- [Liaison] User Message: {data['message']} ---")
         
-        # Run Liaison Agent
-        inputs = {"messages": [HumanMessage(content=data['message'])], "user_profile": ""}
-        result = await liaison_agent.ainvoke(inputs)
+        # Run Liaison Agent, streaming the reply as `chat_reply_chunk` events.
+        # The stream always ends with a `done` chunk, then the full `chat_reply`.
+        stream_id = str(uuid.uuid4())
         
-        response = result["messages"][-1].content
-        print(f"--- [Liaison] Reply: {response} ---")
+        async def on_token(delta: str):
+            await sio.emit('chat_reply_chunk', {"stream_id": stream_id, "delta": delta, "done": False}, to=sid)
         
-        await sio.emit('chat_reply', {"message": response}, to=sid)
+        async def on_reset():
+            # A streamed turn turned out to be a tool call: drop what was shown
+            await sio.emit('chat_reply_chunk', {"stream_id": stream_id, "delta": "", "reset": True, "done": False}, to=sid)
+        
+        # Conversation memory: recent turns verbatim, older ones as a rolling summary
+        session = session_store.get(session_store.key_for(sid, data.get("user_id")))
+        user_msg = HumanMessage(content=data['message'])
+        from backend.agents.liaison import liaison_agent, summarize_conversation
+        async with session.lock:
+            inputs = {"messages": session.messages + [user_msg], "user_profile": "", "summary": session.summary}
+            try:
+                result = await liaison_agent.ainvoke(inputs, config={"configurable": {"on_token": on_token, "on_reset": on_reset}})
+                response = result["messages"][-1].content
+            except Exception as e:
+                print(f"⚠️ [Liaison] Failed to answer: {e}")
+                response = None
+            finally:
+                await sio.emit('chat_reply_chunk', {"stream_id": stream_id, "delta": "", "done": True}, to=sid)
+            
+            if response is None:
+                # Close the stream with a reply; nothing is recorded or stored for this turn
+                await sio.emit('chat_reply', {"message": CHAT_FALLBACK_REPLY, "stream_id": stream_id}, to=sid)
+                return
+            print(f"--- [Liaison] Reply: {response} ---")
             
-        # 4. Long-term Memory Storage
+            await sio.emit('chat_reply', {"message": response, "stream_id": stream_id}, to=sid)
+            session.record_turn(user_msg, AIMessage(content=response))
+        session_store.schedule_compaction(session, summarize_conversation)
+            
+        # 4. Long-term Memory Storage (write-behind: the reply is already out)
         # Construct a full log for the Hippocampus to analyze
         full_log = f"""
         Timestamp: {datetime.now().isoformat()}
@@ -106,19 +183,24 @@ async def lifespan(app: FastAPI):
         Input Text: {data['message']}
         Agent Reply: {response}
         """
-        await hippocampus.add_memory(full_log)
+        await ingestion_queue.submit(full_log, source="chat")
         
     event_bus.subscribe(EventType.DATA_INGESTED, run_council)
     
+    startup_profiler.mark_ready()
     yield
     
     # Shutdown
     print("--- [VitalOS] System Shutdown ---")
+    startup_profiler.cancel_background()
     vital_pulse.stop()
     pulse_task.cancel()
     # await mock_sensor.stop()
     await screen_sensor.stop()
     await file_sensor.stop()
+    await ingestion_queue.stop() # Drain, journal the rest
+    await llm_provider.aclose()
+    await close_http_client()
 
 app = FastAPI(
     title="VitalOS Kernel",
@@ -183,6 +265,67 @@ async def debug_memories():
     """
     return await hippocampus.get_debug_stats()
 
+@app.post("/memories/import")
+async def import_memories(records: List[Any] = Body(...), enrich: bool = True, batch_size: Optional[int] = None):
+    """
+    Bulk-imports memories: structured records (archive.jsonl rows) or raw
+    events ({"text", "type"} as in input.json). Returns a throughput report
+    (memories/sec). For files, use `python -m backend.core.importer`.
+    """
+    from backend.core.importer import parse_record, import_records
+    parsed = [p for p in (parse_record(r) for r in records) if p is not None]
+    report = await import_records(parsed, batch_size=batch_size, enrich=enrich)
+    return {**report, "skipped": len(records) - len(parsed)}
+
+@app.get("/memories/archive")
+async def get_archived_memories(start: Optional[str] = None, end: Optional[str] = None, limit: int = 500):
+    """
+    Reads consolidated memories back from cold storage, e.g. "last March":
+    ?start=2025-03-01&end=2025-04-01. Only the matching segments are read.
+    """
+    from itertools import islice
+    rows = await asyncio.to_thread(lambda: list(islice(hippocampus.cold_storage.scan(start, end), limit + 1)))
+    return {"memories": rows[:limit], "truncated": len(rows) > limit}
+
+@app.get("/memories/archive/stats")
+async def archive_stats():
+    """
+    Returns cold storage size (segments, memories, compression ratio, time span).
+    """
+    return await asyncio.to_thread(hippocampus.cold_storage.get_stats)
+
+@app.post("/memories/archive/rehydrate")
+async def rehydrate_memories(start: Optional[str] = None, end: Optional[str] = None):
+    """
+    Restores archived memories in [start, end) to active memory.
+    """
+    return await hippocampus.rehydrate(start, end)
+
+@app.get("/memories/ingestion")
+async def ingestion_stats():
+    """
+    Returns write-behind ingestion queue stats (pending, dropped, merged...)
+    and near-duplicate suppression stats.
+    """
+    return {**ingestion_queue.get_stats(), "dedup": hippocampus.deduper.get_stats()}
+
+@app.get("/llm/stats")
+async def llm_stats():
+    """
+    Returns LLM provider statistics (cache hit rates etc.), prompt context sizes
+    Liaison tool-loop stats (turns per request, per-tool latency) and chat
+    session sizes.
+    """
+    return {**llm_provider.get_stats(), "context": context_metrics.get_stats(), "tools": tool_metrics.get_stats(),
+            "sessions": session_store.get_stats()}
+
+@app.get("/startup/stats")
+async def startup_stats():
+    """
+    Returns per-subsystem import/init timings of the last boot.
+    """
+    return startup_profiler.get_stats()
+
 if __name__ == "__main__":
     # Run socket_app instead of app
     uvicorn.run("backend.main:socket_app", host="0.0.0.0", port=8000, reload=True)
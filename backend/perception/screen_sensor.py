@@ -1,5 +1,4 @@
 import asyncio
-import pyautogui
 import base64
 import io
 from datetime import datetime
@@ -7,8 +6,17 @@ from PIL import Image
 from backend.core.interfaces import BaseSensor
 from backend.core.events import VitalEventBus
 from backend.core.llm import llm_provider
+from backend.core.scheduler import llm_priority, Priority
 from pydantic import BaseModel, Field
 
+def _pyautogui():
+    """
+    pyautogui is imported on first use: it is slow to import and needs a
+    display, so importing it at module level stalls (or breaks) startup.
+    """
+    import pyautogui
+    return pyautogui
+
 # --- Schema for Vision Analysis ---
 class ScreenAnalysis(BaseModel):
     activity_category: str = Field(description="Broad category: Work, Entertainment, Social, Idle, etc.")
@@ -51,7 +59,7 @@ class ScreenSensor(BaseSensor):
             
             try:
                 # 1. Capture Screen
-                screenshot = pyautogui.screenshot()
+                screenshot = _pyautogui().screenshot()
                 
                 # 2. Resize for efficiency (Gemini Flash doesn't need 4K)
                 screenshot.thumbnail((1024, 1024))
@@ -87,7 +95,7 @@ class ActivityTracker:
     def __init__(self):
         self.current_activity = "Unknown"
         self.start_time = datetime.now()
-        self.last_mouse_pos = pyautogui.position()
+        self.last_mouse_pos = None # Read on first update()
         self.last_mouse_move_time = datetime.now()
 
     def update(self, new_activity: str) -> int:
@@ -98,7 +106,7 @@ class ActivityTracker:
         now = datetime.now()
         
         # 1. Idle Detection (Mouse check)
-        current_mouse_pos = pyautogui.position()
+        current_mouse_pos = _pyautogui().position()
         if current_mouse_pos != self.last_mouse_pos:
             self.last_mouse_pos = current_mouse_pos
             self.last_mouse_move_time = now
@@ -136,16 +144,17 @@ class ScreenSensorComplete(BaseSensor):
         while self.is_running:
             await asyncio.sleep(self.interval)
             try:
-                # 1. Capture
-                screenshot = pyautogui.screenshot()
+                # 1. Capture (blocking; keep it off the event loop)
+                screenshot = await asyncio.to_thread(_pyautogui().screenshot)
                 screenshot.thumbnail((1024, 1024))
                 
-                # 2. Analyze
-                analysis = await llm_provider.analyze_image(
-                    image=screenshot,
-                    prompt=VISION_PROMPT,
-                    schema_model=ScreenAnalysis
-                )
+                # 2. Analyze (perception is ingestion-class traffic)
+                with llm_priority(Priority.INGESTION):
+                    analysis = await llm_provider.analyze_image(
+                        image=screenshot,
+                        prompt=VISION_PROMPT,
+                        schema_model=ScreenAnalysis
+                    )
                 
                 # 3. Track Duration
                 duration = self.tracker.update(analysis.activity_category)
@@ -111,9 +111,33 @@ export default function ChatInterface() {
             },
         ]);
 
+        // Streamed reply: one message per stream_id, grown chunk by chunk
+        const upsertStream = (streamId: string, update: (content: string) => string) => {
+            setMessages((prev) => {
+                if (prev.some((m) => m.id === streamId)) {
+                    return prev.map((m) => (m.id === streamId ? { ...m, content: update(m.content) } : m));
+                }
+                return [...prev, { id: streamId, role: "assistant", content: update(""), timestamp: Date.now() }];
+            });
+        };
+
+        socket.on("chat_reply_chunk", (data: any) => {
+            if (data.reset) {
+                upsertStream(data.stream_id, () => "");
+            } else if (data.delta) {
+                setIsTyping(false);
+                upsertStream(data.stream_id, (content) => content + data.delta);
+            }
+        });
+
         socket.on("chat_reply", (data: any) => {
             setIsTyping(false);
-            addMessage("assistant", data.message);
+            if (data.stream_id) {
+                // Final text is authoritative (replaces the streamed copy)
+                upsertStream(data.stream_id, () => data.message);
+            } else {
+                addMessage("assistant", data.message);
+            }
         });
 
         // Listen for System Alerts to inject into chat
@@ -142,6 +166,7 @@ export default function ChatInterface() {
         });
 
         return () => {
+            socket.off("chat_reply_chunk");
             socket.off("chat_reply");
             socket.off("analysis_result");
             socket.off("risk_card");
@@ -0,0 +1,11 @@
+"""Shared fixtures for the memory store tests."""
+from backend.core.memory import MemoryEntry
+
+def entry(memory_id, timestamp, statement, scene="Work", user_state="Focused", outcome="Logged", entities=None):
+    return MemoryEntry(id=memory_id, timestamp=timestamp, scene=scene, statement=statement,
+                       entities=entities or [], user_state=user_state, outcome=outcome)
+
+def write(store, entries, embed=lambda e: [1.0, 0.0, 0.0]):
+    """Seeds `store` through its own write path (vectors, text index, hot tier, generation)."""
+    store._write(ids=[e.id for e in entries], documents=[store._index_text(e) for e in entries],
+                 embeddings=[embed(e) for e in entries], metadatas=[store._to_metadata(e) for e in entries])
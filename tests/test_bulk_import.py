@@ -0,0 +1,80 @@
+import os
+import json
+import asyncio
+import tempfile
+from unittest.mock import AsyncMock, patch
+from backend.core.memory import Hippocampus, MemoryEntry
+from backend.core.importer import load_records, parse_record
+import backend.core.memory as memory
+
+def fake_entry(log):
+    return MemoryEntry(timestamp="2025-01-01T10:00:00", scene="Work", statement=log.splitlines()[-1], entities=["x"], user_state="Focused", outcome="Logged")
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.requests = []
+
+    async def __call__(self, texts):
+        self.requests.append(len(texts))
+        return [[float(len(t)), 1.0, 0.5] for t in texts]
+
+def run_import(store, batch, **kwargs):
+    embeddings = FakeEmbeddings()
+    with patch.object(memory.llm_provider, "get_embeddings", embeddings), \
+         patch.object(memory.llm_provider, "extract_memory_dimensions", AsyncMock(side_effect=fake_entry)), \
+         patch.object(memory.graph_enricher, "enrich_memory", AsyncMock(return_value={"nodes": [], "edges": []})), \
+         patch.object(memory.graph_service, "add_memory_node", AsyncMock()), \
+         patch.object(memory.graph_service, "flush", AsyncMock()):
+        report = asyncio.run(store.add_memories(batch, **kwargs))
+    return report, embeddings.requests
+
+def test_bulk_add_batches_writes():
+    print("\n--- Testing Bulk add_memories ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = Hippocampus(path=tmp)
+        logs = [f"Input Text: event {i}" for i in range(150)]
+        writes = []
+        original = store.collection.upsert
+
+        def counting_upsert(**kwargs):
+            writes.append(len(kwargs["ids"]))
+            return original(**kwargs)
+
+        with patch.object(store.collection, "upsert", counting_upsert):
+            report, embed_requests = run_import(store, logs, batch_size=64)
+        print(f"Report: {report}")
+        assert report["stored"] == 150 and report["failed"] == 0
+        assert writes == [64, 64, 22] # One Chroma write per chunk
+        assert embed_requests == [64, 64, 22] # One embedding request per chunk
+        assert report["memories_per_sec"] > 0
+        assert store.collection.count() == 150
+    print("SUCCESS: Extraction, embedding and writes batched per chunk.")
+
+def test_import_archive_and_input_dumps():
+    print("\n--- Testing Import File Formats ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = os.path.join(tmp, "archive.jsonl")
+        with open(archive, "w") as f:
+            for i in range(5):
+                f.write(json.dumps({"timestamp": f"2023-10-27T10:0{i}:00", "scene": "Work", "statement": f"Coding {i}",
+                                    "entities": [], "user_state": "Focused", "outcome": "Progress", "remarks": "", "id": str(i)}) + "\n")
+        dump = os.path.join(tmp, "input.json")
+        with open(dump, "w") as f:
+            json.dump([{"text": "Headache after coding", "type": "user_report"}, {"type": "empty"}], f)
+
+        records = load_records(archive) + load_records(dump)
+        assert [type(r).__name__ for r in records] == ["MemoryEntry"] * 5 + ["str"]
+        assert "Input Source: user_report" in records[-1]
+
+        store = Hippocampus(path=os.path.join(tmp, "chroma"))
+        report, _ = run_import(store, records, enrich=False)
+        assert report["stored"] == 6
+        # Structured rows keep their ids, so re-importing an archive is idempotent
+        run_import(store, load_records(archive), enrich=False)
+        assert store.collection.count() == 6
+        assert parse_record({"unrelated": 1}) is None
+    print("SUCCESS: archive.jsonl rows stored directly, raw events extracted.")
+
+if __name__ == "__main__":
+    test_bulk_add_batches_writes()
+    test_import_archive_and_input_dumps()
@@ -0,0 +1,79 @@
+import asyncio
+from unittest.mock import patch
+from langchain_core.messages import HumanMessage
+from backend.core.llm import BaseLLMProvider
+from backend.agents.liaison import liaison_agent
+
+TOOL_TURN = '```json\n{"tool": "fetch_profile_context", "args": {"category": "traits"}}\n```'
+
+class ScriptedProvider(BaseLLMProvider):
+    """Streams pre-scripted turns in small pieces."""
+    name = "scripted"
+
+    def __init__(self, turns):
+        self.turns = list(turns)
+
+    async def _generate_chat_stream(self, messages, model=None):
+        text = self.turns.pop(0)
+        for i in range(0, len(text), 4):
+            await asyncio.sleep(0)
+            yield text[i:i + 4]
+
+    async def _embed_batch(self, texts):
+        return [[] for _ in texts]
+
+    async def _generate_structured(self, prompt, schema_model, context="", model=None):
+        raise NotImplementedError
+
+class OneShotProvider(ScriptedProvider):
+    """No native streaming: relies on the base fallback."""
+    async def _generate_chat(self, messages, model=None):
+        return self.turns.pop(0)
+
+    _generate_chat_stream = BaseLLMProvider._generate_chat_stream
+
+async def run_liaison(provider):
+    events = []
+
+    async def on_token(delta):
+        events.append(delta)
+
+    async def on_reset():
+        events.append(None)
+
+    inputs = {"messages": [HumanMessage(content="What are my traits?")], "user_profile": ""}
+    with patch("backend.agents.liaison.llm_provider", provider):
+        result = await liaison_agent.ainvoke(inputs, config={"configurable": {"on_token": on_token, "on_reset": on_reset}})
+    return events, result["messages"][-1].content
+
+def test_tool_turn_is_not_streamed():
+    print("\n--- Testing Streamed Liaison (tool call, then reply) ---")
+    reply = "You are a night owl who loves focus time."
+    events, final = asyncio.run(run_liaison(ScriptedProvider([TOOL_TURN, reply])))
+    print(f"Chunks: {events}")
+    assert final == reply
+    assert None not in events
+    assert "".join(events) == reply
+    assert len(events) > 1
+    print("SUCCESS: Only the final turn reached the client, incrementally.")
+
+def test_streamed_tool_call_resets():
+    print("\n--- Testing Streamed Liaison (prose before a tool call) ---")
+    reply = "Done."
+    events, final = asyncio.run(run_liaison(ScriptedProvider(["Let me check.\n" + TOOL_TURN, reply])))
+    print(f"Chunks: {events}")
+    assert final == reply
+    reset_at = events.index(None)
+    assert "".join(events[reset_at + 1:]) == reply
+    print("SUCCESS: Client told to discard the streamed tool turn.")
+
+def test_fallback_single_chunk():
+    print("\n--- Testing Non-Streaming Provider Fallback ---")
+    events, final = asyncio.run(run_liaison(OneShotProvider(["Hi"])))
+    assert events == ["Hi"] and final == "Hi"
+    print("SUCCESS: Whole reply delivered as one chunk.")
+
+if __name__ == "__main__":
+    test_tool_turn_is_not_streamed()
+    test_streamed_tool_call_resets()
+    test_fallback_single_chunk()
@@ -0,0 +1,168 @@
+import os
+import asyncio
+import tempfile
+import threading
+from unittest.mock import AsyncMock, patch
+from backend.core.memory import Hippocampus
+import backend.core.memory as memory
+import backend.core.consolidation as consolidation
+from tests.helpers import entry
+
+def moment(i, timestamp, outcome="Progress"):
+    return entry(f"m{i}", timestamp, f"Event {i} " + "typing " * 10, outcome=outcome)
+
+def seed(store, entries):
+    store.collection.add(ids=[e.id for e in entries], embeddings=[[0.1, 0.2, 0.3]] * len(entries),
+                         metadatas=[store._to_metadata(e) for e in entries])
+
+class FakeSummarizer:
+    def __init__(self, fail_on=None):
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+        self.fail_on = fail_on
+
+    async def __call__(self, context, call_site="summary"):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.02)
+        self.active -= 1
+        self.calls.append(context)
+        if self.fail_on and self.fail_on(context):
+            return "Summary failed."
+        return f"Summary #{len(self.calls)}"
+
+def run(store, summarizer, **options):
+    async def embeddings(texts):
+        return [[0.3, 0.2, 0.1] for _ in texts]
+    with patch.object(consolidation.llm_provider, "summarize_day", summarizer), \
+         patch.object(memory.llm_provider, "get_embeddings", embeddings), \
+         patch.object(memory.graph_enricher, "enrich_memory", AsyncMock(return_value={"nodes": [], "edges": []})), \
+         patch.object(memory.graph_service, "add_memory_node", AsyncMock()), \
+         patch.object(memory.graph_service, "flush", AsyncMock()):
+        return asyncio.run(store.consolidate_memories(**options))
+
+def test_windowed_map_reduce():
+    print("\n--- Testing Windowed Map-Reduce Consolidation ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = Hippocampus(path=os.path.join(tmp, "chroma"))
+        entries = [moment(i, f"2025-03-01T10:{i * 5:02d}:00") for i in range(8)] # 3 map chunks (3 lines each)
+        entries += [moment(10 + i, f"2025-03-01T11:{i * 5:02d}:00") for i in range(4)] # 2 chunks
+        entries += [moment(20 + i, f"2025-03-01T12:0{i}:00") for i in range(2)] # Too small and still open: stays raw
+        entries += [moment(30, "2025-03-01T10:30:00", outcome="Consolidated"), moment(31, "2025-03-02T09:00:00")]
+        seed(store, entries)
+
+        summarizer = FakeSummarizer()
+        report = run(store, summarizer, start="2025-03-01T00:00:00", end="2025-03-01T12:30:00",
+                     chunk_chars=320, concurrency=2)
+        print(f"Report: {report}")
+        assert report["candidates"] == 14 and report["windows"] == 3
+        assert report["episodes"] == 2 and report["archived"] == 12 and report["skipped"] == 2
+        assert report["llm_calls"] == 7 # (3 map + 1 reduce) + (2 map + 1 reduce)
+        assert summarizer.peak <= 2
+        assert any(context.startswith("[Part 1]") for context in summarizer.calls)
+
+        left = store.collection.get(include=["metadatas"])
+        outcomes = sorted(m["outcome"] for m in left["metadatas"])
+        assert outcomes == ["Consolidated"] * 3 + ["Progress"] * 3
+        assert len(list(store.cold_storage.scan())) == 12
+        assert not os.path.exists(os.path.join(tmp, "consolidation_checkpoint.json"))
+
+        # Episodes are never re-selected
+        assert run(store, FakeSummarizer(), start="2025-03-01T00:00:00", end="2025-03-01T12:30:00")["episodes"] == 0
+    print("SUCCESS: Only raw memories in range consolidated, one episode per hour.")
+
+def test_sparse_closed_hours_folded():
+    print("\n--- Testing Sparse Hours ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = Hippocampus(path=os.path.join(tmp, "chroma"))
+        times = ["09:00", "09:10", "13:00", "14:00", "14:10", "14:20", "20:00"]
+        seed(store, [moment(i, f"2025-03-01T{t}:00") for i, t in enumerate(times)])
+        report = run(store, FakeSummarizer(), start="2025-03-01T00:00:00", end="2025-03-02T00:00:00")
+        print(f"Report: {report}")
+        # 09:00 (2) folds into 13:00 (1); 20:00 (1) folds back into 14:00 (3)
+        assert report["windows"] == 2 and report["episodes"] == 2
+        assert report["archived"] == 7 and report["skipped"] == 0
+        spans = sorted(m["statement"][:len("Summary of 2025-03-01 09:00-13:00")] for m in store.collection.get()["metadatas"])
+        assert spans == ["Summary of 2025-03-01 09:00-13:00", "Summary of 2025-03-01 14:00-20:00"]
+
+        # A lone undersized hour is consolidated on its own once closed
+        seed(store, [moment(10, "2025-03-03T08:00:00")])
+        assert run(store, FakeSummarizer(), start="2025-03-03T00:00:00", end="2025-03-03T09:00:00")["episodes"] == 1
+        assert store.collection.count() == 3
+    print("SUCCESS: Closed sparse hours reach consolidation and cold storage.")
+
+def test_interrupted_run_resumes():
+    print("\n--- Testing Checkpointed Resume ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = Hippocampus(path=os.path.join(tmp, "chroma"))
+        seed(store, [moment(i, f"2025-03-01T09:{i * 5:02d}:00") for i in range(8)])
+        options = dict(start="2025-03-01T00:00:00", end="2025-03-02T00:00:00", chunk_chars=320, window="session")
+
+        # The reduce step fails: the map summaries are already checkpointed
+        first = run(store, FakeSummarizer(fail_on=lambda c: c.startswith("[Part")), **options)
+        assert first["failed_windows"] == 1 and first["episodes"] == 0
+        assert os.path.exists(os.path.join(tmp, "consolidation_checkpoint.json"))
+        assert store.collection.count() == 8 # Nothing pruned
+
+        summarizer = FakeSummarizer()
+        second = run(store, summarizer, **options)
+        print(f"Resumed: {second}")
+        assert second["resumed_summaries"] == 3 and second["llm_calls"] == 1 # Only the reduce reran
+        assert second["episodes"] == 1 and store.collection.count() == 1
+        assert not os.path.exists(os.path.join(tmp, "consolidation_checkpoint.json"))
+    print("SUCCESS: Interrupted consolidation resumed without redoing summaries.")
+
+def test_delete_range_backfills_legacy_records():
+    print("\n--- Testing Numeric Time Filters ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = Hippocampus(path=os.path.join(tmp, "chroma"))
+        seed(store, [moment(1, "2025-03-01T10:00:00"), moment(2, "2025-03-05T10:00:00")])
+        legacy = moment(3, "2025-03-01T12:00:00")
+        meta = store._to_metadata(legacy)
+        del meta["ts"] # Stored before `ts` existed
+        store.collection.add(ids=[legacy.id], embeddings=[[0.1, 0.2, 0.3]], metadatas=[meta])
+
+        assert asyncio.run(store.delete_range("2025-03-01T00:00:00", "2025-03-02T00:00:00"))
+        assert store.collection.get()["ids"] == ["m2"]
+    print("SUCCESS: Range deletes use numeric timestamps, including old records.")
+
+def test_recall_overlapping_pruning_not_cached():
+    print("\n--- Testing Recall During Pruning ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = Hippocampus(path=os.path.join(tmp, "chroma"))
+        seed(store, [moment(i, f"2025-03-01T09:{i * 5:02d}:00") for i in range(4)])
+        started, release = threading.Event(), threading.Event()
+        delete = store.collection.delete
+
+        def slow_delete(**kwargs):
+            started.set()
+            release.wait(5)
+            delete(**kwargs)
+
+        def recall():
+            with patch.object(memory.llm_provider, "get_embedding", AsyncMock(return_value=[0.1, 0.2, 0.3])):
+                return [m.id for m in asyncio.run(store.recall("typing", k=10, tiers="warm"))]
+
+        def prune():
+            # The Consolidator alone: no generation bump from consolidate_memories once every window is done
+            with patch.object(store, "consolidate_memories", lambda **o: consolidation.Consolidator(store).run(o["start"], o["end"])):
+                run(store, FakeSummarizer(), start="2025-03-01T00:00:00", end="2025-03-02T00:00:00")
+
+        with patch.object(store.collection, "delete", side_effect=slow_delete):
+            worker = threading.Thread(target=prune)
+            worker.start()
+            assert started.wait(5)
+            during = recall()
+            release.set()
+            worker.join()
+        assert {f"m{i}" for i in range(4)} <= set(during) # Archived but not yet pruned
+        assert not [i for i in recall() if i.startswith("m")]
+    print("SUCCESS: Memories pruned by consolidation are never served from the recall cache.")
+
+if __name__ == "__main__":
+    test_windowed_map_reduce()
+    test_sparse_closed_hours_folded()
+    test_interrupted_run_resumes()
+    test_delete_range_backfills_legacy_records()
+    test_recall_overlapping_pruning_not_cached()
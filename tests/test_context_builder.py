@@ -0,0 +1,64 @@
+from backend.core.context_builder import ContextBuilder, estimate_tokens, context_metrics
+
+WORDS = ["coding", "email", "youtube", "design", "walk", "lunch", "meeting", "reading", "gaming", "stretching", "review", "planning"]
+
+def memory_lines(n):
+    # Distinct enough not to be collapsed as near-duplicates
+    return [f"- [2025-01-01T10:00:00] {WORDS[i % 12]} then {WORDS[(i // 12) % 12]} after {WORDS[(i // 144) % 12]} ({i})" for i in range(n)]
+
+def test_dedupes_near_identical_lines():
+    print("\n--- Testing Context Dedupe ---")
+    lines = [
+        "- [2025-01-01T10:00:00] User is coding in VS Code.",
+        "- [2025-01-01T10:00:30] User is coding in VS Code.",
+        "- [2025-01-01T10:01:00] User is coding in VS Code!",
+        "- [2025-01-01T10:02:00] User took a walk outside.",
+    ]
+    context = ContextBuilder("test", budget=500).add_text("Input", "tired").add_items("History", lines).build()
+    print(context)
+    assert context.count("coding in VS Code") == 1
+    assert "(x3)" in context
+    assert "took a walk" in context
+    print("SUCCESS: Near-identical lines collapsed with a count.")
+
+def test_budget_flat_as_memories_grow():
+    print("\n--- Testing Context Budget ---")
+    sizes = []
+    for n in [3, 30, 300, 3000]:
+        context = (ContextBuilder("doctor", budget=400)
+            .add_text("Input", "User has been coding for 6 hours")
+            .add_items("Patient History", memory_lines(n))
+            .build())
+        sizes.append(estimate_tokens(context))
+    print(f"Context tokens for 3/30/300/3000 memories: {sizes}")
+    assert all(size <= 400 for size in sizes)
+    assert abs(sizes[2] - sizes[3]) <= 8 # Flat once the budget is saturated
+    print("SUCCESS: Prompt size bounded by the role budget.")
+
+def test_lowest_value_items_dropped_first():
+    print("\n--- Testing Value Ordering ---")
+    items = [f"- memory {word} happened " + "detail " * 10 for word in ["alpha", "bravo", "charlie", "delta", "echo", "foxtrot"]]
+    context = ContextBuilder("test", budget=80).add_items("History", items).build()
+    print(context)
+    assert "alpha" in context
+    assert "foxtrot" not in context
+    assert "omitted" in context
+    print("SUCCESS: Lowest-ranked items go first.")
+
+def test_oversized_input_truncated():
+    print("\n--- Testing Input Truncation ---")
+    huge = "heart rate sample " * 2000
+    context = ContextBuilder("triage", budget=300).add_text("Input", huge).add_items("Past History", memory_lines(5)).build()
+    assert estimate_tokens(context) <= 300
+    assert context.startswith("Input: heart rate sample")
+    assert "…" in context
+    stats = context_metrics.get_stats()["triage"]
+    print(f"Stats: {stats}")
+    assert stats["truncated"] >= 1
+    print("SUCCESS: Oversized input truncated to the budget.")
+
+if __name__ == "__main__":
+    test_dedupes_near_identical_lines()
+    test_budget_flat_as_memories_grow()
+    test_lowest_value_items_dropped_first()
+    test_oversized_input_truncated()
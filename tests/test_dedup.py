@@ -0,0 +1,95 @@
+import os
+import asyncio
+import tempfile
+from unittest.mock import AsyncMock, patch
+from backend.core.dedup import simhash, hamming, measurements
+from backend.core.memory import Hippocampus
+import backend.core.memory as memory
+from tests.helpers import entry
+
+def ingest(store, entries, embed=None):
+    calls = []
+
+    async def embedding(text):
+        calls.append(text)
+        return embed(text) if embed else [float(len(calls)), 1.0, 0.0]
+
+    async def run():
+        for _ in entries:
+            await store.add_memory("log", save_graph=False)
+
+    with patch.object(memory.llm_provider, "extract_memory_dimensions", AsyncMock(side_effect=entries)), \
+         patch.object(memory.llm_provider, "get_embedding", embedding), \
+         patch.object(memory.graph_enricher, "enrich_memory", AsyncMock(return_value={"nodes": [], "edges": []})) as enrich, \
+         patch.object(memory.graph_service, "add_memory_node", AsyncMock()) as add_node:
+        asyncio.run(run())
+    return calls, enrich.await_count, add_node.call_count
+
+def test_simhash_masks_numbers():
+    print("\n--- Testing SimHash ---")
+    a = simhash("Work, Duration: 5 minutes in VS Code")
+    assert hamming(a, simhash("Work, Duration: 35 minutes in VS Code")) == 0
+    assert hamming(a, simhash("Watching a film on the couch")) > 3
+    assert measurements("Heart rate 150 bpm after 20 minutes") == ("150",)
+    assert measurements("Blood pressure 120/80, Duration: 5 min") == ("120", "80")
+    print("SUCCESS: Repeated readings share a fingerprint; only durations are masked.")
+
+def test_repeated_readings_merged():
+    print("\n--- Testing Near-Duplicate Merge ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = Hippocampus(path=os.path.join(tmp, "chroma"))
+        entries = [entry(None, f"2025-03-01T10:{m:02d}:00", f"Coding in VS Code, Duration: {m + 5} minutes") for m in range(0, 30, 5)]
+        entries.append(entry(None, "2025-03-01T10:31:00", "Watching a film", scene="Home"))
+        entries.append(entry(None, "2025-03-01T12:00:00", "Coding in VS Code, Duration: 5 minutes")) # Outside the window
+        calls, enrichments, graph_nodes = ingest(store, entries)
+
+        stored = store.collection.get(include=["metadatas"])
+        print(f"Stored: {[(m['statement'], m.get('count', 1)) for m in stored['metadatas']]}")
+        assert store.collection.count() == 3
+        merged = next(m for m in stored["metadatas"] if m.get("count"))
+        assert merged["count"] == 6 and merged["timestamp"] == "2025-03-01T10:00:00"
+        assert merged["last_seen"] == "2025-03-01T10:25:00" and merged["statement"].endswith("30 minutes")
+        assert enrichments == 3 and graph_nodes == 3 # Merges cost no enrichment or graph node
+        assert store.text_index.search("30 minutes", 5)[0][2]["count"] == 6
+        # Document and embedding follow the newest statement
+        record = store.collection.get(include=["documents", "embeddings", "metadatas"])
+        row = next(i for i, m in enumerate(record["metadatas"]) if m.get("count"))
+        assert record["documents"][row] == "Work: Coding in VS Code, Duration: 30 minutes. Result: Logged"
+        assert list(record["embeddings"][row]) == [float(calls.index(record["documents"][row]) + 1), 1.0, 0.0]
+        assert store.deduper.get_stats()["merged_simhash"] == 5
+    print("SUCCESS: Six readings stored as one memory spanning 10:00-10:25.")
+
+def test_embedding_similarity_and_deletes():
+    print("\n--- Testing Cosine Merge ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = Hippocampus(path=os.path.join(tmp, "chroma"))
+        by_scene = lambda text: [1.0, 0.0, 0.0] if text.startswith("Work") else [0.0, 1.0, 0.0]
+        ingest(store, [entry(None, "2025-03-01T10:00:00", "Writing the quarterly report"),
+                       entry(None, "2025-03-01T10:05:00", "Drafting slides for the report review")], embed=by_scene)
+        assert store.collection.count() == 1 and store.deduper.get_stats()["merged_cosine"] == 1
+
+        # A deleted memory is never merged into
+        memory_id = store.collection.get()["ids"][0]
+        assert asyncio.run(store.delete_memory(memory_id))
+        ingest(store, [entry(None, "2025-03-01T10:10:00", "Writing the quarterly report")], embed=by_scene)
+        assert store.collection.count() == 1 and store.collection.get()["ids"][0] != memory_id
+    print("SUCCESS: Semantically identical memories merged; deletes respected.")
+
+def test_differing_measurements_kept():
+    print("\n--- Testing Measurements Are Never Merged ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = Hippocampus(path=os.path.join(tmp, "chroma"))
+        same = lambda text: [1.0, 0.0, 0.0]
+        ingest(store, [entry(None, "2025-03-01T10:00:00", "Heart rate 150 bpm while coding", scene="Health"),
+                       entry(None, "2025-03-01T10:05:00", "Heart rate 60 bpm while coding", scene="Health"),
+                       entry(None, "2025-03-01T10:10:00", "Heart rate 60 bpm while coding", scene="Health")], embed=same)
+        statements = sorted(m["statement"] for m in store.collection.get()["metadatas"])
+        assert statements == ["Heart rate 150 bpm while coding", "Heart rate 60 bpm while coding"]
+        assert store.deduper.get_stats()["merged_simhash"] == 1 # Only the repeated 60 bpm
+    print("SUCCESS: Readings with different values are stored separately.")
+
+if __name__ == "__main__":
+    test_simhash_masks_numbers()
+    test_repeated_readings_merged()
+    test_embedding_similarity_and_deletes()
+    test_differing_measurements_kept()
@@ -0,0 +1,96 @@
+import gc
+import asyncio
+from backend.core.batching import MicroBatcher
+from backend.core.embedding_cache import EmbeddingCache
+from backend.core.llm import BaseLLMProvider
+import backend.core.llm
+
+class BatchRecordingProvider(BaseLLMProvider):
+    name = "batch-recorder"
+    embedding_model = "test-embed"
+
+    def __init__(self):
+        self.batches = []
+
+    async def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        self.batches.append(list(texts))
+        return [[float(len(t))] for t in texts]
+
+    async def _generate_structured(self, prompt, schema_model, context="", model=None):
+        raise NotImplementedError
+
+def test_concurrent_calls_share_one_request():
+    print("\n--- Testing Embedding Micro-Batching ---")
+    original = backend.core.llm.embedding_cache
+    backend.core.llm.embedding_cache = EmbeddingCache(persist=False)
+    try:
+        provider = BatchRecordingProvider()
+
+        async def burst():
+            return await asyncio.gather(*[provider.get_embedding(f"event {i}") for i in range(10)])
+
+        results = asyncio.run(burst())
+        print(f"Upstream batches: {[len(b) for b in provider.batches]}")
+        assert len(provider.batches) == 1
+        assert results[3] == [float(len("event 3"))]
+        print("SUCCESS: 10 concurrent embeddings cost one request.")
+    finally:
+        backend.core.llm.embedding_cache = original
+
+def test_get_embeddings_only_fetches_misses():
+    print("\n--- Testing get_embeddings ---")
+    original = backend.core.llm.embedding_cache
+    backend.core.llm.embedding_cache = EmbeddingCache(persist=False)
+    try:
+        provider = BatchRecordingProvider()
+        asyncio.run(provider.get_embeddings(["a", "b"]))
+        vectors = asyncio.run(provider.get_embeddings(["a", "b", "cc", "cc"]))
+        assert vectors == [[1.0], [1.0], [2.0], [2.0]]
+        assert provider.batches == [["a", "b"], ["cc"]]
+        print("SUCCESS: Cached and duplicate texts skipped.")
+    finally:
+        backend.core.llm.embedding_cache = original
+
+def test_batch_errors_reach_every_caller():
+    print("\n--- Testing MicroBatcher Error Propagation ---")
+
+    async def failing(items):
+        raise RuntimeError("backend down")
+
+    async def run():
+        batcher = MicroBatcher(failing, window=0.001)
+        return await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    print("SUCCESS: Errors propagated.")
+
+def test_in_flight_flush_is_kept_alive():
+    print("\n--- Testing MicroBatcher Task References ---")
+
+    async def run():
+        release = asyncio.Event()
+
+        async def slow(items):
+            await release.wait()
+            return [item * 2 for item in items]
+
+        batcher = MicroBatcher(slow, window=0.001)
+        waiters = asyncio.gather(*[batcher.submit(i) for i in range(3)])
+        await asyncio.sleep(0.01)
+        gc.collect() # The loop's weak reference alone would let the flush be collected here
+        assert len(batcher._tasks) == 1
+        release.set()
+        results = await waiters
+        await asyncio.sleep(0)
+        return results, len(batcher._tasks)
+
+    results, in_flight = asyncio.run(run())
+    assert results == [0, 2, 4] and in_flight == 0
+    print("SUCCESS: Flush tasks are referenced until done, then released.")
+
+if __name__ == "__main__":
+    test_concurrent_calls_share_one_request()
+    test_get_embeddings_only_fetches_misses()
+    test_batch_errors_reach_every_caller()
+    test_in_flight_flush_is_kept_alive()
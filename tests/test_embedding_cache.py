@@ -0,0 +1,86 @@
+import os
+import asyncio
+import tempfile
+from backend.core.embedding_cache import EmbeddingCache, make_key
+from backend.core.llm import BaseLLMProvider
+import backend.core.llm
+
+class CountingProvider(BaseLLMProvider):
+    name = "counting"
+    embedding_model = "test-embed"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        self.calls += 1
+        return [[float(len(t)), 0.5, -1.0] for t in texts]
+
+    async def _generate_structured(self, prompt, schema_model, context="", model=None):
+        raise NotImplementedError
+
+def test_normalized_keys():
+    print("\n--- Testing Embedding Cache Keys ---")
+    assert make_key("gemini", "m", "Coding  python\n") == make_key("gemini", "m", "Coding python")
+    assert make_key("gemini", "m", "x") != make_key("local", "m", "x")
+    assert make_key("gemini", "m1", "x") != make_key("gemini", "m2", "x")
+    print("SUCCESS: Keys are content-addressed per provider/model.")
+
+def test_memory_and_disk_tiers():
+    print("\n--- Testing Embedding Cache Tiers ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.sqlite3")
+        cache = EmbeddingCache(path=path, max_entries=2)
+        cache.put("p", "m", "hello", [1.0, 2.0])
+        assert cache.get("p", "m", "hello") == [1.0, 2.0]
+        assert cache.get("p", "m", "missing") is None
+
+        # Survives a restart via the disk tier
+        restarted = EmbeddingCache(path=path, max_entries=2)
+        assert restarted.get("p", "m", "hello") == [1.0, 2.0]
+        assert restarted.get("p", "m", "hello") == [1.0, 2.0]
+        stats = restarted.get_stats()
+        print(f"Stats: {stats}")
+        assert stats["disk_hits"] == 1 and stats["memory_hits"] == 1
+
+        # Failed embeddings are never cached
+        cache.put("p", "m", "bad", [])
+        assert cache.get("p", "m", "bad") is None
+    print("SUCCESS: Memory + disk tiers verified.")
+
+def test_provider_uses_cache():
+    print("\n--- Testing Provider Embedding Cache ---")
+    original = backend.core.llm.embedding_cache
+    backend.core.llm.embedding_cache = EmbeddingCache(persist=False)
+    try:
+        provider = CountingProvider()
+        first = asyncio.run(provider.get_embedding("Work, Duration: 5 minutes"))
+        second = asyncio.run(provider.get_embedding("Work,  Duration: 5 minutes "))
+        assert first == second
+        assert provider.calls == 1
+        print("SUCCESS: Repeated text served from cache.")
+    finally:
+        backend.core.llm.embedding_cache = original
+
+def test_batch_written_in_one_transaction():
+    print("\n--- Testing Batched Disk Writes ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.sqlite3")
+        cache = EmbeddingCache(path=path)
+        statements = []
+        cache._conn().set_trace_callback(statements.append)
+        items = [("a", [1.0]), ("b", [2.0]), ("failed", []), ("c", [3.0])]
+        asyncio.run(cache.aput_many("p", "m", items))
+        assert sum(s.startswith("INSERT") for s in statements) == 3
+        assert statements.count("COMMIT") == 1
+        assert cache.get_stats()["writes"] == 3
+
+        restarted = EmbeddingCache(path=path)
+        assert [restarted.get("p", "m", t) for t in ("a", "b", "c", "failed")] == [[1.0], [2.0], [3.0], None]
+    print("SUCCESS: One commit per embedding batch, off the event loop.")
+
+if __name__ == "__main__":
+    test_normalized_keys()
+    test_memory_and_disk_tiers()
+    test_provider_uses_cache()
+    test_batch_written_in_one_transaction()
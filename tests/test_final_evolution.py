@@ -1,6 +1,8 @@
+import os
 import asyncio
+import tempfile
 from unittest.mock import AsyncMock, MagicMock, patch
-from backend.core.memory import hippocampus, MemoryEntry
+from backend.core.memory import Hippocampus, MemoryEntry
 from backend.core.risk_engine import risk_engine
 from backend.core.profile_service import profile_service
 
@@ -16,28 +18,30 @@ async def test_wake_up_consolidation():
         MemoryEntry(id="5", timestamp="2023-10-27T10:20:00", statement="Commit changes", scene="Work", outcome="Done", entities=[], user_state="Focused", remarks="")
     ]
     
-    # Mock Hippocampus methods
-    with patch.object(hippocampus, 'get_all_memories', new_callable=AsyncMock) as mock_get:
-        mock_get.return_value = mock_memories
-        
-        with patch.object(hippocampus, 'add_memory', new_callable=AsyncMock) as mock_add:
-            with patch.object(hippocampus.collection, 'delete') as mock_delete:
-                # Mock LLM Summary
-                with patch('backend.core.llm.llm_provider.summarize_day', new_callable=AsyncMock) as mock_summary:
-                    mock_summary.return_value = "User spent the morning coding and debugging effectively."
-                    
-                    # Run Consolidation
-                    await hippocampus.consolidate_memories()
-                    
-                    # Verify Summary Created
-                    assert mock_summary.called
-                    assert mock_add.called
-                    args, _ = mock_add.call_args
-                    assert "Summary of previous session" in args[0]
-                    
-                    # Verify Pruning
-                    assert mock_delete.called
-                    print("SUCCESS: Consolidation logic verified (Summary created, Raw deleted).")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = Hippocampus(path=os.path.join(tmp, "chroma"))
+        store.collection.add(ids=[m.id for m in mock_memories], embeddings=[[0.1, 0.2]] * 5,
+                             metadatas=[store._to_metadata(m) for m in mock_memories])
+
+        with patch.object(store, 'add_memories', new_callable=AsyncMock) as mock_add:
+            mock_add.return_value = {"stored": 1}
+            # Mock LLM Summary
+            with patch('backend.core.llm.llm_provider.summarize_day', new_callable=AsyncMock) as mock_summary:
+                mock_summary.return_value = "User spent the morning coding and debugging effectively."
+                
+                # Run Consolidation
+                await store.consolidate_memories()
+                
+                # Verify Summary Created
+                assert mock_summary.called
+                assert mock_add.called
+                args, _ = mock_add.call_args
+                assert "Summary of 2023-10-27 10:00-10:20" in args[0][0].statement
+                
+                # Verify Pruning and Cold Storage
+                assert store.collection.count() == 0
+                assert [m.id for m in store.cold_storage.scan()] == ["1", "2", "3", "4", "5"]
+                print("SUCCESS: Consolidation logic verified (Summary created, Raw deleted).")
 
 async def test_interactive_feedback():
     print("\n--- Testing Interactive Feedback Loop ---")
@@ -0,0 +1,93 @@
+import os
+import asyncio
+import tempfile
+from unittest.mock import patch
+from backend.core.memory import Hippocampus
+import backend.core.memory as memory
+from tests.helpers import entry, write
+
+MEMORIES = [
+    ("m1", "2025-03-01T09:00:00", "Work", "Coding the API, Duration: 30 minutes", "Focused"),
+    ("m2", "2025-03-01T11:00:00", "Work", "Coding the dashboard, Duration: 45 minutes", "Focused"),
+    ("m3", "2025-03-02T20:00:00", "Home", "Reported a migraine after long screen time", "Tired"),
+    ("m4", "2025-03-03T22:00:00", "Home", "Watching a film", "Relaxed"),
+    ("m5", "2025-03-04T08:00:00", "Gym", "Morning run, felt energetic", "Energetic"),
+    ("m6", "2025-03-05T23:30:00", "Home", "Coding late at night", "Tired"),
+]
+
+class FakeEmbeddings:
+    """Vectors by scene, so vector search alone can't find the migraine."""
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self, text):
+        self.calls += 1
+        return [1.0, 0.0, 0.0] if "Work" in text or "coding" in text.lower() else [0.0, 1.0, 0.0]
+
+def seeded_store(tmp):
+    store = Hippocampus(path=os.path.join(tmp, "chroma"))
+    entries = [entry(i, t, statement, scene=scene, user_state=state) for i, t, scene, statement, state in MEMORIES]
+    write(store, entries, embed=lambda e: [1.0, 0.0, 0.0] if e.scene == "Work" else [0.0, 1.0, 0.0])
+    return store
+
+def recall(store, query, **kwargs):
+    embeddings = FakeEmbeddings()
+    with patch.object(memory.llm_provider, "get_embedding", embeddings):
+        return asyncio.run(store.recall(query, **kwargs)), embeddings.calls
+
+def test_keyword_queries_skip_embedding():
+    print("\n--- Testing Keyword-Only Recall ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = seeded_store(tmp)
+        results, calls = recall(store, "migraines", k=1) # Stemmed match
+        assert [m.id for m in results] == ["m3"] and calls == 0
+        results, calls = recall(store, "what did I feel after the migraine and screen time", k=1)
+        assert results[0].id == "m3" and calls == 1 # Long question: hybrid
+        assert store.recall_stats == {"keyword_only": 1, "hybrid": 1, "vector": 0}
+    print("SUCCESS: Exact-term lookups answered from the text index alone.")
+
+def test_hybrid_blends_both_sources():
+    print("\n--- Testing Hybrid Fusion ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = seeded_store(tmp)
+        vector_only, _ = recall(store, "Work: coding session", k=2, mode="vector")
+        hybrid, _ = recall(store, "coding late night", k=2, mode="hybrid")
+        print(f"Vector: {[m.id for m in vector_only]} Hybrid: {[m.id for m in hybrid]}")
+        assert {m.id for m in vector_only} == {"m1", "m2"}
+        assert hybrid[0].id == "m6" # Found by BM25 and vector
+    print("SUCCESS: BM25 and vector scores combined.")
+
+def test_filters_pushed_down():
+    print("\n--- Testing Filter Pushdown ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = seeded_store(tmp)
+        results, _ = recall(store, "coding", k=5, scene="Home", mode="hybrid")
+        assert results[0].id == "m6" and {m.scene for m in results} == {"Home"}
+        results, _ = recall(store, "coding", k=5, start="2025-03-01T10:00:00", end="2025-03-02T00:00:00")
+        assert [m.id for m in results] == ["m2"]
+        results, _ = recall(store, "film run migraine", k=5, user_state="Tired", mode="keyword")
+        assert [m.id for m in results] == ["m3"]
+    print("SUCCESS: scene/time/user_state filters applied inside both searches.")
+
+def test_index_follows_the_collection():
+    print("\n--- Testing Text Index Sync ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = seeded_store(tmp)
+        assert asyncio.run(store.delete_memory("m3"))
+        results, _ = recall(store, "migraine", k=1, mode="keyword")
+        assert results == []
+        assert asyncio.run(store.delete_range("2025-03-01T00:00:00", "2025-03-02T00:00:00"))
+        assert store.text_index.count() == store.collection.count() == 3
+
+        # A missing index is rebuilt from Chroma
+        os.remove(os.path.join(tmp, "memory_fts.sqlite3"))
+        reopened = Hippocampus(path=os.path.join(tmp, "chroma"))
+        results, calls = recall(reopened, "film", k=1)
+        assert [m.id for m in results] == ["m4"] and calls == 0
+    print("SUCCESS: Deletes and restarts keep BM25 and Chroma in sync.")
+
+if __name__ == "__main__":
+    test_keyword_queries_skip_embedding()
+    test_hybrid_blends_both_sources()
+    test_filters_pushed_down()
+    test_index_follows_the_collection()
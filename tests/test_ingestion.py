@@ -0,0 +1,212 @@
+import os
+import time
+import asyncio
+import tempfile
+from unittest.mock import AsyncMock, MagicMock, patch
+from backend.core.ingestion import IngestionQueue
+from backend.core.memory import hippocampus, MemoryEntry
+import backend.core.memory as memory
+
+class SlowStore:
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.stored = []
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def __call__(self, text):
+        await self.gate.wait()
+        await asyncio.sleep(self.delay)
+        self.stored.append(text)
+        return True
+
+def test_submit_does_not_wait_for_storage():
+    print("\n--- Testing Write-Behind Submit ---")
+    store = SlowStore(delay=0.2)
+    flushed = []
+
+    async def on_idle():
+        flushed.append(True)
+
+    async def run():
+        queue = IngestionQueue(store, on_idle=on_idle, workers=2, journal_path=os.devnull + ".missing")
+        await queue.start()
+        start = time.monotonic()
+        for i in range(4):
+            await queue.submit(f"log {i}", source="chat")
+        submit_time = time.monotonic() - start
+        await queue.join()
+        total = time.monotonic() - start
+        await queue.stop()
+        return queue, submit_time, total
+
+    queue, submit_time, total = asyncio.run(run())
+    print(f"4 submits: {submit_time * 1000:.1f}ms, stored after {total * 1000:.0f}ms")
+    assert submit_time < 0.05
+    assert sorted(store.stored) == [f"log {i}" for i in range(4)]
+    assert total < 0.6 # Two workers, 4 x 200ms
+    assert flushed and queue.get_stats()["processed"] == 4
+    print("SUCCESS: Producers return immediately; workers persist in the background.")
+
+def test_join_wakes_when_idle():
+    print("\n--- Testing Join Wake-Up ---")
+    async def run():
+        store = SlowStore(delay=0)
+        store.gate.clear()
+        queue = IngestionQueue(store, workers=1, journal_path=os.devnull + ".missing")
+        await queue.join() # Idle before start
+        await queue.start()
+        await queue.submit("log", source="chat")
+        joining = asyncio.create_task(queue.join())
+        for _ in range(10):
+            await asyncio.sleep(0)
+        assert not joining.done()
+        store.gate.set()
+        for _ in range(10): # No 10ms poll: join() is notified as the last item finishes
+            await asyncio.sleep(0)
+        done = joining.done()
+        await queue.stop()
+        return done, store.stored
+
+    done, stored = asyncio.run(run())
+    assert done and stored == ["log"]
+    print("SUCCESS: join() is signalled when the queue goes idle.")
+
+def run_overflow(policy, submits, maxsize=2):
+    async def run():
+        store = SlowStore(delay=0)
+        store.gate.clear() # Workers stall on the first item
+        queue = IngestionQueue(store, maxsize=maxsize, workers=1, policy=policy, block_timeout=0.05, journal_path=os.devnull + ".missing")
+        await queue.start()
+        results = []
+        for text, source in submits:
+            results.append(await queue.submit(text, source=source))
+            await asyncio.sleep(0)
+        pending = [item.text for item in queue._pending]
+        store.gate.set()
+        await queue.join()
+        await queue.stop()
+        return results, pending, queue.get_stats()
+    return asyncio.run(run())
+
+def test_overflow_policies():
+    print("\n--- Testing Overflow Policies ---")
+    submits = [("a", "council"), ("b", "council"), ("c", "council"), ("d", "chat")]
+    # "a" is taken by the stalled worker, so b and c fill the queue
+
+    results, pending, stats = run_overflow("drop_newest", submits)
+    assert results == [True, True, True, False] and pending == ["b", "c"]
+
+    results, pending, stats = run_overflow("drop_oldest", submits)
+    assert pending == ["c", "d"] and stats["dropped"] == 1
+
+    results, pending, stats = run_overflow("merge", submits[:3] + [("e", "council")])
+    assert pending == ["b", "c\ne"] and stats["merged"] == 1
+
+    results, pending, stats = run_overflow("block", submits)
+    assert results[-1] is False and stats["blocked"] == 1 # Gave up after block_timeout
+
+    results, pending, stats = run_overflow("block", [("a", "x"), ("b", "x"), ("b", "x")])
+    assert pending == ["b"] and stats["coalesced"] == 1
+    print("SUCCESS: Full queues drop, merge, block or coalesce as configured.")
+
+def test_shutdown_journals_pending_items():
+    print("\n--- Testing Durable Drain ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = os.path.join(tmp, "journal.jsonl")
+
+        async def first_run():
+            store = SlowStore(delay=0.5)
+            queue = IngestionQueue(store, workers=1, drain_timeout=0.05, journal_path=journal)
+            await queue.start()
+            for i in range(3):
+                await queue.submit(f"log {i}", source="council")
+            await asyncio.sleep(0.01)
+            await queue.stop()
+            return queue.get_stats()
+
+        stats = asyncio.run(first_run())
+        print(f"Shutdown stats: {stats}")
+        assert stats["journaled"] == 3 and os.path.exists(journal)
+
+        async def second_run():
+            store = SlowStore(delay=0)
+            queue = IngestionQueue(store, workers=1, journal_path=journal)
+            await queue.start()
+            await queue.join()
+            await queue.stop()
+            return store.stored, queue.get_stats()
+
+        stored, stats = asyncio.run(second_run())
+        assert sorted(stored) == ["log 0", "log 1", "log 2"]
+        assert stats["recovered"] == 3 and not os.path.exists(journal) and not os.path.exists(journal + ".replay")
+    print("SUCCESS: Pending memories survive a restart.")
+
+def test_crash_during_replay_keeps_journal():
+    print("\n--- Testing Crash While Replaying ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = os.path.join(tmp, "journal.jsonl")
+        with open(journal, "w") as f:
+            f.writelines(f'{{"text": "log {i}", "source": "chat"}}\n' for i in range(3))
+
+        async def crashed_run():
+            store = SlowStore(delay=0)
+            store.gate.clear() # Never gets to store anything
+            queue = IngestionQueue(store, workers=1, journal_path=journal)
+            await queue.start()
+            await asyncio.sleep(0.01)
+            for task in queue._tasks: # Killed without stop()
+                task.cancel()
+            await asyncio.gather(*queue._tasks, return_exceptions=True)
+
+        asyncio.run(crashed_run())
+        assert os.path.exists(journal + ".replay") # Still on disk
+
+        async def next_run():
+            store = SlowStore(delay=0)
+            queue = IngestionQueue(store, workers=1, journal_path=journal)
+            await queue.start()
+            await queue.join()
+            replay_left = os.path.exists(journal + ".replay")
+            await queue.stop()
+            return store.stored, replay_left
+
+        stored, replay_left = asyncio.run(next_run())
+        assert sorted(stored) == ["log 0", "log 1", "log 2"] and not replay_left
+    print("SUCCESS: The journal is only deleted once its items are stored.")
+
+def test_embedding_and_enrichment_overlap():
+    print("\n--- Testing Concurrent Embedding + Enrichment ---")
+    entry = MemoryEntry(timestamp="2025-01-01T10:00:00", scene="Work", statement="Coding", entities=[], user_state="Focused", outcome="Progress")
+
+    async def slow_embedding(text):
+        await asyncio.sleep(0.15)
+        return [0.1, 0.2]
+
+    async def slow_enrichment(text):
+        await asyncio.sleep(0.15)
+        return {"nodes": [], "edges": []}
+
+    add_node = AsyncMock()
+    with patch.object(memory.llm_provider, "extract_memory_dimensions", AsyncMock(return_value=entry)), \
+         patch.object(memory.llm_provider, "get_embedding", slow_embedding), \
+         patch.object(memory.graph_enricher, "enrich_memory", slow_enrichment), \
+         patch.object(memory.graph_service, "add_memory_node", add_node), \
+         patch.object(type(hippocampus), "collection", MagicMock()), \
+         patch.object(hippocampus, "text_index", MagicMock()):
+        start = time.monotonic()
+        ok = asyncio.run(hippocampus.add_memory("log", save_graph=False))
+        elapsed = time.monotonic() - start
+
+    print(f"Embedding + enrichment (150ms each): {elapsed * 1000:.0f}ms")
+    assert ok and elapsed < 0.28
+    assert add_node.call_args.kwargs == {"enrichment": {"nodes": [], "edges": []}, "save": False}
+    print("SUCCESS: Both LLM calls ran concurrently.")
+
+if __name__ == "__main__":
+    test_submit_does_not_wait_for_storage()
+    test_join_wakes_when_idle()
+    test_overflow_policies()
+    test_shutdown_journals_pending_items()
+    test_crash_during_replay_keeps_journal()
+    test_embedding_and_enrichment_overlap()
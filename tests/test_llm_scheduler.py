@@ -0,0 +1,77 @@
+import asyncio
+from backend.core.scheduler import LLMScheduler, Priority, llm_priority, current_priority
+
+def test_class_limits():
+    print("\n--- Testing Scheduler Class Limits ---")
+    scheduler = LLMScheduler(max_concurrency=4, class_limits={
+        Priority.INTERACTIVE: 4, Priority.COUNCIL: 2, Priority.INGESTION: 1, Priority.BACKGROUND: 1
+    })
+    peak = {"background": 0, "current": 0}
+
+    async def job():
+        async with scheduler.slot(Priority.BACKGROUND):
+            peak["current"] += 1
+            peak["background"] = max(peak["background"], peak["current"])
+            await asyncio.sleep(0.01)
+            peak["current"] -= 1
+
+    async def run():
+        await asyncio.gather(*[job() for _ in range(5)])
+
+    asyncio.run(run())
+    assert peak["background"] == 1
+    stats = scheduler.get_stats()["classes"]["background"]
+    print(f"Background stats: {stats}")
+    assert stats["admitted"] == 5 and stats["wait_max_ms"] > 0
+    print("SUCCESS: Background work capped at its limit.")
+
+def test_interactive_jumps_the_queue():
+    print("\n--- Testing Priority Admission ---")
+    scheduler = LLMScheduler(max_concurrency=1, class_limits={p: 1 for p in Priority})
+    order = []
+
+    async def job(name, priority):
+        async with scheduler.slot(priority):
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    async def run():
+        first = asyncio.ensure_future(job("consolidation-1", Priority.BACKGROUND))
+        await asyncio.sleep(0) # Occupies the only slot
+        queued = [
+            asyncio.ensure_future(job("consolidation-2", Priority.BACKGROUND)),
+            asyncio.ensure_future(job("ingest", Priority.INGESTION)),
+            asyncio.ensure_future(job("chat", Priority.INTERACTIVE)),
+        ]
+        await asyncio.gather(first, *queued)
+
+    asyncio.run(run())
+    print(f"Order: {order}")
+    assert order == ["consolidation-1", "chat", "ingest", "consolidation-2"]
+    print("SUCCESS: Chat admitted ahead of queued background work.")
+
+def test_priority_context():
+    print("\n--- Testing Priority Context ---")
+    assert current_priority.get() == Priority.COUNCIL
+    with llm_priority(Priority.INTERACTIVE):
+        assert current_priority.get() == Priority.INTERACTIVE
+    assert current_priority.get() == Priority.COUNCIL
+
+    scheduler = LLMScheduler(max_concurrency=1, class_limits={p: 1 for p in Priority})
+
+    async def run():
+        async with scheduler.slot(Priority.COUNCIL):
+            waiter = asyncio.ensure_future(scheduler.slot(Priority.COUNCIL).__aenter__())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            await asyncio.sleep(0)
+        return scheduler.get_stats()
+
+    stats = asyncio.run(run())
+    assert stats["running"] == 0 and stats["classes"]["council"]["queued"] == 0
+    print("SUCCESS: Context and cancellation verified.")
+
+if __name__ == "__main__":
+    test_class_limits()
+    test_interactive_jumps_the_queue()
+    test_priority_context()
@@ -0,0 +1,139 @@
+import os
+import json
+import time
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pydantic import BaseModel
+from backend.core.llm import LocalProvider, close_http_client
+
+class Echo(BaseModel):
+    server: str
+
+def start_stub(model: str, delay: float = 0.0, fail: bool = False, reject: bool = False):
+    """Minimal OpenAI-compatible server: /models and /chat/completions."""
+    hits = {"chat": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if fail:
+                return self._send(500, {"error": "down"})
+            self._send(200, {"object": "list", "data": [{"id": model, "object": "model", "created": 0, "owned_by": "stub"}]})
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if fail:
+                return self._send(500, {"error": "down"})
+            hits["chat"] += 1
+            if reject:
+                return self._send(400, {"error": {"message": "tools are not supported", "type": "invalid_request_error"}})
+            time.sleep(delay)
+            self._send(200, {
+                "id": "x", "object": "chat.completion", "created": 0, "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": json.dumps({"server": model})}}],
+            })
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1", hits
+
+def make_provider(urls):
+    os.environ["LOCAL_LLM_URL"] = ",".join(urls)
+    os.environ["LOCAL_LLM_EJECT_AFTER"] = "1"
+    try:
+        return LocalProvider()
+    finally:
+        del os.environ["LOCAL_LLM_URL"]
+        del os.environ["LOCAL_LLM_EJECT_AFTER"]
+
+def test_spreads_load_and_detects_models():
+    print("\n--- Testing Local Endpoint Load Balancing ---")
+    a, url_a, hits_a = start_stub("model-a", delay=0.05)
+    b, url_b, hits_b = start_stub("model-b", delay=0.05)
+    try:
+        provider = make_provider([url_a, url_b])
+
+        async def run():
+            results = await asyncio.gather(*[provider._generate_structured(f"task {i}", Echo) for i in range(8)])
+            await provider.aclose()
+            await close_http_client()
+            return results
+
+        results = asyncio.run(run())
+        print(f"Hits: a={hits_a['chat']} b={hits_b['chat']}")
+        assert hits_a["chat"] > 0 and hits_b["chat"] > 0
+        assert {r.server for r in results} == {"model-a", "model-b"}
+        assert [ep.model_name for ep in provider.pool.endpoints] == ["model-a", "model-b"]
+        # Either endpoint may serve a call: cached responses are keyed by both models
+        assert provider.model_name == "model-a" and provider.cache_model == "model-a+model-b"
+        print("SUCCESS: Load spread across endpoints, each with its own model.")
+    finally:
+        a.shutdown()
+        b.shutdown()
+
+def test_ejects_failing_endpoint():
+    print("\n--- Testing Endpoint Ejection & Failover ---")
+    good, url_good, hits_good = start_stub("model-good")
+    bad, url_bad, _ = start_stub("model-bad", fail=True)
+    try:
+        provider = make_provider([url_bad, url_good])
+
+        async def run():
+            results = [await provider._generate_structured("task", Echo) for _ in range(4)]
+            stats = provider.pool.get_stats()
+            await provider.aclose()
+            await close_http_client()
+            return results, stats
+
+        results, stats = asyncio.run(run())
+        print(f"Stats: {stats}")
+        assert all(r.server == "model-good" for r in results)
+        assert stats["endpoints"][0]["healthy"] is False
+        assert hits_good["chat"] == 4
+        print("SUCCESS: Failing endpoint ejected, traffic served by the healthy one.")
+    finally:
+        good.shutdown()
+        bad.shutdown()
+
+def test_bad_requests_do_not_eject():
+    print("\n--- Testing 4xx Responses Keep The Endpoint ---")
+    from openai import BadRequestError
+    server, url, hits = start_stub("model-a", reject=True)
+    try:
+        provider = make_provider([url]) # Ejects after one failure
+
+        async def run():
+            rejected = 0
+            for _ in range(3):
+                try:
+                    await provider._chat_completion(messages=[{"role": "user", "content": "hi"}])
+                except BadRequestError:
+                    rejected += 1
+            stats = provider.pool.get_stats()
+            await provider.aclose()
+            await close_http_client()
+            return rejected, stats
+
+        rejected, stats = asyncio.run(run())
+        assert rejected == 3 and hits["chat"] == 3
+        assert stats["endpoints"][0]["healthy"] is True and stats["endpoints"][0]["errors"] == 0
+        print("SUCCESS: Bad requests are surfaced without ejecting a healthy endpoint.")
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    test_spreads_load_and_detects_models()
+    test_ejects_failing_endpoint()
+    test_bad_requests_do_not_eject()
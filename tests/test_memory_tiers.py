@@ -0,0 +1,101 @@
+import os
+import json
+import time
+import gzip
+import asyncio
+import tempfile
+from datetime import datetime
+from unittest.mock import patch
+from backend.core.cold_storage import ColdArchive
+from backend.core.tiers import HotTier
+from backend.core.memory import Hippocampus
+import backend.core.memory as memory
+from tests.helpers import entry, write
+
+def vector(text):
+    return [1.0, 0.0, 0.0] if "coffee" in text else [0.0, 1.0, 0.0]
+
+def store_with(tmp, entries, clock=time.time):
+    store = Hippocampus(path=os.path.join(tmp, "chroma"))
+    store.hot = HotTier(hours=6, clock=clock)
+    store.hot.loaded = True
+    write(store, entries, embed=lambda e: vector(e.statement))
+    return store
+
+async def embedding(text):
+    return vector(text)
+
+def recall(store, query, **kwargs):
+    with patch.object(memory.llm_provider, "get_embedding", embedding):
+        return [m.id for m in asyncio.run(store.recall(query, **kwargs))]
+
+def iso(ts):
+    return datetime.fromtimestamp(ts).isoformat()
+
+def test_hot_tier_tracks_recent_memories():
+    print("\n--- Testing Hot Tier ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        now = [time.time()]
+        store = store_with(tmp, [entry("recent", iso(now[0] - 600), "Second coffee of the afternoon"),
+                                 entry("old", "2025-03-01T10:00:00", "Coffee with the team")], clock=lambda: now[0])
+        assert len(store.hot) == 1 # Only the last 6 hours are held in RAM
+
+        assert recall(store, "coffee", k=1, tiers="hot") == ["recent"]
+        assert recall(store, "coffee", k=2) == ["recent", "old"]
+        assert store.tier_stats["hot"] == 2
+
+        now[0] += 7 * 3600 # Ages out
+        assert recall(store, "coffee", k=1, tiers="hot") == [] and len(store.hot) == 0
+
+        # Reloaded from the store on first recall in a new process
+        fresh = Hippocampus(path=store.path)
+        fresh.backfill_timestamps()
+        fresh._load_hot_tier()
+        assert len(fresh.hot) == 1
+        asyncio.run(fresh.delete_memory("recent"))
+        assert len(fresh.hot) == 0
+    print("SUCCESS: Recent memories served from RAM and evicted by age.")
+
+def test_cold_tier_search():
+    print("\n--- Testing Cold Tier Coarse Index ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = ColdArchive(tmp)
+        for day in range(1, 29):
+            statement = "Reported a migraine after screen time" if day == 14 else f"Coding session {day}"
+            archive.append([entry(f"a{day}", f"2024-03-{day:02d}T10:00:00", statement)])
+
+        read = []
+        original = gzip.decompress
+        with patch("backend.core.cold_storage.gzip.decompress", lambda data: read.append(len(data)) or original(data)):
+            hits = archive.search("migraines", k=3, max_blocks=4)
+        assert [h[0] for h in hits] == ["a14"] and hits[0][1] == 1.0
+        assert len(read) == 1 # Only the block listing the keyword was decompressed
+        assert archive.search("migraine", k=3, filters={"end_ts": datetime(2024, 3, 10).timestamp()}) == []
+
+        # Indexes written before blocks carried keywords are rebuilt on first search
+        with open(archive.index_path) as f:
+            blocks = [json.loads(line) for line in f]
+        with open(archive.index_path, "w") as f:
+            f.writelines(json.dumps({k: v for k, v in b.items() if k != "terms"}) + "\n" for b in blocks)
+        assert [h[0] for h in ColdArchive(tmp).search("migraine", k=1)] == ["a14"]
+    print("SUCCESS: Archive search decompresses only matching blocks.")
+
+def test_recall_fans_out_across_tiers():
+    print("\n--- Testing Unified Recall ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = store_with(tmp, [entry("warm", "2025-03-01T10:00:00", "Headache after a long meeting"),
+                                 entry("hot", iso(time.time() - 60), "Headache again this evening")])
+        store.cold_storage.append([entry("cold", "2024-01-05T10:00:00", "Headache and nausea in the morning")])
+
+        assert set(recall(store, "headache", k=3)) == {"hot", "warm", "cold"}
+        assert set(recall(store, "headache", k=3, tiers="warm")) == {"warm", "hot"} # Archived history needs the cold tier
+        assert store.tier_stats == {"hot": 1, "warm": 3, "cold": 1}
+        # Per-tier budget: one archived memory at most by default
+        store.cold_storage.append([entry("cold2", "2024-01-06T10:00:00", "Headache before lunch")])
+        assert len([i for i in recall(store, "headache", k=4) if i.startswith("cold")]) == 1
+    print("SUCCESS: Hot, warm and cold hits merged into one answer.")
+
+if __name__ == "__main__":
+    test_hot_tier_tracks_recent_memories()
+    test_cold_tier_search()
+    test_recall_fans_out_across_tiers()
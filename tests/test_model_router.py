@@ -0,0 +1,63 @@
+import asyncio
+from typing import Type
+from pydantic import BaseModel
+from backend.core.model_router import ModelRouter
+from backend.core.response_cache import ResponseCache
+from backend.core.llm import BaseLLMProvider
+from backend.agents.schemas import TriageResult
+import backend.core.llm
+
+ROUTER = ModelRouter(
+    routes={"triage": "fast", "synthesizer": "standard"},
+    tier_models={"tiered": {"fast": "tiny", "standard": "medium", "pro": "large"}}
+)
+
+class TieredProvider(BaseLLMProvider):
+    """Returns garbage from the 'tiny' model to exercise validation fallback."""
+    name = "tiered"
+    model_name = "medium"
+
+    def __init__(self):
+        self.models_called = []
+
+    async def _embed_batch(self, texts):
+        return [[] for _ in texts]
+
+    async def _generate_structured(self, prompt: str, schema_model: Type[BaseModel], context: str = "", model=None):
+        self.models_called.append(model)
+        if model == "tiny":
+            return schema_model.model_validate_json('{"needs_doctor": "maybe"}')
+        return TriageResult(needs_doctor=False, needs_coach=True, reasoning=f"from {model}")
+
+def test_routing_table():
+    print("\n--- Testing Model Routing Table ---")
+    assert ROUTER.resolve("tiered", "triage") == "tiny"
+    assert ROUTER.resolve("tiered", "synthesizer") == "medium"
+    assert ROUTER.candidates("tiered", "triage") == ["tiny", "medium", "large"]
+    assert ROUTER.candidates("tiered", "unknown-site") == ["medium", "large"]
+    # Unconfigured tiers collapse to the provider default
+    assert ModelRouter(tier_models={"local": {"fast": None, "standard": None, "pro": None}}).candidates("local", "triage") == [None]
+    print("SUCCESS: Routes resolved.")
+
+def test_validation_fallback():
+    print("\n--- Testing Validation Fallback ---")
+    original_router = backend.core.llm.model_router
+    original_cache = backend.core.llm.response_cache
+    backend.core.llm.model_router = ROUTER
+    backend.core.llm.response_cache = ResponseCache(enabled=False)
+    try:
+        provider = TieredProvider()
+        result = asyncio.run(provider.generate_structured("TRIAGE", TriageResult, call_site="triage"))
+        assert provider.models_called == ["tiny", "medium"]
+        assert result.reasoning == "from medium"
+        latency = ROUTER.get_stats()["latency"]["triage"]
+        print(f"Route stats: {latency}")
+        assert latency["tiny"]["fallback"] == 1 and latency["medium"]["ok"] == 1
+        print("SUCCESS: Escalated to the next tier after a schema failure.")
+    finally:
+        backend.core.llm.model_router = original_router
+        backend.core.llm.response_cache = original_cache
+
+if __name__ == "__main__":
+    test_routing_table()
+    test_validation_fallback()
@@ -0,0 +1,112 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch, AsyncMock
+from backend.core.llm import BaseLLMProvider, GeminiProvider
+from backend.core.prompt_cache import TokenUsage, GeminiContextCache, llm_call_site
+from backend.agents.schemas import TriageResult, RiskAssessment, CouncilActionPlan
+import backend.core.llm
+import backend.agents.council as council
+
+class CapturingProvider(BaseLLMProvider):
+    name = "capturing"
+
+    def __init__(self):
+        self.requests = []
+
+    async def _generate_structured(self, prompt, schema_model, context="", model=None):
+        self.requests.append((prompt, context))
+        if schema_model is TriageResult:
+            return TriageResult(needs_doctor=True, needs_coach=True, reasoning="ok")
+        if schema_model is RiskAssessment:
+            return RiskAssessment(risk_score=0.2, assessment="ok", identified_issues=[])
+        return CouncilActionPlan(summary="ok", risk_level="LOW", actions=[])
+
+    async def _embed_batch(self, texts):
+        return [[] for _ in texts]
+
+def test_council_prompts_share_a_stable_prefix():
+    print("\n--- Testing Stable Prompt Prefixes ---")
+    provider = CapturingProvider()
+
+    async def run(text):
+        state = {"input_data": text, "source": "file", "past_memories": []}
+        await council.triage_node(state)
+        await council.doctor_node(state)
+        await council.synthesizer_node({**state, "doctor_output": None, "coach_output": None})
+
+    with patch.object(council, "llm_provider", provider), \
+         patch.object(council.hippocampus, "recall", AsyncMock(return_value=[])):
+        asyncio.run(run("Marker-A: coding for 6 hours, headache"))
+        asyncio.run(run("Marker-B: watching a film, Duration: 30 minutes"))
+
+    first, second = provider.requests[:3], provider.requests[3:]
+    for (p1, c1), (p2, c2) in zip(first, second):
+        assert p1 == p2 # Identical leading prefix
+        assert c1 != c2
+        assert "Marker-A" not in p1 and "Marker-B" not in p2
+        assert "{input_data}" not in p1 and "{memory_context}" not in p1 # No unfilled template fields
+    print("SUCCESS: Per-call data lives in the context, after an identical prompt.")
+
+class FakeModels:
+    def __init__(self):
+        self.calls = []
+
+    async def generate_content(self, model, contents, config):
+        self.calls.append(config)
+        cached = 800 if config.cached_content else 0
+        return SimpleNamespace(
+            text='{"needs_doctor": false, "needs_coach": true, "reasoning": "x"}',
+            usage_metadata=SimpleNamespace(prompt_token_count=1000, cached_content_token_count=cached, candidates_token_count=20),
+        )
+
+class FakeCaches:
+    def __init__(self, fail=False):
+        self.created = 0
+        self.fail = fail
+
+    async def create(self, model, config):
+        if self.fail:
+            raise RuntimeError("Cached content is too small")
+        self.created += 1
+        return SimpleNamespace(name=f"cachedContents/{self.created}")
+
+def run_gemini(caches):
+    fake = SimpleNamespace(models=FakeModels(), caches=caches)
+    usage = TokenUsage()
+    cache = GeminiContextCache(enabled=True, min_tokens=1)
+    provider = GeminiProvider()
+
+    async def run():
+        for _ in range(3):
+            with llm_call_site("triage"):
+                await provider._generate_structured("Decide which experts are needed.", TriageResult, context="Input: tired")
+
+    with patch.object(GeminiProvider, "client", new=property(lambda self: fake)), \
+         patch.object(backend.core.llm, "token_usage", usage), \
+         patch.object(backend.core.llm, "gemini_context_cache", cache):
+        asyncio.run(run())
+    return fake.models.calls, usage.get_stats()["triage"], cache.get_stats()
+
+def test_gemini_explicit_context_cache():
+    print("\n--- Testing Gemini Context Cache ---")
+    caches = FakeCaches()
+    calls, usage, cache_stats = run_gemini(caches)
+    assert caches.created == 1
+    assert all(c.cached_content == "cachedContents/1" and c.system_instruction is None for c in calls)
+    assert cache_stats["reused"] == 2
+    print(f"Usage: {usage}")
+    assert usage["calls"] == 3 and usage["cached_ratio"] == 0.8
+    print("SUCCESS: Persona prefix cached once and reused; cached ratio reported.")
+
+def test_gemini_cache_refusal_falls_back_inline():
+    print("\n--- Testing Context Cache Fallback ---")
+    calls, usage, cache_stats = run_gemini(FakeCaches(fail=True))
+    assert all(c.cached_content is None and c.system_instruction.startswith("Task:") for c in calls)
+    assert cache_stats["errors"] == 1 # Not retried on every call
+    assert usage["cached_ratio"] == 0.0
+    print("SUCCESS: Refused prefixes are sent inline and not retried.")
+
+if __name__ == "__main__":
+    test_council_prompts_share_a_stable_prefix()
+    test_gemini_explicit_context_cache()
+    test_gemini_cache_refusal_falls_back_inline()
@@ -0,0 +1,101 @@
+import os
+import asyncio
+import tempfile
+import threading
+from unittest.mock import AsyncMock, patch
+from backend.core.memory import Hippocampus
+import backend.core.memory as memory
+from tests.helpers import entry, write
+
+class Probe:
+    def __init__(self, store):
+        self.store = store
+        self.embeddings = AsyncMock(return_value=[1.0, 0.0, 0.0])
+
+    def recall(self, query, **kwargs):
+        with patch.object(memory.llm_provider, "get_embedding", self.embeddings):
+            return [m.id for m in asyncio.run(self.store.recall(query, **kwargs))]
+
+def test_repeat_recall_served_from_cache():
+    print("\n--- Testing Recall Cache Hits ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = Hippocampus(path=os.path.join(tmp, "chroma"))
+        write(store, [entry("m1", "2025-03-01T10:00:00", "Headache after the long meeting"),
+                      entry("m2", "2025-03-02T10:00:00", "Slept badly, woke up with a headache")])
+        probe = Probe(store)
+        question = "why do I keep getting a headache in the morning"
+
+        first = probe.recall(question, k=2)
+        with patch.object(store.collection, "query", side_effect=AssertionError("ANN search on a cache hit")):
+            assert probe.recall(f"  {question} ", k=2) == first # Same query modulo whitespace
+        assert probe.embeddings.await_count == 1
+        assert store.recall_cache.get_stats()["hits"] == 1
+
+        # k, filters and mode are part of the key
+        probe.recall(question, k=1)
+        probe.recall(question, k=2, scene="Work")
+        assert probe.embeddings.await_count == 3
+
+        # Editing a returned memory never leaks into the cache
+        asyncio.run(store.recall(question, k=2))[0].statement = "edited"
+        assert "edited" not in [m.statement for m in asyncio.run(store.recall(question, k=2))]
+    print("SUCCESS: Repeat recalls skip the embedding call and vector search.")
+
+def test_generation_invalidates():
+    print("\n--- Testing Store Generation ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = Hippocampus(path=os.path.join(tmp, "chroma"))
+        write(store, [entry("m1", "2025-03-01T10:00:00", "Headache after the long meeting")])
+        probe = Probe(store)
+        assert probe.recall("headache", k=3) == ["m1"]
+
+        write(store, [entry("m2", "2025-03-02T10:00:00", "Another headache")])
+        assert set(probe.recall("headache", k=3)) == {"m1", "m2"}
+
+        asyncio.run(store.delete_memory("m2"))
+        assert probe.recall("headache", k=3) == ["m1"]
+
+        write(store, [entry("m3", "2025-03-05T10:00:00", "Headache again")])
+        probe.recall("headache", k=3)
+        asyncio.run(store.delete_range("2025-03-04T00:00:00", "2025-03-06T00:00:00"))
+        assert probe.recall("headache", k=3) == ["m1"]
+
+        generation = store.generation
+        with patch.object(memory.Consolidator, "run", AsyncMock(return_value={"episodes": 1})):
+            asyncio.run(store.consolidate_memories())
+        assert store.generation == generation + 1
+
+        asyncio.run(store.clear_all())
+        assert probe.recall("headache", k=3) == []
+        assert store.recall_cache.get_stats()["stale"] == 5
+    print("SUCCESS: Every write, delete, clear and consolidation invalidates cached recalls.")
+
+def test_recall_overlapping_a_write():
+    print("\n--- Testing Recall During A Write ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = Hippocampus(path=os.path.join(tmp, "chroma"))
+        write(store, [entry("m1", "2025-03-01T10:00:00", "Headache after the long meeting")])
+        probe = Probe(store)
+        started, release = threading.Event(), threading.Event()
+        upsert = store.collection.upsert
+
+        def slow_upsert(**kwargs):
+            started.set()
+            release.wait(5)
+            upsert(**kwargs)
+
+        with patch.object(store.collection, "upsert", side_effect=slow_upsert):
+            writer = threading.Thread(target=write, args=(store, [entry("m2", "2025-03-02T10:00:00", "Another headache")]))
+            writer.start()
+            assert started.wait(5)
+            assert probe.recall("headache", k=3) == ["m1"] # Searched the store before the write landed
+            release.set()
+            writer.join()
+        assert set(probe.recall("headache", k=3)) == {"m1", "m2"}
+        assert store.recall_cache.get_stats()["hits"] == 0
+    print("SUCCESS: A recall overlapping a write is never served from the cache afterwards.")
+
+if __name__ == "__main__":
+    test_repeat_recall_served_from_cache()
+    test_generation_invalidates()
+    test_recall_overlapping_a_write()
@@ -0,0 +1,130 @@
+import os
+import time
+import asyncio
+import tempfile
+from pydantic import BaseModel
+from langchain_core.messages import HumanMessage, SystemMessage
+from backend.core.llm import BaseLLMProvider
+from backend.core.embedding_cache import EmbeddingCache
+from backend.core.replay import ReplayProvider, LatencyModel, CassetteMiss
+import backend.core.llm
+
+class Verdict(BaseModel):
+    risk: str
+    score: int
+
+class FakeUpstream(BaseLLMProvider):
+    """Stands in for Gemini while recording."""
+    name = "gemini"
+    embedding_model = "fake-embed"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def _generate_structured(self, prompt, schema_model, context="", model=None):
+        self.calls += 1
+        await asyncio.sleep(0.02)
+        return schema_model(risk="HIGH" if "coding" in prompt else "LOW", score=len(prompt))
+
+    async def _generate_chat(self, messages, model=None):
+        self.calls += 1
+        return f"You said: {messages[-1].content}. Take a short break and drink some water."
+
+    async def _embed_batch(self, texts):
+        self.calls += 1
+        return [[float(len(t)), 0.25, -0.5] for t in texts]
+
+CHAT = [SystemMessage(content="Be kind."), HumanMessage(content="I feel tired")]
+
+async def record(path):
+    recorder = ReplayProvider(mode="record", cassette_path=path, inner=FakeUpstream())
+    verdict = await recorder.generate_structured("6h of coding", Verdict)
+    reply = await recorder.generate_chat(CHAT)
+    vector = await recorder.get_embedding("Work: coding")
+    return recorder, verdict, reply, vector
+
+async def replay(path, **kwargs):
+    player = ReplayProvider(mode="replay", cassette_path=path, latency=LatencyModel("none"), **kwargs)
+    verdict = await player.generate_structured("6h of coding", Verdict)
+    reply = await player.generate_chat(CHAT)
+    chunks = [c async for c in player.generate_chat_stream(CHAT)]
+    vector = await player.get_embedding("Work: coding")
+    return player, verdict, reply, chunks, vector
+
+def with_fresh_embedding_cache(fn):
+    original = backend.core.llm.embedding_cache
+    backend.core.llm.embedding_cache = EmbeddingCache(persist=False)
+    try:
+        return fn()
+    finally:
+        backend.core.llm.embedding_cache = original
+
+def test_record_then_replay():
+    print("\n--- Testing Record/Replay Round Trip ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cassette.jsonl.gz")
+        recorder, verdict, reply, vector = with_fresh_embedding_cache(lambda: asyncio.run(record(path)))
+        assert recorder.inner.calls == 3
+        print(f"Cassette size: {os.path.getsize(path)} bytes")
+
+        player, r_verdict, r_reply, chunks, r_vector = with_fresh_embedding_cache(lambda: asyncio.run(replay(path)))
+        assert r_verdict == verdict
+        assert r_reply == reply
+        assert "".join(chunks) == reply and len(chunks) > 1
+        assert r_vector == vector # Exactly representable in float16
+        assert player.embedding_model == "fake-embed"
+        print(f"Replay stats: {player.get_stats()['replay']}")
+    print("SUCCESS: Structured, chat, stream and embedding calls replayed.")
+
+def test_unseen_inputs_are_deterministic():
+    print("\n--- Testing Replay Stand-ins ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cassette.jsonl.gz")
+        with_fresh_embedding_cache(lambda: asyncio.run(record(path)))
+
+        async def unseen(player):
+            verdict = await player._generate_structured("a prompt never recorded", Verdict)
+            vector = await player._embed_batch(["never embedded"])
+            return verdict, vector
+
+        first = asyncio.run(unseen(ReplayProvider(mode="replay", cassette_path=path, latency=LatencyModel("none"))))
+        second = asyncio.run(unseen(ReplayProvider(mode="replay", cassette_path=path, latency=LatencyModel("none"))))
+        assert first == second
+        assert len(first[1][0]) == 3 # Synthetic vectors match the recorded dimension
+
+        strict = ReplayProvider(mode="replay", cassette_path=path, latency=LatencyModel("none"), strict=True)
+        try:
+            asyncio.run(strict._generate_structured("a prompt never recorded", Verdict))
+            assert False, "strict replay should miss"
+        except CassetteMiss:
+            pass
+    print("SUCCESS: Unseen inputs replay deterministically; strict mode misses.")
+
+def test_latency_model():
+    print("\n--- Testing Synthetic Latency ---")
+    model = LatencyModel("chat=fixed:50;embedding=none;*=recorded")
+    assert model.sample("chat", 3.0) == 0.05
+    assert model.sample("embedding", 3.0) == 0.0
+    assert model.sample("structured", 1.5) == 1.5
+
+    a = LatencyModel("lognormal:600,0.5", seed=7)
+    b = LatencyModel("lognormal:600,0.5", seed=7)
+    samples = [a.sample("chat", None) for _ in range(200)]
+    assert samples == [b.sample("chat", None) for _ in range(200)]
+    median = sorted(samples)[100]
+    print(f"lognormal median: {median * 1000:.0f} ms")
+    assert 0.4 < median < 0.8
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cassette.jsonl.gz")
+        with_fresh_embedding_cache(lambda: asyncio.run(record(path)))
+        player = ReplayProvider(mode="replay", cassette_path=path, latency=LatencyModel("structured=fixed:100"))
+        start = time.monotonic()
+        asyncio.run(player._generate_structured("6h of coding", Verdict))
+        assert time.monotonic() - start >= 0.09
+    print("SUCCESS: Latency distributions are configurable and reproducible.")
+
+if __name__ == "__main__":
+    test_record_then_replay()
+    test_unseen_inputs_are_deterministic()
+    test_latency_model()
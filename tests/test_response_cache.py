@@ -0,0 +1,83 @@
+import asyncio
+import time
+from typing import Type
+from backend.core.response_cache import ResponseCache, schema_fingerprint
+from backend.core.llm import BaseLLMProvider
+from backend.agents.schemas import TriageResult, CouncilActionPlan
+import backend.core.llm
+
+class StructuredProvider(BaseLLMProvider):
+    name = "structured"
+    model_name = "test-model"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def _embed_batch(self, texts):
+        return [[] for _ in texts]
+
+    async def _generate_structured(self, prompt: str, schema_model: Type, context: str = "", model=None):
+        self.calls += 1
+        if schema_model is TriageResult:
+            return TriageResult(needs_doctor=True, needs_coach=False, reasoning=f"call {self.calls}")
+        return CouncilActionPlan(summary="ok", risk_level="LOW", actions=["Stretch"])
+
+def test_opt_in_policy():
+    print("\n--- Testing Response Cache Policy ---")
+    original = backend.core.llm.response_cache
+    backend.core.llm.response_cache = ResponseCache(policies={"triage": 60})
+    try:
+        provider = StructuredProvider()
+
+        async def run():
+            a = await provider.generate_structured("TRIAGE", TriageResult, context="Input: x", call_site="triage")
+            b = await provider.generate_structured("TRIAGE", TriageResult, context="Input: x", call_site="triage")
+            c = await provider.generate_structured("TRIAGE", TriageResult, context="Input: y", call_site="triage")
+            d = await provider.generate_structured("TRIAGE", TriageResult, context="Input: x", call_site="chat")
+            return a, b, c, d
+
+        a, b, c, d = asyncio.run(run())
+        assert a.reasoning == b.reasoning == "call 1"
+        assert c.reasoning == "call 2"
+        assert d.reasoning == "call 3" # No policy -> bypass
+        assert provider.calls == 3
+        print(f"Stats: {backend.core.llm.response_cache.get_stats()}")
+        print("SUCCESS: Only opted-in call sites are cached.")
+    finally:
+        backend.core.llm.response_cache = original
+
+def test_assessments_not_cached_by_default():
+    print("\n--- Testing Default Cache Policies ---")
+    cache = ResponseCache()
+    assert [cache.ttl_for(site) for site in ("triage", "maestro", "memory_extraction")] == [900, 900, 3600]
+    assert [cache.ttl_for(site) for site in ("doctor", "coach", "synthesizer", "chat")] == [None] * 4
+    print("SUCCESS: Only deterministic call sites are cached by default.")
+
+def test_cached_results_are_isolated():
+    print("\n--- Testing Cached Result Isolation ---")
+    cache = ResponseCache(policies={"synthesizer": 60})
+    key = cache.make_key("m", "p", "", CouncilActionPlan)
+    cache.put(key, CouncilActionPlan(summary="ok", risk_level="LOW", actions=[]), ttl=60)
+    first = cache.get(key)
+    first.graph_highlights.append("mem_1")
+    assert cache.get(key).graph_highlights == []
+    print("SUCCESS: Mutating a hit does not corrupt the cache.")
+
+def test_ttl_and_size_bound():
+    print("\n--- Testing TTL & Eviction ---")
+    cache = ResponseCache(max_entries=2)
+    plan = CouncilActionPlan(summary="ok", risk_level="LOW", actions=[])
+    cache.put("expired", plan, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("expired") is None
+    for k in ["a", "b", "c"]:
+        cache.put(k, plan, ttl=60)
+    assert cache.get("a") is None and cache.get("c") is not None
+    assert schema_fingerprint(TriageResult) != schema_fingerprint(CouncilActionPlan)
+    print("SUCCESS: TTL expiry and LRU eviction verified.")
+
+if __name__ == "__main__":
+    test_opt_in_policy()
+    test_assessments_not_cached_by_default()
+    test_cached_results_are_isolated()
+    test_ttl_and_size_bound()
@@ -0,0 +1,117 @@
+import asyncio
+from unittest.mock import patch
+from langchain_core.messages import HumanMessage, AIMessage
+from backend.core.llm import BaseLLMProvider
+from backend.core.session_store import SessionStore
+from backend.core.tool_calling import ToolTurn
+import backend.agents.liaison as liaison
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+async def fake_summarize(summary, messages):
+    await asyncio.sleep(0)
+    facts = [m.content for m in messages if m.type == "human"]
+    return (summary + " " if summary else "") + f"User said {len(facts)} things, last: {facts[-1]}."
+
+def test_history_bounded_by_rolling_summary():
+    print("\n--- Testing Rolling Summarization ---")
+    store = SessionStore(max_tokens=200, keep_messages=4)
+
+    async def chat(turns):
+        session = store.get(store.key_for("sid-1"))
+        sizes = []
+        for i in range(turns):
+            session.record_turn(HumanMessage(content=f"Message {i}: " + "I worked late again " * 5),
+                                AIMessage(content="Noted, try to rest. " * 5))
+            store.schedule_compaction(session, fake_summarize)
+            await store.wait_compactions()
+            sizes.append(session.history_tokens())
+        return session, sizes
+
+    session, sizes = asyncio.run(chat(40))
+    print(f"History tokens: {sizes[:6]} ... {sizes[-3:]}")
+    assert max(sizes) <= 200 + 120 # One turn over the budget before it is folded
+    assert session.summary and "Message 3" in session.summary
+    assert session.messages[-2].content.startswith("Message 39") # Newest turns stay verbatim
+    assert store.get_stats()["compactions"] >= 5
+    print("SUCCESS: Prompt history stays bounded as the chat grows.")
+
+def test_failed_summaries_still_bounded():
+    print("\n--- Testing Summarizer Failure ---")
+    store = SessionStore(max_tokens=100, keep_messages=2)
+
+    async def broken(summary, messages):
+        raise RuntimeError("LLM down")
+
+    async def chat():
+        session = store.get("sid:x")
+        for i in range(30):
+            session.record_turn(HumanMessage(content="hello " * 20), AIMessage(content="hi " * 20))
+            store.schedule_compaction(session, broken)
+            await store.wait_compactions()
+        return session
+
+    session = asyncio.run(chat())
+    assert session.history_tokens() <= 2 * 100
+    assert store.get_stats()["dropped_messages"] > 0
+    print("SUCCESS: Oldest turns dropped when summaries fail.")
+
+def test_lru_and_ttl_eviction():
+    print("\n--- Testing Session Eviction ---")
+    clock = Clock()
+    store = SessionStore(max_sessions=2, ttl=60, clock=clock)
+    store.get("sid:a")
+    clock.now = 10
+    store.get("sid:b")
+    clock.now = 20
+    store.get("sid:a") # a is now the most recent
+    store.get("sid:c") # evicts b (LRU)
+    assert set(store._sessions) == {"sid:a", "sid:c"}
+    clock.now = 100
+    store.get("user:42") # a and c idle > 60s
+    assert set(store._sessions) == {"user:42"}
+    stats = store.get_stats()
+    print(f"Stats: {stats}")
+    assert stats["evicted"] == 1 and stats["expired"] == 2
+    assert store.key_for("sid-9", "42") == "user:42"
+    print("SUCCESS: Idle and least-recently-used sessions evicted.")
+
+class CapturingProvider(BaseLLMProvider):
+    name = "capturing"
+
+    def __init__(self):
+        self.messages = None
+
+    async def _generate_tool_turn(self, messages, tools, model=None, on_token=None):
+        self.messages = messages
+        return ToolTurn(text="Sure.")
+
+    async def _generate_structured(self, prompt, schema_model, context="", model=None):
+        raise NotImplementedError
+
+    async def _embed_batch(self, texts):
+        return [[] for _ in texts]
+
+def test_liaison_sees_session_history():
+    print("\n--- Testing Liaison Session Context ---")
+    provider = CapturingProvider()
+    history = [HumanMessage(content="My name is Sam."), AIMessage(content="Hi Sam!")]
+    inputs = {"messages": history + [HumanMessage(content="What's my name?")], "user_profile": "",
+              "summary": "The user mentioned back pain earlier."}
+    with patch.object(liaison, "llm_provider", provider):
+        asyncio.run(liaison.liaison_agent.ainvoke(inputs))
+    system, *turns = provider.messages
+    assert "back pain" in system.content
+    assert [m.content for m in turns] == ["My name is Sam.", "Hi Sam!", "What's my name?"]
+    print("SUCCESS: Recent turns and the summary reach the model.")
+
+if __name__ == "__main__":
+    test_history_bounded_by_rolling_summary()
+    test_failed_summaries_still_bounded()
+    test_lru_and_ttl_eviction()
+    test_liaison_sees_session_history()
@@ -0,0 +1,75 @@
+import asyncio
+from backend.core.llm import SingleFlight
+
+def test_concurrent_callers_share_one_call():
+    print("\n--- Testing Single-Flight Coalescing ---")
+    flight = SingleFlight()
+    calls = []
+
+    async def upstream():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"risk": "LOW"}
+
+    async def run():
+        return await asyncio.gather(*[flight.do("triage", upstream) for _ in range(5)])
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(r == {"risk": "LOW"} for r in results)
+    results[1]["risk"] = "HIGH"
+    assert results[0]["risk"] == "LOW" # Followers receive copies
+    assert flight.get_stats()["coalesced"] == 4
+    print("SUCCESS: 5 callers, 1 upstream call.")
+
+def test_errors_reach_every_caller():
+    print("\n--- Testing Single-Flight Error Propagation ---")
+    flight = SingleFlight()
+
+    async def upstream():
+        await asyncio.sleep(0.01)
+        raise ValueError("quota exceeded")
+
+    async def run():
+        return await asyncio.gather(*[flight.do("k", upstream) for _ in range(3)], return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert flight.get_stats()["in_flight"] == 0
+    print("SUCCESS: Errors propagated and flight cleared.")
+
+def test_cancellation():
+    print("\n--- Testing Single-Flight Cancellation ---")
+    flight = SingleFlight()
+    started = []
+
+    async def upstream():
+        started.append(1)
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def run():
+        # One waiter leaving must not cancel the call for the others
+        first = asyncio.ensure_future(flight.do("k", upstream))
+        second = asyncio.ensure_future(flight.do("k", upstream))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        assert await second == "done"
+        assert first.cancelled()
+
+        # When every waiter leaves, the upstream call is cancelled
+        lone = asyncio.ensure_future(flight.do("k2", upstream))
+        await asyncio.sleep(0.01)
+        lone.cancel()
+        await asyncio.sleep(0.01)
+        return flight.get_stats()
+
+    stats = asyncio.run(run())
+    assert stats["in_flight"] == 0
+    assert len(started) == 2
+    print("SUCCESS: Cancellation semantics verified.")
+
+if __name__ == "__main__":
+    test_concurrent_callers_share_one_call()
+    test_errors_reach_every_caller()
+    test_cancellation()
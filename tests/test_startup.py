@@ -0,0 +1,51 @@
+import sys
+import json
+import asyncio
+import subprocess
+from backend.core.startup import StartupProfiler
+
+HEAVY_MODULES = ["chromadb", "google.genai", "openai", "pyautogui", "langgraph", "screen_brightness_control"]
+
+def test_main_import_is_lazy():
+    print("\n--- Testing Lazy Imports ---")
+    code = (
+        "import sys, json; import backend.main; "
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    loaded = json.loads(out.stdout.strip().splitlines()[-1])
+    print(f"Heavy modules loaded at import: {loaded}")
+    assert loaded == []
+    print("SUCCESS: backend.main imports without heavy SDKs.")
+
+def test_profiler_background():
+    print("\n--- Testing Startup Profiler ---")
+    profiler = StartupProfiler()
+
+    async def slow():
+        await asyncio.sleep(0.05)
+
+    async def broken():
+        raise RuntimeError("no vector store")
+
+    async def run():
+        with profiler.measure("init:fast"):
+            profiler.background("warmup:slow", slow)
+            profiler.background("warmup:broken", broken)
+        profiler.mark_ready()
+        # Readiness doesn't wait for warmups
+        assert "warmup:slow" in profiler.get_stats()["pending"]
+        await profiler.wait_background()
+
+    asyncio.run(run())
+    stats = profiler.get_stats()
+    print(f"Stats: {stats}")
+    assert stats["blocking"]["init:fast"] < 50
+    assert stats["background"]["warmup:slow"] >= 40
+    assert stats["failures"] == {"warmup:broken": "no vector store"}
+    assert stats["pending"] == []
+    print("SUCCESS: Warmups run in the background and are reported.")
+
+if __name__ == "__main__":
+    test_main_import_is_lazy()
+    test_profiler_background()
@@ -0,0 +1,140 @@
+import time
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+from langchain_core.tools import tool
+from langchain_core.messages import HumanMessage, SystemMessage
+from backend.core.llm import BaseLLMProvider, LocalProvider, GeminiProvider
+from backend.core.tool_calling import ToolCall, ToolTurn, ToolMetrics, execute_tool_calls
+import backend.agents.liaison as liaison
+
+@tool
+async def slow_graph(question: str):
+    """Slow graph query."""
+    await asyncio.sleep(0.2)
+    return f"graph: {question}"
+
+@tool
+async def slow_profile(category: str):
+    """Slow profile lookup."""
+    await asyncio.sleep(0.2)
+    return f"profile: {category}"
+
+class NativeProvider(BaseLLMProvider):
+    """Asks for two tools in one turn, then answers."""
+    name = "native"
+
+    def __init__(self):
+        self.seen = []
+
+    async def _generate_tool_turn(self, messages, tools, model=None, on_token=None):
+        self.seen.append(messages)
+        if messages[-1].type != "tool":
+            return ToolTurn(tool_calls=[ToolCall("slow_graph", {"question": "last hour?"}), ToolCall("slow_profile", {"category": "habits"})])
+        return ToolTurn(text="You coded for an hour.")
+
+    async def _generate_structured(self, prompt, schema_model, context="", model=None):
+        raise NotImplementedError
+
+    async def _embed_batch(self, texts):
+        return [[] for _ in texts]
+
+def test_parallel_tool_calls_in_one_turn():
+    print("\n--- Testing Parallel Native Tool Calls ---")
+    provider = NativeProvider()
+    metrics = ToolMetrics()
+    registry = {"slow_graph": slow_graph, "slow_profile": slow_profile}
+    inputs = {"messages": [HumanMessage(content="What did I do, given my habits?")], "user_profile": ""}
+
+    with patch.object(liaison, "llm_provider", provider), patch.object(liaison, "TOOL_REGISTRY", registry), \
+         patch.object(liaison, "tool_metrics", metrics), patch("backend.core.tool_calling.tool_metrics", metrics):
+        start = time.monotonic()
+        result = asyncio.run(liaison.liaison_agent.ainvoke(inputs))
+        elapsed = time.monotonic() - start
+
+    print(f"Two 200ms tools took {elapsed * 1000:.0f}ms")
+    assert result["messages"][-1].content == "You coded for an hour."
+    assert elapsed < 0.35 # Concurrent, not 400ms
+    assert len(provider.seen) == 2 # One tool turn + the answer
+    results = [m for m in provider.seen[1] if m.type == "tool"]
+    assert [m.content for m in results] == ["graph: last hour?", "profile: habits"]
+
+    stats = metrics.get_stats()
+    print(f"Stats: {stats}")
+    assert stats["runs"] == 1 and stats["turns_histogram"] == {2: 1}
+    assert stats["parallel_turns"] == 1
+    assert set(stats["tools"]) == {"slow_graph", "slow_profile"}
+    assert stats["tools"]["slow_graph"]["avg_ms"] >= 150
+    print("SUCCESS: Independent tools ran concurrently in one round trip.")
+
+def test_tool_errors_are_returned_to_the_model():
+    print("\n--- Testing Tool Errors ---")
+    metrics = ToolMetrics()
+    with patch("backend.core.tool_calling.tool_metrics", metrics):
+        results = asyncio.run(execute_tool_calls([ToolCall("missing", {}), ToolCall("slow_profile", {})], {"slow_profile": slow_profile}))
+    assert "not found" in results[0].content
+    assert "Error" in results[1].content # Missing argument
+    assert metrics.get_stats()["tools"]["missing"]["errors"] == 1
+    print("SUCCESS: Failures come back as tool results.")
+
+def test_local_native_calls_streamed():
+    print("\n--- Testing Local (OpenAI-style) Tool Calls ---")
+
+    def chunk(content=None, calls=None):
+        return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content, tool_calls=calls))])
+
+    def fragment(index, id=None, name=None, arguments=None):
+        return SimpleNamespace(index=index, id=id, function=SimpleNamespace(name=name, arguments=arguments))
+
+    async def stream():
+        for c in [chunk("Checking"), chunk(calls=[fragment(0, "a", "query_graph", '{"ques')]),
+                  chunk(calls=[fragment(0, arguments='tion": "x"}'), fragment(1, "b", "fetch_profile_context", '{"category": "traits"}')])]:
+            yield c
+
+    async def fake_completion(model=None, **kwargs):
+        assert "query_graph" in [t["function"]["name"] for t in kwargs["tools"]]
+        return stream()
+
+    provider = LocalProvider()
+    tokens = []
+
+    async def on_token(delta):
+        tokens.append(delta)
+
+    with patch.object(provider, "_chat_completion", fake_completion):
+        turn = asyncio.run(provider._generate_tool_turn([HumanMessage(content="hi")], liaison.TOOL_SCHEMAS, on_token=on_token))
+    assert tokens == ["Checking"] and turn.streamed
+    assert [(c.id, c.name, c.args) for c in turn.tool_calls] == [("a", "query_graph", {"question": "x"}), ("b", "fetch_profile_context", {"category": "traits"})]
+
+    # The tool round trip is sent back in OpenAI format
+    results = asyncio.run(execute_tool_calls(turn.tool_calls[1:], liaison.TOOL_REGISTRY))
+    formatted = provider._format_messages([turn.to_message(), *results])
+    assert formatted[0]["tool_calls"][1]["function"]["name"] == "fetch_profile_context"
+    assert formatted[1]["role"] == "tool" and formatted[1]["tool_call_id"] == "b"
+    print("SUCCESS: Streamed tool call fragments assembled.")
+
+def test_gemini_parallel_results_share_a_turn():
+    print("\n--- Testing Gemini Function Responses ---")
+    turn = ToolTurn(tool_calls=[ToolCall("query_graph", {"question": "x"}, id="a"), ToolCall("fetch_profile_context", {"category": "habits"}, id="b")])
+    results = asyncio.run(execute_tool_calls(turn.tool_calls[1:] * 2, liaison.TOOL_REGISTRY))
+    contents, system = GeminiProvider()._chat_request([SystemMessage(content="persona"), HumanMessage(content="hi"), turn.to_message(), *results])
+    assert system == "persona"
+    assert [c.role for c in contents] == ["user", "model", "user"]
+    assert len(contents[1].parts) == 2 and contents[1].parts[0].function_call.name == "query_graph"
+    assert len(contents[2].parts) == 2 and contents[2].parts[0].function_response.name == "fetch_profile_context"
+    print("SUCCESS: Parallel calls and their results map to single Gemini turns.")
+
+def test_text_protocol_fallback():
+    print("\n--- Testing Prompt-Based Fallback ---")
+    text = '```json\n{"tool": "query_graph", "args": {"question": "x"}}\n```\n```json\n{"tool": "fetch_profile_context", "args": {"category": "habits"}}\n```'
+    turn = ToolTurn.from_text(text)
+    assert [c.name for c in turn.tool_calls] == ["query_graph", "fetch_profile_context"]
+    assert ToolTurn.from_text("Just a reply.").tool_calls == []
+    print("SUCCESS: Several JSON blocks parsed as parallel calls.")
+
+if __name__ == "__main__":
+    test_parallel_tool_calls_in_one_turn()
+    test_tool_errors_are_returned_to_the_model()
+    test_local_native_calls_streamed()
+    test_gemini_parallel_results_share_a_turn()
+    test_text_protocol_fallback()
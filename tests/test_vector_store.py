@@ -0,0 +1,162 @@
+import os
+import asyncio
+import tempfile
+import numpy as np
+from unittest.mock import AsyncMock, patch
+from backend.core.vector_store import NumpyVectorStore, open_vector_store
+from backend.core.vector_migrate import migrate
+from backend.core.memory import Hippocampus, MemoryEntry
+import backend.core.memory as memory
+
+def random_rows(n, dim=32, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(n, dim)).astype(np.float32)
+    metadatas = [{"scene": "Work" if i % 2 else "Home", "ts": float(i), "outcome": "Logged"} for i in range(n)]
+    return [f"id{i}" for i in range(n)], vectors, metadatas
+
+def test_matches_chroma():
+    print("\n--- Testing NumPy Store Parity With Chroma ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        ids, vectors, metadatas = random_rows(500)
+        _, chroma = open_vector_store(os.path.join(tmp, "chroma"), "chroma")
+        _, lean = open_vector_store(os.path.join(tmp, "vectors"), "numpy")
+        for store in (chroma, lean):
+            store.upsert(ids=ids, embeddings=vectors.tolist(), metadatas=metadatas, documents=ids)
+
+        where = {"$and": [{"scene": "Work"}, {"ts": {"$gte": 100.0}}, {"outcome": {"$ne": "Consolidated"}}]}
+        for query_where in (None, where):
+            expected = chroma.query(query_embeddings=[vectors[7].tolist()], n_results=10, where=query_where)
+            actual = lean.query(query_embeddings=[vectors[7].tolist()], n_results=10, where=query_where)
+            assert actual["ids"][0] == expected["ids"][0]
+            assert np.allclose(actual["distances"][0], expected["distances"][0], rtol=1e-3, atol=1e-3)
+
+        page = lean.get(where={"ts": {"$lt": 10.0}}, limit=3, offset=2, include=["metadatas"])
+        assert page["ids"] == ["id2", "id3", "id4"] and page["metadatas"][0]["ts"] == 2.0
+        lean.add(ids=["id0"], embeddings=[vectors[1].tolist()], metadatas=[{"scene": "Gym"}])
+        assert lean.get(ids=["id0"])["metadatas"][0]["scene"] == "Home" # add() never overwrites
+        lean.delete(where={"scene": "Home"})
+        assert lean.count() == chroma.count() // 2
+    print("SUCCESS: Same neighbours, distances and filter semantics as Chroma.")
+
+def test_persistence_float16_and_slot_reuse():
+    print("\n--- Testing Memory-Mapped Persistence ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        ids, vectors, metadatas = random_rows(2000, dim=64)
+        store = NumpyVectorStore(tmp, dtype="float16")
+        store.upsert(ids, vectors.tolist(), metadatas)
+        store.delete(ids=ids[:100])
+        store.upsert(["new"], [vectors[0].tolist()], [{"scene": "Gym"}])
+        assert store._size == 2000 # Deleted slot reused
+
+        reopened = NumpyVectorStore(tmp, dtype="float32") # The stored dtype wins
+        assert reopened.dtype == np.float16 and reopened.count() == 1901
+        hit = reopened.query(query_embeddings=[vectors[500].tolist()], n_results=1)
+        assert hit["ids"][0] == ["id500"]
+        sizes = reopened.footprint()
+        print(f"Footprint: {sizes}")
+        assert sizes["vectors.npy"] < 2048 * 64 * 2 + 1024 # Half of float32
+    print("SUCCESS: float16 matrix survives a reopen; freed rows are reused.")
+
+def test_ivf_recall():
+    print("\n--- Testing IVF Search ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        rng = np.random.default_rng(1)
+        centers = rng.normal(size=(20, 32)) * 4
+        vectors = (centers[rng.integers(0, 20, 5000)] + rng.normal(size=(5000, 32))).astype(np.float32)
+        ids = [f"id{i}" for i in range(5000)]
+        exact = NumpyVectorStore(os.path.join(tmp, "exact"))
+        ivf = NumpyVectorStore(os.path.join(tmp, "ivf"), index="ivf", nprobe=8, ivf_min_rows=1000)
+        for store in (exact, ivf):
+            store.upsert(ids, vectors.tolist(), [{} for _ in ids])
+
+        queries = vectors[rng.choice(5000, 50, replace=False)] + rng.normal(size=(50, 32)).astype(np.float32) * 0.1
+        hits = 0
+        for q in queries:
+            truth = set(exact.query(query_embeddings=[q.tolist()], n_results=10)["ids"][0])
+            hits += len(truth & set(ivf.query(query_embeddings=[q.tolist()], n_results=10)["ids"][0]))
+        recall_at_10 = hits / (10 * len(queries))
+        print(f"IVF recall@10: {recall_at_10:.3f} ({len(ivf._centroids)} lists, nprobe 8)")
+        assert ivf._centroids is not None and recall_at_10 > 0.9
+    print("SUCCESS: IVF trained on demand with high recall.")
+
+def test_int8_with_rerank():
+    print("\n--- Testing int8 Storage ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        rng = np.random.default_rng(2)
+        centers = rng.normal(size=(32, 256)) * 2
+        vectors = (centers[rng.integers(0, 32, 4000)] + rng.normal(size=(4000, 256))).astype(np.float32)
+        ids = [f"id{i}" for i in range(4000)]
+        exact = NumpyVectorStore(os.path.join(tmp, "exact"))
+        lean = NumpyVectorStore(os.path.join(tmp, "lean"), dtype="int8", rerank="none")
+        reranked = NumpyVectorStore(os.path.join(tmp, "reranked"), dtype="int8", rerank="float16")
+        for store in (exact, lean, reranked):
+            store.upsert(ids, vectors.tolist(), [{"ts": float(i)} for i in range(4000)])
+
+        queries = vectors[:40] + rng.normal(size=(40, 256)).astype(np.float32) * 0.5
+        recall = {"lean": 0, "reranked": 0}
+        for q in queries:
+            truth = exact.query(query_embeddings=[q.tolist()], n_results=10)
+            for name, store in (("lean", lean), ("reranked", reranked)):
+                recall[name] += len(set(truth["ids"][0]) & set(store.query(query_embeddings=[q.tolist()], n_results=10)["ids"][0])) / 400
+        # Re-ranked distances are exact (up to float16 rounding)
+        expected = exact.query(query_embeddings=[queries[0].tolist()], n_results=3)["distances"][0]
+        assert np.allclose(reranked.query(query_embeddings=[queries[0].tolist()], n_results=3)["distances"][0], expected, rtol=1e-2)
+        print(f"recall@10 int8: {recall['lean']:.3f}, int8 + float16 re-rank: {recall['reranked']:.3f}")
+        assert recall["lean"] > 0.9 and recall["reranked"] > 0.99
+
+        sizes = lean.footprint()
+        assert sizes["vectors.npy"] < exact.footprint()["vectors.npy"] / 3.9 and "raw.npy" not in sizes
+        reopened = NumpyVectorStore(os.path.join(tmp, "reranked"), dtype="float32", rerank="none") # Stored settings win
+        assert reopened.dtype == np.int8 and reopened.rerank == "float16"
+        assert np.allclose(reopened.get(ids=["id5"], include=["embeddings"])["embeddings"][0], vectors[5], atol=1e-2)
+    print("SUCCESS: int8 matrix at a quarter of the size; re-ranking restores exact order.")
+
+def test_migrate_chroma_to_int8():
+    print("\n--- Testing Collection Migration ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        ids, vectors, metadatas = random_rows(1200, dim=64)
+        _, chroma = open_vector_store(os.path.join(tmp, "chroma"), "chroma")
+        chroma.upsert(ids=ids, embeddings=vectors.tolist(), metadatas=metadatas, documents=ids)
+
+        report = migrate(os.path.join(tmp, "chroma"), os.path.join(tmp, "vectors"), dtype="int8", rerank="float16", page_size=500, probes=50)
+        print(f"Report: {report}")
+        assert report["records"] == 1200 and report["recall@10"] > 0.95
+        store = NumpyVectorStore(os.path.join(tmp, "vectors"))
+        assert store.dtype == np.int8 and store.count() == 1200
+        assert store.get(ids=["id7"])["metadatas"][0] == metadatas[7] and store.get(ids=["id7"])["documents"] == ["id7"]
+    print("SUCCESS: Records, metadata and neighbours survive the migration.")
+
+def test_hippocampus_on_numpy_backend():
+    print("\n--- Testing Hippocampus With VECTOR_BACKEND=numpy ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = Hippocampus(path=os.path.join(tmp, "vectors"), backend="numpy")
+        entries = [MemoryEntry(timestamp=f"2025-03-0{i + 1}T10:00:00", scene="Home" if i % 2 else "Work",
+                               statement=f"Event {i}" + (" migraine" if i == 3 else ""), entities=[], user_state="Calm", outcome="Logged")
+                   for i in range(6)]
+
+        async def embeddings(texts):
+            return [[float(len(t)), 1.0, 0.0] for t in texts]
+
+        async def embedding(text):
+            return [float(len(text)), 1.0, 0.0]
+
+        with patch.object(memory.llm_provider, "get_embeddings", embeddings), \
+             patch.object(memory.llm_provider, "get_embedding", embedding), \
+             patch.object(memory.graph_service, "add_memory_node", AsyncMock()), \
+             patch.object(memory.graph_service, "flush", AsyncMock()):
+            report = asyncio.run(store.add_memories(entries, enrich=False))
+            assert report["stored"] == 6 and store.client is None
+            assert [m.statement for m in asyncio.run(store.recall("migraine", k=1))] == ["Event 3 migraine"]
+            home = asyncio.run(store.recall("event", k=6, scene="Home", mode="vector"))
+            assert len(home) == 3 and {m.scene for m in home} == {"Home"}
+            assert asyncio.run(store.delete_range("2025-03-01T00:00:00", "2025-03-03T23:00:00"))
+            assert store.collection.count() == 3
+    print("SUCCESS: Recall, filters and range deletes work on the lean backend.")
+
+if __name__ == "__main__":
+    test_matches_chroma()
+    test_persistence_float16_and_slot_reuse()
+    test_ivf_recall()
+    test_int8_with_rerank()
+    test_migrate_chroma_to_int8()
+    test_hippocampus_on_numpy_backend()